@@ -1,17 +1,26 @@
-import time
 import threading
+import time
 
-# Automatic dependency installation
+# Dependency check (metadata lookup only, no pip processes at import time)
 try:
-    from .utils import install_from_requirements
-    install_from_requirements()
-    print("🍓 [StrawberryFist] All dependencies loaded successfully!")
+    from .utils import check_dependencies
+    missing_dependencies = check_dependencies()
+    if missing_dependencies:
+        print(f"🍓 [StrawberryFist] Missing dependencies: {', '.join(missing_dependencies)}")
+        print("🍓 [StrawberryFist] Run 'python install_script.py' in this node's folder to install them")
 except Exception as e:
-    print(f"🍓 [StrawberryFist] Error occurred during dependency installation: {e}")
+    print(f"🍓 [StrawberryFist] Error occurred during dependency check: {e}")
 
 # Import required modules
-from .utils import GPUMonitor, VRAMCleaner
-from .hooks import ComfyUIHooks
+from .utils import GPUMonitor, VRAMCleaner, PromptPeakTracker, ModelSetDeferral, TraceRecorder, SampleHistory, PredictiveCleanupPolicy, NodeProfiler, CleanupWorker, OOMRecovery, ModelEvictor, StrawberryMetrics, TimeSeriesStore, SamplerService, TrendAnalyzer, GPUCoordinator, format_duration, format_host_memory, format_size, parse_device_thresholds, compute_workflow_fingerprint, compute_model_set_fingerprint
+from .hooks import ComfyUIHooks, register_server_routes
+
+# HTTP routes must be added before the ComfyUI server starts, i.e. at import time.
+# Outside ComfyUI (e.g. the headless monitor in __main__.py) there is no server to register with.
+try:
+    register_server_routes()
+except Exception as e:
+    print(f"🍓 [StrawberryFist] Error occurred during route registration: {e}")
 
 class StrawberryVramOptimizer:
     """StrawberryFist VRAM Optimization Node"""
@@ -30,16 +39,54 @@ class StrawberryVramOptimizer:
                 'enabled': True,
                 'clear_mode': 'Standard',
                 'auto_clean': 'Every Time',
-                'run_timing': 'After Queue'
+                'run_timing': 'After Queue',
+                'device_thresholds': '',
+                'cleanup_execution': 'Async',
+                'pending_cleanup': 'Defer',
+                'min_interval': 0.0,
+                'min_reclaim_mb': 0.0,
+                'hysteresis': 10.0,
+                'fragmentation_threshold': 0.0,
+                'oom_forecast_horizon': 0.0,
+                'oom_retries': 0,
+                'model_eviction': 'Off',
+                'free_target_mb': 4096.0,
+                'leak_detection': 'Off',
+                'leak_scan_budget_ms': 50,
+                'host_cleanup': 'Off',
+                'host_threshold': 85.0,
+                'multi_process': 'Off',
+                'process_budget_mb': 0.0,
+                'model_set_deferral': 'Off',
+                'trace_recording': 'Off'
             }
             self.last_execution_time = 0
             self.execution_count = 0
             self.last_force_run = 0
+            self.last_fingerprint = None
+            self.last_model_set = None
             self._is_initialized = True
             
             # Initialize components
-            self.gpu_monitor = GPUMonitor()
+            self.gpu_monitor = GPUMonitor.shared()
             self.vram_cleaner = VRAMCleaner()
+            self.cleanup_policy = PredictiveCleanupPolicy()
+            self.cleanup_worker = CleanupWorker(self.run_background_cleanup)
+            # One cleanup at a time: the execution thread, the background worker and settings changes all clean up
+            self.cleanup_lock = threading.RLock()
+            self.oom_recovery = OOMRecovery(self.vram_cleaner)
+            self.prompt_peaks = PromptPeakTracker.shared()
+            self.prompt_peaks.vram_cleaner = self.vram_cleaner
+            self.last_peak_record = None
+            self.trace_recorder = TraceRecorder.shared()
+            self.model_evictor = ModelEvictor.shared()
+            self.metrics = StrawberryMetrics.shared()
+            self.sampler = SamplerService.shared()
+            self.forecast_subscription = None
+            self.trends = {}
+            self.coordinator = None
+            self.model_set_deferral = ModelSetDeferral()
+            self.deferral_subscription = None
             self.hooks = ComfyUIHooks(self)
             
             # Try to register hooks immediately
@@ -64,10 +111,10 @@ class StrawberryVramOptimizer:
                     }
                 ),
                 "auto_clean": (
-                    ["Every Time", "Only When High"],
+                    ["Every Time", "Only When High", "Predictive"],
                     {
                         "default": "Every Time",
-                        "tooltip": "Every Time: Execute every time\nOnly When High: Execute only when VRAM usage is 70% or higher"
+                        "tooltip": "Every Time: Execute every time (unless min_interval/min_reclaim_mb rate-limit it)\nOnly When High: Execute only when VRAM usage is 70% or higher\nPredictive: Execute only when the learned peak VRAM of the workflow will not fit in free memory"
                     }
                 ),
                 "run_timing": (
@@ -87,6 +134,171 @@ class StrawberryVramOptimizer:
                         "tooltip": "Change this value to manually trigger VRAM cleanup"
                     }
                 )
+            },
+            "optional": {
+                "device_thresholds": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "Per-GPU thresholds for 'Only When High', e.g. '0:70,1:85'\nGPUs not listed use 70%"
+                    }
+                ),
+                "cleanup_execution": (
+                    ["Async", "Sync"],
+                    {
+                        "default": "Async",
+                        "tooltip": "Async: After-queue cleanup runs on a background worker, back-to-back requests are merged\nSync: Cleanup runs on the execution thread before the next prompt starts"
+                    }
+                ),
+                "pending_cleanup": (
+                    ["Defer", "Cancel", "Wait"],
+                    {
+                        "default": "Defer",
+                        "tooltip": "What a starting prompt does with a pending background cleanup\nDefer: Hold it until the prompt finishes\nCancel: Drop it (the prompt's own after-queue cleanup replaces it)\nWait: Run it before the prompt starts"
+                    }
+                ),
+                "min_interval": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 600.0,
+                        "step": 0.5,
+                        "tooltip": "Minimum seconds between automatic cleanups, also in Every Time mode (0 = no limit)\nBacks off exponentially (up to 60s) while cleanups reclaim less than min_reclaim_mb"
+                    }
+                ),
+                "min_reclaim_mb": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 8192.0,
+                        "step": 16.0,
+                        "tooltip": "A cleanup that returns less reserved memory than this is considered not worth its cost and backs off the next ones (0 = never)"
+                    }
+                ),
+                "hysteresis": (
+                    "FLOAT",
+                    {
+                        "default": 10.0,
+                        "min": 0.0,
+                        "max": 50.0,
+                        "step": 1.0,
+                        "tooltip": "Only When High: after a cleanup, usage must drop this many % below the threshold before the GPU is cleaned again\n0 = plain threshold"
+                    }
+                ),
+                "fragmentation_threshold": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 100.0,
+                        "step": 5.0,
+                        "tooltip": "Also clean a GPU when inactive split blocks make up this % of reserved memory, regardless of usage\n0 = disabled"
+                    }
+                ),
+                "oom_forecast_horizon": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 3600.0,
+                        "step": 5.0,
+                        "tooltip": "Start a preemptive cleanup when the usage trend forecasts a full GPU within this many seconds\nActs only between prompts (the trend restarts after each prompt)\n0 = disabled"
+                    }
+                ),
+                "oom_retries": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 5,
+                        "step": 1,
+                        "tooltip": "Retry a prompt that failed with CUDA out of memory up to this many times\nEach retry escalates the recovery: empty_cache → gc → unload cached models\n0 = disabled"
+                    }
+                ),
+                "model_eviction": (
+                    ["Off", "LRU"],
+                    {
+                        "default": "Off",
+                        "tooltip": "LRU: when a GPU has less than free_target_mb free, unload loaded models (least recently used, large and cheap to reload first)\nModels used by the upcoming prompt's loaders are kept"
+                    }
+                ),
+                "free_target_mb": (
+                    "FLOAT",
+                    {
+                        "default": 4096.0,
+                        "min": 0.0,
+                        "max": 131072.0,
+                        "step": 256.0,
+                        "tooltip": "Free memory (MB, as counted by ComfyUI) that model eviction tries to reach on each GPU"
+                    }
+                ),
+                "leak_detection": (
+                    ["Off", "CUDA", "CPU"],
+                    {
+                        "default": "Off",
+                        "tooltip": "After each prompt, scan Python objects for tensors on this device and report tensor groups (shape, dtype, size, referrer) that grew since the previous scan\nLarge heaps are scanned over several prompts"
+                    }
+                ),
+                "leak_scan_budget_ms": (
+                    "INT",
+                    {
+                        "default": 50,
+                        "min": 5,
+                        "max": 5000,
+                        "step": 5,
+                        "tooltip": "Time the leak scan may spend after each prompt (ms)"
+                    }
+                ),
+                "host_cleanup": (
+                    ["Off", "Every Time", "Only When High"],
+                    {
+                        "default": "Off",
+                        "tooltip": "Host RAM cleanup alongside VRAM cleanup: gc, release of the pinned-memory cache and malloc_trim (glibc)\nOnly When High: when host memory usage is at or above host_threshold"
+                    }
+                ),
+                "host_threshold": (
+                    "FLOAT",
+                    {
+                        "default": 85.0,
+                        "min": 10.0,
+                        "max": 99.0,
+                        "step": 1.0,
+                        "tooltip": "Host memory usage (%) that triggers host cleanup in Only When High mode (container memory limits are taken into account)"
+                    }
+                ),
+                "multi_process": (
+                    ["Off", "On"],
+                    {
+                        "default": "Off",
+                        "tooltip": "On: coordinate with other ComfyUI processes on the same GPUs\nOne elected process samples the GPUs into a shared-memory segment that the others read, and cleanups of different processes never overlap (file lock)\nSTRAWBERRY_COORDINATION=1 enables it at startup"
+                    }
+                ),
+                "process_budget_mb": (
+                    "FLOAT",
+                    {
+                        "default": 0.0,
+                        "min": 0.0,
+                        "max": 131072.0,
+                        "step": 256.0,
+                        "tooltip": "VRAM this process may keep on each GPU (MB)\nAbove it the allocator cache is emptied, and models are unloaded until allocated memory fits the budget\n0 = no budget"
+                    }
+                ),
+                "model_set_deferral": (
+                    ["Off", "On"],
+                    {
+                        "default": "Off",
+                        "tooltip": "On: skip the after-queue cleanup while the next queued prompt loads the same models (same loader nodes and inputs), keeping warm allocator blocks\nThe deferred cleanup runs when the model set changes or the queue goes idle\nMemory pressure (process budget, OOM forecast) still cleans"
+                    }
+                ),
+                "trace_recording": (
+                    ["Off", "On"],
+                    {
+                        "default": "Off",
+                        "tooltip": "On: append one JSON line per prompt (memory before/after, peaks, model set) and per cleanup (cost, reclaimed memory) to a trace file\nReplay traces against other cleanup policies offline with the 'simulate' command of the headless CLI"
+                    }
+                )
             }
         }
     
@@ -101,7 +313,12 @@ class StrawberryVramOptimizer:
         # Always return different value to prevent caching
         return time.time()
     
-    def setup_and_run(self, enabled, clear_mode, auto_clean, run_timing, force_run):
+    def setup_and_run(self, enabled, clear_mode, auto_clean, run_timing, force_run, device_thresholds="",
+                      cleanup_execution="Async", pending_cleanup="Defer", min_interval=0.0, min_reclaim_mb=0.0,
+                      hysteresis=10.0, fragmentation_threshold=0.0, oom_forecast_horizon=0.0,
+                      oom_retries=0, model_eviction="Off", free_target_mb=4096.0, leak_detection="Off",
+                      leak_scan_budget_ms=50, host_cleanup="Off", host_threshold=85.0, multi_process="Off",
+                      process_budget_mb=0.0, model_set_deferral="Off", trace_recording="Off"):
         current_time = time.strftime("%H:%M:%S", time.localtime())
         
         # Detect setting changes
@@ -110,7 +327,26 @@ class StrawberryVramOptimizer:
             'enabled': enabled == "On",
             'clear_mode': clear_mode,
             'auto_clean': auto_clean,
-            'run_timing': run_timing
+            'run_timing': run_timing,
+            'device_thresholds': device_thresholds,
+            'cleanup_execution': cleanup_execution,
+            'pending_cleanup': pending_cleanup,
+            'min_interval': min_interval,
+            'min_reclaim_mb': min_reclaim_mb,
+            'hysteresis': hysteresis,
+            'fragmentation_threshold': fragmentation_threshold,
+            'oom_forecast_horizon': oom_forecast_horizon,
+            'oom_retries': oom_retries,
+            'model_eviction': model_eviction,
+            'free_target_mb': free_target_mb,
+            'leak_detection': leak_detection,
+            'leak_scan_budget_ms': leak_scan_budget_ms,
+            'host_cleanup': host_cleanup,
+            'host_threshold': host_threshold,
+            'multi_process': multi_process,
+            'process_budget_mb': process_budget_mb,
+            'model_set_deferral': model_set_deferral,
+            'trace_recording': trace_recording
         }
         
         # Check if settings have changed
@@ -129,8 +365,25 @@ class StrawberryVramOptimizer:
         self.settings.update(new_settings)
         self.last_force_run = force_run
         
-        # Update VRAM cleaner mode
+        # Update VRAM cleaner mode and rate limiting
         self.vram_cleaner.clear_mode = clear_mode
+        self.vram_cleaner.configure_governor(min_interval=min_interval, min_reclaim_mb=min_reclaim_mb, hysteresis=hysteresis)
+        self.configure_forecast(oom_forecast_horizon)
+        self.oom_recovery.max_retries = oom_retries
+        if model_eviction != "Off" or process_budget_mb > 0:
+            self.model_evictor.install_tracking()
+        self.configure_coordination(multi_process == "On")
+        if model_set_deferral == "Off":
+            self.model_set_deferral.reset()
+            self.configure_idle_watch(False)
+        if trace_recording == "On":
+            self.trace_recorder.enable()
+        else:
+            self.trace_recorder.disable()
+        if leak_detection != "Off":
+            self.vram_cleaner.enable_leak_detection(leak_detection.lower(), leak_scan_budget_ms / 1000)
+        else:
+            self.vram_cleaner.disable_leak_detection()
         
         # Try to register hooks when settings change
         if settings_changed:
@@ -169,8 +422,246 @@ class StrawberryVramOptimizer:
         
         return result
     
-    def perform_vram_cleanup(self, force_run=False, reason="Auto execution"):
-        """Execute VRAM cleanup"""
+    def configure_forecast(self, horizon):
+        """Follow the usage trend through the shared sampler while a forecast horizon is set"""
+        if horizon > 0 and self.forecast_subscription is None:
+            self.forecast_subscription = self.sampler.subscribe("optimizer_forecast", 1.0, self.on_forecast_sample)
+        elif horizon <= 0 and self.forecast_subscription is not None:
+            self.forecast_subscription.cancel()
+            self.forecast_subscription = None
+            self.trends = {}
+    
+    def configure_coordination(self, enabled):
+        """Share GPU telemetry and the cleanup mutex with other ComfyUI processes on the same GPUs"""
+        if enabled and self.coordinator is None:
+            try:
+                self.coordinator = GPUCoordinator.shared()
+                self.coordinator.attach(self.gpu_monitor)
+            except OSError as e:
+                self.coordinator = None
+                print(f"🍓 [StrawberryFist] Multi-process coordination unavailable: {e}")
+        elif not enabled and self.coordinator is not None:
+            self.coordinator.detach(self.gpu_monitor)
+            self.coordinator = None
+    
+    def update_process_slot(self):
+        """Publish this process's reserved VRAM to the other coordinated processes"""
+        coordinator = GPUCoordinator.current()
+        if coordinator is None:
+            return
+        reserved = sum(self.vram_cleaner.get_reserved_memory(device) for device in range(self.vram_cleaner.get_device_count()))
+        coordinator.update_process(reserved, self.settings['process_budget_mb'])
+    
+    def get_budget_targets(self, devices):
+        """{device: free_target_mb} that brings this process's allocated memory back within its budget"""
+        budget = self.settings['process_budget_mb']
+        if budget <= 0 or not self.model_evictor.manager.available():
+            return {}
+        targets = {}
+        for device in devices:
+            excess = self.vram_cleaner.get_allocated_memory(device) - budget
+            if excess > 0:
+                targets[device] = self.model_evictor.manager.get_free_memory(device) + excess
+        return targets
+    
+    def is_under_pressure(self):
+        """Memory pressure that must not wait for a deferred cleanup (process budget exceeded or OOM forecast)"""
+        if self.get_forecast_devices():
+            return True
+        budget = self.settings['process_budget_mb']
+        return budget > 0 and any(
+            self.vram_cleaner.get_reserved_memory(device) > budget
+            for device in range(self.vram_cleaner.get_device_count())
+        )
+    
+    def defer_after_queue_cleanup(self):
+        """True when the after-queue cleanup is deferred because the next queued prompt loads the same models"""
+        if self.settings['model_set_deferral'] == 'Off':
+            return False
+        if self.is_under_pressure() or not self.model_set_deferral.decide(self.last_model_set):
+            self.model_set_deferral.reset()
+            self.configure_idle_watch(False)
+            return False
+        self.metrics.skipped.labels("same_models").inc()
+        self.configure_idle_watch(True)
+        return True
+    
+    def is_cleanup_deferred_for(self, prompt):
+        """True when a before-queue cleanup would discard blocks the deferred model set is about to reuse"""
+        if self.settings['model_set_deferral'] == 'Off' or self.is_under_pressure():
+            return False
+        return self.model_set_deferral.covers(compute_model_set_fingerprint(prompt))
+    
+    def configure_idle_watch(self, enabled):
+        """Watch the queue through the shared sampler while a cleanup is deferred"""
+        if enabled and self.deferral_subscription is None:
+            self.deferral_subscription = self.sampler.subscribe("model_set_deferral", 1.0, self.on_deferral_sample)
+        elif not enabled and self.deferral_subscription is not None:
+            subscription, self.deferral_subscription = self.deferral_subscription, None
+            subscription.cancel()
+    
+    def on_deferral_sample(self, gpu_infos, timestamp):
+        """Sampler callback: run the deferred cleanup once the queue is idle (the next prompt was deleted or cancelled)"""
+        if not self.model_set_deferral.check_idle(executing=self.cleanup_worker.is_paused()):
+            if not self.model_set_deferral.is_deferring():
+                self.configure_idle_watch(False)
+            return
+        self.configure_idle_watch(False)
+        self.cleanup_worker.request_unless_paused("Queue idle after deferred cleanups")
+    
+    def get_forecast_devices(self):
+        """{device: seconds_until_full} for GPUs forecast to fill up within the horizon"""
+        horizon = self.settings['oom_forecast_horizon']
+        if horizon <= 0:
+            return {}
+        forecasts = {}
+        for index, trend in list(self.trends.items()):
+            seconds = trend.seconds_until_full()
+            if 0 <= seconds <= horizon:
+                forecasts[index] = seconds
+        return forecasts
+    
+    def on_forecast_sample(self, gpu_infos, timestamp):
+        """Sampler callback: update trends and request a preemptive cleanup when a GPU is about to fill up
+        
+        Acts only between prompts. During a prompt its own allocations make usage climb, and a request would be
+        held until the prompt ends, so the trends are dropped and rebuilt from the samples after it.
+        """
+        if self.cleanup_worker.is_paused():
+            self.trends.clear()
+            return
+        for gpu_info in gpu_infos:
+            trend = self.trends.get(gpu_info['index'])
+            if trend is None:
+                trend = TrendAnalyzer(window=300)
+                self.trends[gpu_info['index']] = trend
+            trend.add(timestamp, gpu_info['percent'])
+        
+        forecasts = self.get_forecast_devices()
+        if not forecasts or not self.settings['enabled'] or self.cleanup_worker.is_pending():
+            return
+        # Do not queue requests the rate limiter would reject anyway
+        if self.vram_cleaner.get_skip_reason() is not None:
+            return
+        self.cleanup_worker.request_unless_paused("Preemptive cleanup (" + ", ".join(
+            f"GPU{index} full in {format_duration(seconds)}" for index, seconds in sorted(forecasts.items())
+        ) + ")")
+    
+    def run_background_cleanup(self, reason, merged_requests):
+        """Cleanup entry point of the background worker"""
+        if merged_requests > 1:
+            reason = f"{reason} (merged {merged_requests} requests)"
+        return self.perform_vram_cleanup(reason=reason)
+    
+    def on_prompt_start(self, prompt, prompt_id):
+        """Called by the execution hook right before a prompt runs"""
+        self.last_fingerprint = compute_workflow_fingerprint(prompt)
+        self.last_model_set = compute_model_set_fingerprint(prompt)
+        if self.settings['model_eviction'] != 'Off':
+            self.model_evictor.begin_prompt()
+        if self.trace_recorder.enabled:
+            self.trace_recorder.begin(prompt_id, self.gpu_monitor.get_all_gpu_info())
+    
+    def record_trace(self, record, oom=False):
+        """Append the prompt's peak record to the trace (called by the execution hook, also for failed prompts)"""
+        if self.trace_recorder.enabled:
+            self.trace_recorder.record_prompt(record, self.last_model_set, oom)
+    
+    def on_prompt_end(self, prompt, prompt_id):
+        """Called by the execution hook right after a prompt finished"""
+        if self.settings['model_eviction'] != 'Off':
+            self.model_evictor.end_prompt(self.last_model_set)
+        
+        # Peak VRAM of the prompt, measured by the execution hook
+        record = self.prompt_peaks.get(prompt_id)
+        if record is not None:
+            self.last_peak_record = record
+            print(self.prompt_peaks.format_record(record))
+        
+        if self.settings['auto_clean'] == 'Predictive' and self.last_fingerprint and record is not None:
+            peaks = {device: entry['peak_reserved'] for device, entry in record['devices'].items()}
+            if peaks:
+                self.cleanup_policy.record(self.last_fingerprint, peaks)
+        
+        self.update_process_slot()
+        
+        # Advance the leak scan; a finished scan is diffed against the previous one
+        report = self.vram_cleaner.scan_for_leaks()
+        if report is not None:
+            print(self.vram_cleaner.leak_detector.format_report(report))
+    
+    def evict_models(self, devices, prompt=None, targets=None):
+        """Unload models on GPUs below the free-memory target, keeping those the upcoming prompt uses
+        
+        targets: {device: free_target_mb} that applies even with model_eviction Off (process budget)
+        """
+        targets = targets or {}
+        if (self.settings['model_eviction'] == 'Off' and not targets) or not self.model_evictor.manager.available():
+            return []
+        # Before a prompt its loaders are known; after a prompt assume the next one repeats it
+        model_set = compute_model_set_fingerprint(prompt) if prompt is not None else self.last_model_set
+        protected = self.model_evictor.get_protected(model_set)
+        
+        results = []
+        for device in devices:
+            target = self.settings['free_target_mb'] if self.settings['model_eviction'] != 'Off' else 0.0
+            target = max(target, targets.get(device, 0.0))
+            if target <= 0:
+                continue
+            result = self.model_evictor.evict(device, target, protected)
+            if result['evicted']:
+                print(self.model_evictor.format_result(result))
+                self.metrics.evicted_models.labels(device).inc(len(result['evicted']))
+            results.append(result)
+        return results
+    
+    def get_predictive_devices(self, gpu_infos, prompt=None):
+        """Devices whose predicted peak will not fit in free memory (None if the workflow is unknown)"""
+        # Before a prompt the upcoming graph is known; after a prompt assume the next one repeats it
+        fingerprint = compute_workflow_fingerprint(prompt) if prompt is not None else self.last_fingerprint
+        reserved_by_device = {
+            gpu_info['index']: self.vram_cleaner.get_reserved_memory(gpu_info['index'])
+            for gpu_info in gpu_infos
+        }
+        return self.cleanup_policy.get_devices_to_clean(fingerprint, gpu_infos, reserved_by_device)
+    
+    def get_predictive_targets(self, devices):
+        """{device: free_target_mb} that lets the predicted peak fit, in ComfyUI's free memory (driver free + cache free)"""
+        prediction = self.cleanup_policy.last_prediction
+        targets = {}
+        for device in devices:
+            decision = prediction['devices'][device]
+            cache_free = max(0.0, self.vram_cleaner.get_reserved_memory(device) - self.vram_cleaner.get_allocated_memory(device))
+            targets[device] = decision['needed'] + self.cleanup_policy.safety_margin_mb + cache_free
+        return targets
+    
+    def run_host_cleanup(self, force_run=False):
+        """Host RAM cleanup according to the host_cleanup policy; returns status lines for the UI"""
+        host_info = self.gpu_monitor.get_host_memory_info()
+        if host_info is None:
+            return []
+        mode = self.settings['host_cleanup']
+        if mode == 'Off' or (mode == 'Only When High' and not force_run and host_info['percent'] < self.settings['host_threshold']):
+            return [format_host_memory(host_info)]
+        
+        result = self.vram_cleaner.perform_host_cleanup()
+        self.metrics.record_host_cleanup(result)
+        self.gpu_monitor.invalidate_cache()
+        if not result['success']:
+            line = f"🧠 Host cleanup failed: {result['error']}"
+        else:
+            line = (f"🧠 Host cleanup ({', '.join(result['timings'])}): RSS {format_size(result['rss_before'])} → "
+                    f"{format_size(result['rss_after'])} (released {format_size(result['released'])}, {result['duration'] * 1000:.0f}ms)")
+        print(line)
+        host_info = self.gpu_monitor.get_host_memory_info()
+        return [line, format_host_memory(host_info)] if host_info else [line]
+    
+    def perform_vram_cleanup(self, force_run=False, reason="Auto execution", prompt=None):
+        """Execute VRAM cleanup (serialized: the rate limiter, hysteresis and model eviction are not thread-safe)"""
+        with self.cleanup_lock:
+            return self._perform_vram_cleanup(force_run, reason, prompt)
+    
+    def _perform_vram_cleanup(self, force_run, reason, prompt):
         try:
             current_time = time.strftime("%H:%M:%S", time.localtime())
             self.execution_count += 1
@@ -182,15 +673,19 @@ class StrawberryVramOptimizer:
             if not self.settings['enabled'] and not force_run:
                 disabled_msg = f"⏸️ [Execution#{self.execution_count}] [{current_time}] VRAM cleanup disabled"
                 print(disabled_msg)
+                self.metrics.skipped.labels("disabled").inc()
                 return {
                     "ui": {"text": disabled_msg},
                     "result": (disabled_msg,)
                 }
             
-            # Check GPU information
-            gpu_info = self.gpu_monitor.get_gpu_info()
-            if not gpu_info:
-                error_msg = f"❌ [Execution#{self.execution_count}] [{current_time}] GPU not found"
+            # Host memory first: collected tensors are then returned by the VRAM cleanup
+            host_lines = self.run_host_cleanup(force_run)
+            
+            # Check GPU information (all devices in one query)
+            gpu_infos = self.gpu_monitor.get_all_gpu_info()
+            if not gpu_infos:
+                error_msg = "\n".join([f"❌ [Execution#{self.execution_count}] [{current_time}] GPU not found"] + host_lines)
                 print(error_msg)
                 return {
                     "ui": {"text": error_msg},
@@ -200,12 +695,118 @@ class StrawberryVramOptimizer:
             # Log GPU status
             self.gpu_monitor.log_gpu_status(self.execution_count)
             
-            # Check cleanup execution conditions
+            # Check cleanup execution conditions per device
+            device_thresholds = parse_device_thresholds(self.settings['device_thresholds'])
+            devices = None
+            predicted = []
+            if self.settings['auto_clean'] == 'Predictive':
+                devices = self.get_predictive_devices(gpu_infos, prompt)
+                if devices:
+                    # The fit test already counts reserved memory as reusable and empty_cache only moves it to
+                    # driver free memory one-for-one, so only unloading models can make the predicted peak fit
+                    predicted, devices = devices, []
+            threshold_mode = False
+            if devices is None:
+                # Unknown workflows fall back to the usage threshold
+                if self.settings['auto_clean'] == 'Every Time':
+                    devices = [gpu_info['index'] for gpu_info in gpu_infos]
+                else:
+                    threshold_mode = True
+                    devices = self.vram_cleaner.filter_by_hysteresis(gpu_infos, device_thresholds)
+            elif self.cleanup_policy.last_prediction:
+                print(self.cleanup_policy.format_stats())
+            
+            # Fragmented allocator caches are worth cleaning even at low usage
+            if self.settings['fragmentation_threshold'] > 0:
+                ratios = self.vram_cleaner.get_fragmentation_ratios([g['index'] for g in gpu_infos])
+                for index, ratio in sorted(ratios.items()):
+                    if ratio * 100 >= self.settings['fragmentation_threshold'] and index not in devices:
+                        print(f"🧩 [{current_time}] GPU{index} fragmentation {ratio * 100:.1f}% ≥ {self.settings['fragmentation_threshold']:.0f}% → cleanup")
+                        devices.append(index)
+            
+            # GPUs forecast to run out of memory within the horizon
+            for index, seconds in sorted(self.get_forecast_devices().items()):
+                if index not in devices:
+                    print(f"⏳ [{current_time}] GPU{index} forecast to be full in {format_duration(seconds)} → preemptive cleanup")
+                    devices.append(index)
+            
+            # GPUs below the free-memory target are candidates for model eviction
+            if self.settings['model_eviction'] != 'Off':
+                for g in gpu_infos:
+                    if g['total'] - g['used'] < self.settings['free_target_mb'] and g['index'] not in devices:
+                        print(f"📦 [{current_time}] GPU{g['index']} free {g['total'] - g['used']:.0f}MB < {self.settings['free_target_mb']:.0f}MB target → model eviction")
+                        devices.append(g['index'])
+            
+            # GPUs where this process holds more than its budget
+            budget = self.settings['process_budget_mb']
+            if budget > 0:
+                for g in gpu_infos:
+                    reserved = self.vram_cleaner.get_reserved_memory(g['index'])
+                    if reserved > budget and g['index'] not in devices:
+                        print(f"💰 [{current_time}] GPU{g['index']} process reserved {reserved:.0f}MB > {budget:.0f}MB budget → cleanup")
+                        devices.append(g['index'])
+            
+            # Models to unload: process budget, and predicted peaks that do not fit (only with model_eviction on)
+            eviction_targets = self.get_budget_targets(devices)
+            predictive_targets = {}
+            if predicted and self.settings['model_eviction'] != 'Off' and self.model_evictor.manager.available():
+                predictive_targets = self.get_predictive_targets(predicted)
+                for index, target in predictive_targets.items():
+                    print(f"🔮 [{current_time}] GPU{index} predicted peak does not fit → model eviction to {target:.0f}MB free")
+                    eviction_targets[index] = max(target, eviction_targets.get(index, 0.0))
+            
             should_clean = self.settings['enabled'] or force_run
-            if should_clean and not self.gpu_monitor.should_clean_memory(self.settings['auto_clean']):
+            if should_clean and not devices and not eviction_targets:
                 should_clean = False
-                skip_msg = f"ℹ️ [Execution#{self.execution_count}] [{current_time}] VRAM usage {gpu_info['percent']:.1f}% < 70% → Cleanup skipped"
+                prediction = self.cleanup_policy.last_prediction if self.settings['auto_clean'] == 'Predictive' else None
+                if prediction:
+                    usage_info = "Predicted peak " + ", ".join(
+                        f"GPU{index} +{decision['needed']:.0f}MB fits in {decision['free']:.0f}MB free" if decision['fits'] else
+                        f"GPU{index} +{decision['needed']:.0f}MB does not fit in {decision['free']:.0f}MB free "
+                        f"(a cache cleanup would not change this; {'model_eviction is Off' if self.settings['model_eviction'] == 'Off' else 'no model can be unloaded'})"
+                        for index, decision in prediction['devices'].items()
+                    )
+                else:
+                    usage_info = "VRAM usage " + ", ".join(
+                        f"GPU{g['index']} {g['percent']:.1f}% < {device_thresholds.get(g['index'], 70):.0f}%"
+                        if g['percent'] < device_thresholds.get(g['index'], 70) else
+                        f"GPU{g['index']} {g['percent']:.1f}% (re-arms below {device_thresholds.get(g['index'], 70) - self.vram_cleaner.hysteresis:.0f}%)"
+                        for g in gpu_infos
+                    )
+                skip_msg = f"ℹ️ [Execution#{self.execution_count}] [{current_time}] {usage_info} → Cleanup skipped"
+                print(skip_msg)
+                skip_msg = "\n".join([skip_msg] + host_lines)
+                self.metrics.skipped.labels("predictive" if prediction else "threshold").inc()
+                return {
+                    "ui": {"text": skip_msg},
+                    "result": (skip_msg,)
+                }
+            
+            # Skip cleanups that recently did not pay for themselves; the rate limiter governs cache cleanups,
+            # so the model eviction a predicted peak needs still runs on its own
+            skip_reason = None if force_run or not devices else self.vram_cleaner.get_skip_reason()
+            if should_clean and skip_reason and predictive_targets:
+                print(f"⏭️ [Execution#{self.execution_count}] [{current_time}] Cache cleanup skipped: {skip_reason} → model eviction only")
+                self.metrics.skipped.labels("rate_limit").inc()
+                devices, eviction_targets = [], predictive_targets
+            elif should_clean and skip_reason:
+                self.vram_cleaner.skipped_count += 1
+                skip_msg = f"⏭️ [Execution#{self.execution_count}] [{current_time}] Cleanup skipped: {skip_reason}"
+                print(skip_msg)
+                skip_msg = "\n".join([skip_msg] + host_lines)
+                self.metrics.skipped.labels("rate_limit").inc()
+                return {
+                    "ui": {"text": skip_msg},
+                    "result": (skip_msg,)
+                }
+            
+            # Another process on the same GPUs is cleaning up; its cleanup already relieves the pressure
+            coordinator = GPUCoordinator.current()
+            if should_clean and coordinator is not None and not coordinator.acquire_cleanup():
+                skip_msg = f"⏭️ [Execution#{self.execution_count}] [{current_time}] Cleanup skipped: another process is cleaning up"
                 print(skip_msg)
+                skip_msg = "\n".join([skip_msg] + host_lines)
+                self.metrics.skipped.labels("coordination").inc()
                 return {
                     "ui": {"text": skip_msg},
                     "result": (skip_msg,)
@@ -213,17 +814,66 @@ class StrawberryVramOptimizer:
             
             # Execute VRAM cleanup
             if should_clean:
-                # Progress log
-                self.vram_cleaner.log_cleanup_progress(current_time)
+                try:
+                    # Progress log
+                    if devices:
+                        self.vram_cleaner.log_cleanup_progress(current_time)
+                    
+                    # Unload models first so the freed weights are returned by the cache cleanup
+                    eviction_devices = devices + [index for index in sorted(eviction_targets) if index not in devices]
+                    eviction_results = self.evict_models(eviction_devices, prompt, eviction_targets)
+                    
+                    # Execute cleanup on each selected device (none if only models had to be unloaded)
+                    cleanup_result = self.vram_cleaner.perform_cleanup_devices(devices) if devices else None
+                finally:
+                    if coordinator is not None:
+                        coordinator.release_cleanup()
+                self.update_process_slot()
                 
-                # Execute cleanup
-                cleanup_result = self.vram_cleaner.perform_cleanup()
+                # Memory state changed, drop the cached telemetry snapshot
+                self.gpu_monitor.invalidate_cache()
+                
+                if cleanup_result is None:
+                    ui_message = "\n".join(
+                        [f"📦 [Execution#{self.execution_count}] [{current_time}] Model eviction only (cache cleanup would not change the predicted fit)"]
+                        + [self.model_evictor.format_result(eviction_result) for eviction_result in eviction_results]
+                        + [self.cleanup_policy.format_stats()] + host_lines
+                    )
+                    return {
+                        "ui": {"text": ui_message},
+                        "result": (ui_message,)
+                    }
+                
+                # Track reclaim/cost for rate limiting, hysteresis and metrics
+                self.vram_cleaner.record_cleanup(cleanup_result)
+                self.metrics.record_cleanup(cleanup_result)
+                self.trace_recorder.record_cleanup(cleanup_result, reason)
+                if threshold_mode:
+                    self.vram_cleaner.disarm(devices)
                 
                 # Result log
                 self.vram_cleaner.log_cleanup_result(cleanup_result, current_time)
                 
                 # Generate UI message
                 ui_message = self.vram_cleaner.generate_ui_message(cleanup_result, current_time, self.execution_count)
+                if self.settings['auto_clean'] == 'Predictive':
+                    ui_message += "\n" + self.cleanup_policy.format_stats()
+                if self.settings['oom_retries'] > 0:
+                    ui_message += "\n" + self.oom_recovery.format_stats()
+                for eviction_result in eviction_results:
+                    ui_message += "\n" + self.model_evictor.format_result(eviction_result)
+                if self.vram_cleaner.leak_detector is not None:
+                    ui_message += "\n" + self.vram_cleaner.leak_detector.format_report()
+                for line in host_lines:
+                    ui_message += "\n" + line
+                if self.last_peak_record is not None:
+                    ui_message += "\n" + self.prompt_peaks.format_record(self.last_peak_record)
+                if coordinator is not None:
+                    ui_message += "\n" + coordinator.format_stats()
+                if self.settings['model_set_deferral'] != 'Off':
+                    ui_message += "\n" + self.model_set_deferral.format_stats()
+                if self.trace_recorder.enabled:
+                    ui_message += "\n" + self.trace_recorder.format_stats()
                 
                 # Final status log
                 final_status = "CLEANED" if cleanup_result['success'] and cleanup_result['cleared'] > 0 else "ALREADY_CLEAN"
@@ -256,18 +906,36 @@ class StrawberryVramOptimizer:
             current_time = time.strftime("%H:%M:%S", time.localtime())
             
             # Check GPU information
-            gpu_info = self.gpu_monitor.get_gpu_info()
-            if not gpu_info:
+            gpu_infos = self.gpu_monitor.get_all_gpu_info()
+            if not gpu_infos:
                 error_msg = f"❌ [Check#{self.execution_count}] [{current_time}] GPU not found"
                 return {
                     "ui": {"text": error_msg},
                     "result": (error_msg,)
                 }
             
+            usage_info = ", ".join(f"GPU{g['index']} {g['percent']:.1f}%" for g in gpu_infos)
+            
             # Current status log
-            print(f"📊 [{current_time}] Current status check - GPU usage: {gpu_info['percent']:.1f}%")
+            print(f"📊 [{current_time}] Current status check - GPU usage: {usage_info}")
             
-            status_msg = f"📊 [Check#{self.execution_count}] [{current_time}] Current status - GPU usage: {gpu_info['percent']:.1f}%"
+            status_msg = f"📊 [Check#{self.execution_count}] [{current_time}] Current status - GPU usage: {usage_info}"
+            host_info = self.gpu_monitor.get_host_memory_info()
+            if host_info is not None:
+                status_msg += "\n" + format_host_memory(host_info)
+            if self.last_peak_record is not None:
+                status_msg += "\n" + self.prompt_peaks.format_record(self.last_peak_record)
+            if self.settings['oom_retries'] > 0:
+                status_msg += "\n" + self.oom_recovery.format_stats()
+            if self.vram_cleaner.leak_detector is not None:
+                status_msg += "\n" + self.vram_cleaner.leak_detector.format_report()
+            coordinator = GPUCoordinator.current()
+            if coordinator is not None:
+                status_msg += "\n" + coordinator.format_stats()
+            if self.settings['model_set_deferral'] != 'Off':
+                status_msg += "\n" + self.model_set_deferral.format_stats()
+            if self.trace_recorder.enabled:
+                status_msg += "\n" + self.trace_recorder.format_stats()
             return {
                 "ui": {"text": status_msg},
                 "result": (status_msg,)
@@ -286,8 +954,6 @@ class StrawberryGPUMonitor:
     """Real-time GPU Monitoring Node"""
     
     _instance = None
-    _monitor_thread = None
-    _is_monitoring = False
     
     def __new__(cls):
         if cls._instance is None:
@@ -296,14 +962,18 @@ class StrawberryGPUMonitor:
     
     def __init__(self):
         if not hasattr(self, '_initialized'):
-            self.gpu_monitor = GPUMonitor()
+            self.gpu_monitor = GPUMonitor.shared()
+            self.sampler = SamplerService.shared()
+            self.subscription = None
+            self.history_store = None
+            self.settings = {
+                'history_length': 60,
+                'warning_threshold': 80.0
+            }
             self.monitor_data = {
-                'current_percent': 0,
-                'current_used': 0,
-                'current_total': 0,
-                'gpu_name': 'Unknown',
+                'gpu_index': 0,
                 'last_update': time.time(),
-                'history': []
+                'devices': {}
             }
             self._initialized = True
     
@@ -333,7 +1003,7 @@ class StrawberryGPUMonitor:
                     {
                         "default": 60,
                         "min": 10,
-                        "max": 300,
+                        "max": 86400,
                         "step": 1,
                         "tooltip": "Number of history entries to keep"
                     }
@@ -358,11 +1028,30 @@ class StrawberryGPUMonitor:
                         "tooltip": "Change value to trigger immediate update"
                     }
                 )
+            },
+            "optional": {
+                "gpu_index": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 15,
+                        "step": 1,
+                        "tooltip": "GPU reported on the numeric outputs (all GPUs are shown in the display)"
+                    }
+                ),
+                "persist_history": (
+                    ["Off", "On"],
+                    {
+                        "default": "Off",
+                        "tooltip": "Record every sample to a memory-mapped store on disk with 1s/1m/1h rollups (size limit: STRAWBERRY_HISTORY_MAX_MB, default 64)"
+                    }
+                )
             }
         }
     
-    RETURN_TYPES = ("STRING", "FLOAT", "FLOAT", "FLOAT", "STRING")
-    RETURN_NAMES = ("status", "usage_percent", "used_mb", "total_mb", "gpu_name")
+    RETURN_TYPES = ("STRING", "FLOAT", "FLOAT", "FLOAT", "STRING", "FLOAT", "FLOAT", "FLOAT")
+    RETURN_NAMES = ("status", "usage_percent", "used_mb", "total_mb", "gpu_name", "seconds_until_full", "host_usage_percent", "process_rss_mb")
     FUNCTION = "monitor_gpu"
     OUTPUT_NODE = True
     CATEGORY = "StrawberryFist - system"
@@ -372,62 +1061,71 @@ class StrawberryGPUMonitor:
         return time.time()
     
     def start_monitoring(self, update_interval, history_length, warning_threshold):
-        """Start background monitoring"""
-        if self._is_monitoring:
+        """Start background monitoring or apply new settings to the running subscription"""
+        self.settings['history_length'] = history_length
+        self.settings['warning_threshold'] = warning_threshold
+        
+        if self.subscription is not None and self.subscription.active:
+            if self.subscription.interval != update_interval:
+                self.subscription.update(interval=update_interval)
+                print(f"🍓 [GPU Monitoring] Interval changed: {update_interval}s")
             return
         
-        self._is_monitoring = True
+        self.subscription = self.sampler.subscribe("gpu_monitor", update_interval, self.on_sample)
+        print(f"🍓 [GPU Monitoring] Started - interval: {update_interval}s")
+    
+    def on_sample(self, gpu_infos, current_time):
+        """Sampler callback: update current values, history and warnings"""
+        history_length = self.settings['history_length']
+        warning_threshold = self.settings['warning_threshold']
+        history_store = self.history_store
         
-        def monitor_loop():
-            while self._is_monitoring:
-                try:
-                    gpu_info = self.gpu_monitor.get_gpu_info()
-                    current_time = time.time()
-                    
-                    if gpu_info:
-                        self.monitor_data.update({
-                            'current_percent': gpu_info['percent'],
-                            'current_used': gpu_info['used'],
-                            'current_total': gpu_info['total'],
-                            'gpu_name': gpu_info['name'],
-                            'last_update': current_time
-                        })
-                        
-                        # Add to history
-                        self.monitor_data['history'].append({
-                            'time': current_time,
-                            'percent': gpu_info['percent'],
-                            'used': gpu_info['used']
-                        })
-                        
-                        # Limit history length
-                        if len(self.monitor_data['history']) > history_length:
-                            self.monitor_data['history'].pop(0)
-                        
-                        # Check warnings
-                        if gpu_info['percent'] > warning_threshold:
-                            print(f"🚨 [GPU Warning] Memory usage: {gpu_info['percent']:.1f}% (threshold: {warning_threshold}%)")
-                    
-                    time.sleep(update_interval)
-                except Exception as e:
-                    print(f"🍓 [GPU Monitoring] Error: {e}")
-                    time.sleep(update_interval)
+        for gpu_info in gpu_infos:
+            device = self.monitor_data['devices'].get(gpu_info['index'])
+            if device is None:
+                device = {'history': SampleHistory(history_length), 'trend': TrendAnalyzer(history_length)}
+                self.monitor_data['devices'][gpu_info['index']] = device
+            device.update({
+                'current_percent': gpu_info['percent'],
+                'current_used': gpu_info['used'],
+                'current_total': gpu_info['total'],
+                'gpu_name': gpu_info['name']
+            })
+            
+            # Add to history (fixed-size ring buffer, oldest sample is overwritten)
+            device['history'].append(current_time, gpu_info['percent'], gpu_info['used'])
+            if device['trend'].add(current_time, gpu_info['percent']):
+                print(f"📐 [GPU{gpu_info['index']}] Usage trend changed at {gpu_info['percent']:.1f}%")
+            
+            # Persist to disk (queued, never blocks the sampler)
+            if history_store is not None:
+                history_store.append(current_time, gpu_info['index'], gpu_info['percent'], gpu_info['used'])
+            
+            # Check warnings
+            if gpu_info['percent'] > warning_threshold:
+                print(f"🚨 [GPU{gpu_info['index']} Warning] Memory usage: {gpu_info['percent']:.1f}% (threshold: {warning_threshold}%)")
         
-        self._monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        self._monitor_thread.start()
-        print(f"🍓 [GPU Monitoring] Started - interval: {update_interval}s")
+        if gpu_infos:
+            self.monitor_data['last_update'] = current_time
     
     def stop_monitoring(self):
         """Stop background monitoring"""
-        if self._is_monitoring:
-            self._is_monitoring = False
-            if self._monitor_thread:
-                self._monitor_thread.join(timeout=1)
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
             print("🍓 [GPU Monitoring] Stopped")
     
     def generate_status_display(self, warning_threshold):
         """Generate status display"""
-        data = self.monitor_data
+        devices = self.monitor_data['devices']
+        data = devices.get(self.monitor_data['gpu_index']) or {
+            'current_percent': 0,
+            'current_used': 0,
+            'current_total': 0,
+            'gpu_name': 'Unknown',
+            'history': SampleHistory(1),
+            'trend': None
+        }
         current_time = time.strftime("%H:%M:%S", time.localtime())
         
         # Generate memory bar
@@ -441,7 +1139,7 @@ class StrawberryGPUMonitor:
         status_lines.append(f"")
         
         # GPU information
-        status_lines.append(f"📊 GPU: {data['gpu_name']}")
+        status_lines.append(f"📊 GPU{self.monitor_data['gpu_index']}: {data['gpu_name']}")
         status_lines.append(f"┌─────────────────────────────────────────────────────────┐")
         status_lines.append(f"│ {bar_info['emoji']} Usage: {data['current_percent']:.1f}% ({bar_info['color']})                    │")
         status_lines.append(f"│ 📈 Memory: {data['current_used']:.1f}MB / {data['current_total']:.1f}MB                   │")
@@ -449,54 +1147,112 @@ class StrawberryGPUMonitor:
         status_lines.append(f"└─────────────────────────────────────────────────────────┘")
         status_lines.append(f"")
         
-        # History information
-        if len(data['history']) > 1:
-            recent_history = data['history'][-10:]  # Recent 10 entries
-            avg_percent = sum(h['percent'] for h in recent_history) / len(recent_history)
-            max_percent = max(h['percent'] for h in recent_history)
-            min_percent = min(h['percent'] for h in recent_history)
+        # All GPUs overview
+        if len(devices) > 1:
+            status_lines.append(f"🖥️ All GPUs ({len(devices)} devices)")
+            status_lines.append(f"┌─────────────────────────────────────────────────────────┐")
+            for index, device in sorted(devices.items()):
+                device_bar = self.gpu_monitor.generate_memory_bar(device['current_percent'])
+                status_lines.append(f"│ {device_bar['emoji']} GPU{index} {device['gpu_name']}: {device['current_percent']:.1f}% ({device['current_used']:.1f}MB / {device['current_total']:.1f}MB) │")
+            status_lines.append(f"└─────────────────────────────────────────────────────────┘")
+            status_lines.append(f"")
+        
+        # Host memory (process RSS, available memory, swap)
+        host_info = self.gpu_monitor.get_host_memory_info()
+        if host_info is not None:
+            host_bar = self.gpu_monitor.generate_memory_bar(host_info['percent'])
+            limit = " (cgroup limit)" if host_info['cgroup_limited'] else ""
+            status_lines.append(f"🧠 Host memory")
+            status_lines.append(f"┌─────────────────────────────────────────────────────────┐")
+            status_lines.append(f"│ {host_bar['emoji']} RAM: {host_info['percent']:.1f}% ({format_size(host_info['used'])} / {format_size(host_info['total'])}{limit}) │")
+            status_lines.append(f"│ 🧩 Process RSS: {format_size(host_info['rss'])} | Available: {format_size(host_info['available'])} │")
+            if host_info['swap_total']:
+                status_lines.append(f"│ 💱 Swap: {format_size(host_info['swap_used'])} / {format_size(host_info['swap_total'])} ({host_info['swap_percent']:.1f}%) │")
+            status_lines.append(f"└─────────────────────────────────────────────────────────┘")
+            status_lines.append(f"")
+        
+        # History information (rolling statistics are maintained incrementally)
+        history = data['history']
+        if len(history) > 1:
+            stats = history.get_stats()
             
-            status_lines.append(f"📈 Recent Statistics (last {len(recent_history)} samples)")
+            status_lines.append(f"📈 Statistics (last {stats['count']} samples)")
             status_lines.append(f"┌─────────────────────────────────────────────────────────┐")
-            status_lines.append(f"│ Average: {avg_percent:.1f}% | Max: {max_percent:.1f}% | Min: {min_percent:.1f}% │")
+            status_lines.append(f"│ Average: {stats['mean']:.1f}% | Max: {stats['max']:.1f}% | Min: {stats['min']:.1f}% │")
+            status_lines.append(f"│ Median: {stats['p50']:.1f}% | P95: {stats['p95']:.1f}%                          │")
             status_lines.append(f"│ Warning threshold: {warning_threshold:.1f}%                          │")
             status_lines.append(f"└─────────────────────────────────────────────────────────┘")
             status_lines.append(f"")
         
-        # Trend analysis
-        if len(data['history']) >= 5:
-            recent_5 = [h['percent'] for h in data['history'][-5:]]
-            if recent_5[-1] > recent_5[0]:
-                trend = "📈 Increasing trend"
-            elif recent_5[-1] < recent_5[0]:
-                trend = "📉 Decreasing trend"
+        # Trend analysis (least-squares slope since the last change point, EWMA level)
+        trend = data.get('trend')
+        if trend is not None and len(trend) >= trend.min_samples:
+            trend_stats = trend.get_stats()
+            slope = trend_stats['slope'] or 0.0
+            if slope * 60 >= 0.5:
+                trend_label = "📈 Increasing"
+            elif slope * 60 <= -0.5:
+                trend_label = "📉 Decreasing"
             else:
-                trend = "➡️ Stable"
+                trend_label = "➡️ Stable"
             
-            status_lines.append(f"📊 Trend: {trend}")
+            status_lines.append(f"📊 Trend: {trend_label} ({slope * 60:+.2f}%/min, EWMA {trend_stats['ewma']:.1f}%, {trend_stats['samples']} samples)")
+            if trend_stats['seconds_until_full'] >= 0:
+                status_lines.append(f"⏳ Forecast: full in {format_duration(trend_stats['seconds_until_full'])} at the current rate")
+            if trend_stats['last_change_time']:
+                change_time = time.strftime("%H:%M:%S", time.localtime(trend_stats['last_change_time']))
+                status_lines.append(f"📐 Last change point: {change_time} ({trend_stats['change_points']} detected)")
             status_lines.append(f"")
         
         # Warning message
         if data['current_percent'] > warning_threshold:
             status_lines.append(f"🚨 Warning: Memory usage exceeded threshold!")
             status_lines.append(f"")
+        if host_info is not None and host_info['percent'] > warning_threshold:
+            status_lines.append(f"🚨 Warning: Host memory usage exceeded threshold!")
+            status_lines.append(f"")
+        
+        # Telemetry cache statistics
+        cache_stats = self.gpu_monitor.get_cache_stats()
+        status_lines.append(f"🗂️ Telemetry cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.1f}% hit rate, TTL {cache_stats['ttl']:.2f}s)")
+        status_lines.append(f"")
+        
+        # Telemetry shared with other ComfyUI processes
+        coordinator = GPUCoordinator.current()
+        if coordinator is not None:
+            status_lines.append(coordinator.format_stats())
+            status_lines.append(f"")
+        
+        # Persistent history store
+        if self.history_store is not None:
+            store_stats = self.history_store.get_stats()
+            levels = ", ".join(f"{level} {info['records']}/{info['capacity']}" for level, info in store_stats['levels'].items())
+            status_lines.append(f"💾 History store: {levels} records ({store_stats['dropped']} dropped)")
+            status_lines.append(f"   {store_stats['directory']}")
+            status_lines.append(f"")
         
         status_lines.append(f"🍓 Real-time monitoring active... 🍓")
         
         return "\n".join(status_lines)
     
-    def monitor_gpu(self, monitoring_enabled, update_interval, history_length, warning_threshold, refresh_trigger):
+    def monitor_gpu(self, monitoring_enabled, update_interval, history_length, warning_threshold, refresh_trigger, gpu_index=0,
+                    persist_history="Off"):
         """GPU monitoring main function"""
         try:
             current_time = time.strftime("%H:%M:%S", time.localtime())
+            self.monitor_data['gpu_index'] = gpu_index
+            self.history_store = TimeSeriesStore.shared() if persist_history == "On" else None
+            
+            # Apply history length changes to the ring buffers and trend windows
+            for device in list(self.monitor_data['devices'].values()):
+                device['history'].resize(history_length)
+                device['trend'].resize(history_length)
             
             # Control monitoring state
             if monitoring_enabled == "On":
-                if not self._is_monitoring:
-                    self.start_monitoring(update_interval, history_length, warning_threshold)
+                self.start_monitoring(update_interval, history_length, warning_threshold)
             else:
-                if self._is_monitoring:
-                    self.stop_monitoring()
+                self.stop_monitoring()
                 
                 # Monitoring disabled message
                 disabled_msg = f"⏸️ [{current_time}] GPU real-time monitoring disabled"
@@ -506,31 +1262,47 @@ class StrawberryGPUMonitor:
                     0.0,
                     0.0,
                     "Unknown",
+                    -1.0,
+                    0.0,
+                    0.0,
                     {"ui": {"text": disabled_msg}}
                 )
             
-            # Get current GPU information
-            gpu_info = self.gpu_monitor.get_gpu_info()
+            # Reuse the background sampler's snapshot if it is fresh enough
+            gpu_infos = self.gpu_monitor.get_all_gpu_info(max_age=update_interval)
+            gpu_info = next((g for g in gpu_infos if g['index'] == gpu_index), None)
             if not gpu_info:
-                error_msg = f"❌ [{current_time}] Cannot get GPU information"
+                error_msg = f"❌ [{current_time}] Cannot get GPU{gpu_index} information"
                 return (
                     error_msg,
                     0.0,
                     0.0,
                     0.0,
                     "Error",
+                    -1.0,
+                    0.0,
+                    0.0,
                     {"ui": {"text": error_msg}}
                 )
             
             # Real-time log (optional)
             if refresh_trigger > 0:
-                print(f"🔄 [{current_time}] GPU status update - usage: {gpu_info['percent']:.1f}%")
+                usage_info = ", ".join(f"GPU{g['index']} {g['percent']:.1f}%" for g in gpu_infos)
+                print(f"🔄 [{current_time}] GPU status update - usage: {usage_info}")
             
             # Generate status display
             status_display = self.generate_status_display(warning_threshold)
+            device = self.monitor_data['devices'].get(gpu_index)
+            trend = device['trend'] if device else None
             
             # Simple status string
-            status_text = f"GPU: {gpu_info['percent']:.1f}% ({gpu_info['used']:.1f}MB/{gpu_info['total']:.1f}MB)"
+            status_text = " | ".join(
+                f"GPU{g['index']}: {g['percent']:.1f}% ({g['used']:.1f}MB/{g['total']:.1f}MB)"
+                for g in gpu_infos
+            )
+            host_info = self.gpu_monitor.get_host_memory_info(max_age=update_interval)
+            if host_info is not None:
+                status_text += f" | RAM: {host_info['percent']:.1f}% (RSS {host_info['rss']:.1f}MB)"
             
             return (
                 status_text,
@@ -538,6 +1310,9 @@ class StrawberryGPUMonitor:
                 gpu_info['used'],
                 gpu_info['total'],
                 gpu_info['name'],
+                trend.seconds_until_full() if trend is not None else -1.0,
+                host_info['percent'] if host_info else 0.0,
+                host_info['rss'] if host_info else 0.0,
                 {"ui": {"text": status_display}}
             )
             
@@ -551,17 +1326,128 @@ class StrawberryGPUMonitor:
                 0.0,
                 0.0,
                 "Error",
+                -1.0,
+                0.0,
+                0.0,
                 {"ui": {"text": error_msg}}
             )
 
 
+class StrawberryNodeProfiler:
+    """Per-Node VRAM Profiler Node"""
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+    
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self.profiler = NodeProfiler.shared()
+            self.hooks = ComfyUIHooks(None)
+            self.last_reset_trigger = 0
+            self._initialized = True
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "profiling_enabled": (
+                    ["On", "Off"],
+                    {
+                        "default": "On",
+                        "tooltip": "Record allocated/reserved/peak VRAM deltas and wall time for every node of each prompt\nAdds a CUDA synchronize per node while enabled"
+                    }
+                ),
+                "sort_by": (
+                    ["peak", "time", "allocated", "reserved"],
+                    {
+                        "default": "peak",
+                        "tooltip": "Ranking key for the report"
+                    }
+                ),
+                "top_n": (
+                    "INT",
+                    {
+                        "default": 15,
+                        "min": 1,
+                        "max": 200,
+                        "step": 1,
+                        "tooltip": "Number of node classes shown in the table"
+                    }
+                ),
+                "reset_trigger": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 9999,
+                        "step": 1,
+                        "tooltip": "Change this value to clear the collected statistics"
+                    }
+                )
+            }
+        }
+    
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("report", "report_json")
+    FUNCTION = "profile_nodes"
+    OUTPUT_NODE = True
+    CATEGORY = "StrawberryFist - system"
+    
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return time.time()
+    
+    def profile_nodes(self, profiling_enabled, sort_by, top_n, reset_trigger):
+        """Node profiler main function"""
+        try:
+            current_time = time.strftime("%H:%M:%S", time.localtime())
+            
+            if reset_trigger != self.last_reset_trigger:
+                self.last_reset_trigger = reset_trigger
+                if reset_trigger > 0:
+                    self.profiler.reset()
+                    print(f"🔬 [{current_time}] Node profile statistics cleared")
+            
+            enabled = profiling_enabled == "On"
+            if enabled != self.profiler.enabled:
+                print(f"🔬 [{current_time}] Node profiling {'enabled' if enabled else 'disabled'}")
+            self.profiler.enabled = enabled
+            if enabled:
+                try:
+                    self.hooks.register_node_hooks(self.profiler)
+                except Exception:
+                    pass
+            
+            report = self.profiler.format_table(sort_by, top_n)
+            report_json = self.profiler.to_json(sort_by, top_n)
+            return {
+                "ui": {"text": report},
+                "result": (report, report_json)
+            }
+            
+        except Exception as e:
+            current_time = time.strftime("%H:%M:%S", time.localtime())
+            error_msg = f"💥 [{current_time}] Node profiler error: {str(e)}"
+            print(error_msg)
+            return {
+                "ui": {"text": error_msg},
+                "result": (error_msg, "{}")
+            }
+
+
 # ComfyUI node registration
 NODE_CLASS_MAPPINGS = {
     "StrawberryVramOptimizer": StrawberryVramOptimizer,
-    "StrawberryGPUMonitor": StrawberryGPUMonitor
+    "StrawberryGPUMonitor": StrawberryGPUMonitor,
+    "StrawberryNodeProfiler": StrawberryNodeProfiler
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "StrawberryVramOptimizer": "StFist - VRAM Optimizer",
-    "StrawberryGPUMonitor": "StFist - GPU Monitor"
+    "StrawberryGPUMonitor": "StFist - GPU Monitor",
+    "StrawberryNodeProfiler": "StFist - Node VRAM Profiler"
 }
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""StrawberryFist headless GPU monitor.
+
+Runs without ComfyUI (and without importing torch): samples the GPUs at a
+high rate into the history store and prints a one-shot, top-like view.
+Also replays recorded prompt traces against cleanup policies (``simulate``).
+
+From the ComfyUI ``custom_nodes`` folder::
+
+    python -m <node folder> run --interval 0.1
+    python -m <node folder> top
+    python -m <node folder> simulate path/to/traces
+
+or from anywhere, by running the folder itself::
+
+    python path/to/<node folder> top
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+if __package__:
+    from .utils import GPUMonitor, GPUCoordinator, SamplerService, TimeSeriesStore, TelemetrySegment, format_host_memory, format_size, segment_path
+    from .utils import CleanupCostModel, load_trace, parse_policy, default_policies, compare_policies, summarize_recorded, format_comparison
+else:
+    # `python <node folder>` runs this file as a script with the folder on sys.path
+    from utils import GPUMonitor, GPUCoordinator, SamplerService, TimeSeriesStore, TelemetrySegment, format_host_memory, format_size, segment_path
+    from utils import CleanupCostModel, load_trace, parse_policy, default_policies, compare_policies, summarize_recorded, format_comparison
+
+
+def default_daemon_store_directory():
+    """History location of the daemon (STRAWBERRY_HISTORY_DIR → ~/.strawberryfist/history)
+
+    Unlike the GPU Monitor node it does not ask ComfyUI's folder_paths, so nothing from ComfyUI is imported.
+    """
+    return os.environ.get("STRAWBERRY_HISTORY_DIR") or os.path.join(os.path.expanduser("~"), ".strawberryfist", "history")
+
+
+def open_monitor(backend=None):
+    """Process monitor with the snapshot cache off (the daemon's sampler sets the pace)"""
+    if backend:
+        os.environ["STRAWBERRY_TELEMETRY_BACKEND"] = backend
+    monitor = GPUMonitor.shared()
+    monitor.set_cache_ttl(0.0)
+    return monitor
+
+
+class MonitorDaemon:
+    """Samples all GPUs through the shared sampler and appends every sample to the history store"""
+
+    def __init__(self, monitor, store, interval=0.1, coordinate=False):
+        self.monitor = monitor
+        self.store = store
+        self.interval = interval
+        self.coordinate = coordinate
+        self.sampler = SamplerService.shared()
+        self.sampler.min_interval = min(self.sampler.min_interval, interval)
+        self.subscription = None
+        self.coordinator = None
+        self.samples = 0
+        self.last_gpu_infos = []
+
+    def start(self):
+        if self.coordinate:
+            # The daemon becomes the sampling leader, so ComfyUI workers on this machine read its samples
+            self.coordinator = GPUCoordinator.shared()
+            self.coordinator.attach(self.monitor)
+        self.subscription = self.sampler.subscribe("headless_daemon", self.interval, self.on_sample)
+
+    def on_sample(self, gpu_infos, timestamp):
+        for gpu_info in gpu_infos:
+            self.store.append(timestamp, gpu_info['index'], gpu_info['percent'], gpu_info['used'])
+        self.last_gpu_infos = gpu_infos
+        self.samples += 1
+
+    def stop(self):
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
+        self.sampler.stop()
+        if self.coordinator is not None:
+            self.coordinator.detach(self.monitor)
+            self.coordinator = None
+        self.store.close()
+
+    def format_status(self, elapsed, cpu_time):
+        stats = self.store.get_stats()
+        usage = ", ".join(f"GPU{g['index']} {g['percent']:.1f}%" for g in self.last_gpu_infos) or "no GPU"
+        cpu = cpu_time / elapsed * 100 if elapsed > 0 else 0.0
+        line = (f"📡 [{time.strftime('%H:%M:%S')}] {usage} | {self.samples} samples "
+                f"({self.samples / elapsed if elapsed > 0 else 0.0:.1f}/s), {stats['written']} written, "
+                f"{stats['dropped']} dropped | CPU {cpu:.2f}%")
+        if self.coordinator is not None:
+            line += " | " + ("leader" if self.coordinator.is_leader else "follower")
+        return line
+
+
+def command_run(args):
+    monitor = open_monitor(args.backend)
+    store = TimeSeriesStore(directory=args.store, max_bytes=args.max_mb * 1024**2)
+    daemon = MonitorDaemon(monitor, store, interval=args.interval, coordinate=args.coordinate)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    print(f"🍓 [StrawberryFist] Headless monitor: backend {monitor.backend.name}, every {args.interval:g}s → {store.directory}")
+    start, cpu_start = time.monotonic(), time.process_time()
+    daemon.start()
+    try:
+        deadline = start + args.duration if args.duration > 0 else None
+        while not stop.is_set():
+            timeout = args.status_interval if args.status_interval > 0 else 3600.0
+            if deadline is not None:
+                timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+            if stop.wait(timeout):
+                break
+            if args.status_interval > 0:
+                print(daemon.format_status(time.monotonic() - start, time.process_time() - cpu_start), flush=True)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+    finally:
+        daemon.stop()
+    print(daemon.format_status(time.monotonic() - start, time.process_time() - cpu_start))
+    return 0
+
+
+def recent_stats(store, gpu, seconds, now):
+    """(mean, max) usage % over the last `seconds` from the 1s rollups, None without data"""
+    if '1s' not in store.files:
+        return None
+    rows = list(store.query('1s', start=now - seconds, gpu=gpu))
+    if not rows:
+        return None
+    return (sum(row['percent_mean'] for row in rows) / len(rows), max(row['percent_max'] for row in rows))
+
+
+def _column(value):
+    return f"{value:7.1f}" if value is not None else f"{'-':>7}"
+
+
+def render_top(monitor, store=None, segment=None, now=None):
+    """One-shot view of all GPUs, host memory, recent history and coordinated workers"""
+    now = time.time() if now is None else now
+    gpu_infos = monitor.get_all_gpu_info(max_age=0)
+    lines = [
+        f"🍓 StrawberryFist top — {socket.gethostname()} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))} "
+        f"(backend {monitor.backend.name}, {len(gpu_infos)} GPUs)",
+        "",
+        f"{'GPU':>3}  {'NAME':<24} {'USED / TOTAL':>19}  {'USAGE':<16} {'1m AVG':>7} {'1m MAX':>7} {'1h MAX':>7}"
+    ]
+    for g in gpu_infos:
+        filled = int(round(10 * g['percent'] / 100))
+        bar = "█" * filled + "░" * (10 - filled)
+        minute = recent_stats(store, g['index'], 60, now) if store is not None else None
+        hour = recent_stats(store, g['index'], 3600, now) if store is not None else None
+        lines.append(
+            f"{g['index']:>3}  {g['name'][:24]:<24} {format_size(g['used']):>8} / {format_size(g['total']):<8}  "
+            f"{bar} {g['percent']:5.1f}% "
+            f"{_column(minute and minute[0])} {_column(minute and minute[1])} {_column(hour and hour[1])}"
+        )
+    if not gpu_infos:
+        lines.append("  no GPU found")
+    lines.append("")
+    lines.append(format_host_memory(monitor.get_host_memory_info(max_age=0)))
+
+    if segment is not None:
+        processes = segment.read_processes(now)
+        snapshot = segment.read()
+        leader = f"leader pid {snapshot['leader_pid']}, {now - snapshot['timestamp']:.1f}s old" if snapshot else "no leader"
+        lines.append(f"🤝 Coordinated workers: {len(processes)} ({leader})")
+        for process in processes:
+            budget = f" / budget {format_size(process['budget_mb'])}" if process['budget_mb'] else ""
+            lines.append(f"   pid {process['pid']}: reserved {format_size(process['reserved_mb'])}{budget}")
+
+    if store is not None and 'raw' in store.files:
+        last = None
+        for row in store.query('raw', start=now - 60):
+            last = row['timestamp']
+        age = f"last sample {now - last:.1f}s ago" if last is not None else "no sample in the last minute"
+        lines.append(f"💾 History: {store.directory} ({len(store.files['raw'])} raw records, {age})")
+    return "\n".join(lines)
+
+
+def command_top(args):
+    monitor = open_monitor(args.backend)
+    store = None
+    try:
+        store = TimeSeriesStore(directory=args.store, read_only=True)
+    except (OSError, ValueError):
+        pass
+    segment = None
+    path = segment_path()
+    if os.path.exists(path):
+        segment = TelemetrySegment(path)
+    try:
+        print(render_top(monitor, store, segment))
+    finally:
+        if store is not None:
+            store.close()
+        if segment is not None:
+            segment.close()
+    return 0
+
+
+def command_simulate(args):
+    paths = args.traces or ([os.environ["STRAWBERRY_TRACE_DIR"]] if os.environ.get("STRAWBERRY_TRACE_DIR") else [])
+    if not paths:
+        print("No trace given: pass trace files or folders, or set STRAWBERRY_TRACE_DIR", file=sys.stderr)
+        return 2
+    prompts, cleanups = load_trace(paths)
+    if not prompts:
+        print(f"No prompt records found in {', '.join(paths)}", file=sys.stderr)
+        return 1
+    try:
+        policies = [parse_policy(spec) for spec in args.policy] if args.policy else default_policies(args.threshold)
+    except ValueError as e:
+        print(f"Invalid --policy: {e}", file=sys.stderr)
+        return 2
+
+    results = compare_policies(prompts, cleanups, policies, args.margin_mb, args.malloc_ms_per_gb)
+    recorded = summarize_recorded(prompts, cleanups)
+    if args.json:
+        print(json.dumps({'recorded': recorded, 'results': results}, indent=2))
+    else:
+        print(format_comparison(results, recorded, CleanupCostModel(cleanups)))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="strawberryfist", description="StrawberryFist headless GPU monitor (no ComfyUI required)")
+    parser.add_argument("--backend", choices=["nvml", "torch", "gputil", "fake"],
+                        help="telemetry backend (default: STRAWBERRY_TELEMETRY_BACKEND or automatic)")
+    parser.add_argument("--store", default=default_daemon_store_directory(), help="history store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="sample the GPUs into the history store until stopped")
+    run.add_argument("--interval", type=float, default=0.1, help="sampling period in seconds")
+    run.add_argument("--max-mb", type=float, default=64.0, help="history store size limit")
+    run.add_argument("--status-interval", type=float, default=10.0, help="seconds between status lines (0 = quiet)")
+    run.add_argument("--duration", type=float, default=0.0, help="stop after this many seconds (0 = run until SIGINT/SIGTERM)")
+    run.add_argument("--coordinate", action="store_true",
+                     help="publish samples to the shared segment read by ComfyUI workers with multi_process On")
+    run.set_defaults(handler=command_run)
+
+    top = commands.add_parser("top", help="print a one-shot view of GPUs, host memory and recent history")
+    top.set_defaults(handler=command_top)
+
+    simulate = commands.add_parser("simulate", help="replay recorded prompt traces against cleanup policies (CPU only)")
+    simulate.add_argument("traces", nargs="*", help="trace files or folders (default: STRAWBERRY_TRACE_DIR)")
+    simulate.add_argument("--policy", action="append",
+                          help="policy to simulate, e.g. 'auto_clean=Only When High,threshold=80,clear_mode=Aggressive' "
+                               "(repeatable; default: a grid of the node's modes)")
+    simulate.add_argument("--threshold", type=float, default=70.0, help="usage threshold of the default Only When High policies")
+    simulate.add_argument("--margin-mb", type=float, default=512.0, help="free memory below which a prompt counts as near OOM")
+    simulate.add_argument("--malloc-ms-per-gb", type=float, default=1.0,
+                          help="assumed cost of re-allocating released cache from the driver")
+    simulate.add_argument("--json", action="store_true", help="print results as JSON")
+    simulate.set_defaults(handler=command_simulate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Simulated CUDA allocator and ComfyUI executor for CPU-only benchmarks."""
+import time
+import types
+from contextlib import contextmanager
+
+MB = 1024**2
+
+
+class OutOfMemoryError(RuntimeError):
+    pass
+
+
+class FakeCudaAllocator:
+    """Minimal stand-in for ``torch.cuda`` backed by per-device counters.
+
+    Memory changes are mirrored into a telemetry ``FakeBackend`` (if given), so
+    the monitor sees driver-level usage = reserved memory + context overhead.
+    """
+
+    OutOfMemoryError = OutOfMemoryError
+
+    def __init__(self, devices=1, total_mb=24576.0, context_mb=300.0, backend=None):
+        self.total = [total_mb * MB] * devices
+        self.context = context_mb * MB
+        self.allocated = [0.0] * devices
+        self.reserved = [0.0] * devices
+        self.peak_reserved = [0.0] * devices
+        self.inactive_split = [0.0] * devices
+        self.current = 0
+        self.backend = backend
+        self._sync_backend()
+
+    def _index(self, device):
+        if device is None:
+            return self.current
+        return getattr(device, 'index', device) or 0
+
+    def _sync_backend(self):
+        if self.backend is not None:
+            for index in range(len(self.total)):
+                self.backend.set_used((self.reserved[index] + self.context) / MB, index)
+
+    # Allocation simulation
+    def alloc(self, mb, device=None):
+        index = self._index(device)
+        size = mb * MB
+        if self.reserved[index] - self.allocated[index] < size:
+            grow = size - (self.reserved[index] - self.allocated[index])
+            if self.reserved[index] + grow + self.context > self.total[index]:
+                raise OutOfMemoryError(f"CUDA out of memory. Tried to allocate {mb:.2f} MiB")
+            self.reserved[index] += grow
+        self.allocated[index] += size
+        # Reused blocks are split; a small share stays fragmented
+        self.inactive_split[index] = min(self.reserved[index] - self.allocated[index], self.inactive_split[index] + size * 0.02)
+        self.peak_reserved[index] = max(self.peak_reserved[index], self.reserved[index])
+        self._sync_backend()
+
+    def free(self, mb, device=None):
+        index = self._index(device)
+        self.allocated[index] = max(0.0, self.allocated[index] - mb * MB)
+
+    # torch.cuda API used by the plugin
+    def is_available(self):
+        return True
+
+    def device_count(self):
+        return len(self.total)
+
+    def current_device(self):
+        return self.current
+
+    @contextmanager
+    def device(self, device):
+        previous, self.current = self.current, self._index(device)
+        try:
+            yield
+        finally:
+            self.current = previous
+
+    def memory_allocated(self, device=None):
+        return self.allocated[self._index(device)]
+
+    def memory_reserved(self, device=None):
+        return self.reserved[self._index(device)]
+
+    def max_memory_reserved(self, device=None):
+        return self.peak_reserved[self._index(device)]
+
+    def max_memory_allocated(self, device=None):
+        return self.peak_reserved[self._index(device)]
+
+    def reset_peak_memory_stats(self, device=None):
+        index = self._index(device)
+        self.peak_reserved[index] = self.reserved[index]
+
+    def memory_stats(self, device=None):
+        index = self._index(device)
+        return {
+            'allocated_bytes.all.current': self.allocated[index],
+            'reserved_bytes.all.current': self.reserved[index],
+            'inactive_split_bytes.all.current': self.inactive_split[index]
+        }
+
+    def mem_get_info(self, device=None):
+        index = self._index(device)
+        used = self.reserved[index] + self.context
+        return self.total[index] - used, self.total[index]
+
+    def empty_cache(self):
+        index = self.current
+        self.reserved[index] = self.allocated[index]
+        self.inactive_split[index] = 0.0
+        self._sync_backend()
+
+    def ipc_collect(self):
+        pass
+
+    def synchronize(self, device=None):
+        pass
+
+
+def make_fake_torch(allocator):
+    """Module-like object exposing ``allocator`` as ``torch.cuda``."""
+    return types.SimpleNamespace(cuda=allocator)
+
+
+class StubPromptExecutor:
+    """Stand-in for ``execution.PromptExecutor`` that allocates like a diffusion prompt.
+
+    ``inner_time`` is the time spent inside the simulated prompt, so callers can
+    subtract it from the hooked call to get the plugin's overhead.
+    """
+
+    allocator = None
+    work_mb = 2048.0
+    nodes = 6
+
+    def __init__(self, server=None, *args, **kwargs):
+        self.server = server
+        self.success = True
+        self.status_messages = []
+        self.inner_time = 0.0
+
+    def execute(self, prompt, prompt_id, extra_data={}, execute_outputs=[]):
+        start = time.perf_counter()
+        self.success = True
+        self.status_messages = []
+        self.history_result = {'outputs': {}, 'meta': {}}
+        allocator = self.allocator
+        per_node = self.work_mb / self.nodes
+        try:
+            for _ in prompt:
+                allocator.alloc(per_node)
+            # Activations are released, weights and cache stay reserved
+            allocator.free(per_node * max(0, len(prompt) - 1))
+        except OutOfMemoryError as e:
+            self.success = False
+            self.status_messages.append(('execution_error', {
+                'exception_type': 'torch.OutOfMemoryError',
+                'exception_message': str(e)
+            }))
+        finally:
+            allocator.free(allocator.allocated[allocator.current] / MB)
+            self.inner_time = time.perf_counter() - start
+
+
+def make_execution_module(allocator, work_mb=2048.0):
+    """Stub ``execution`` module to place in ``sys.modules`` before the hooks register."""
+    executor_class = type("PromptExecutor", (StubPromptExecutor,), {'allocator': allocator, 'work_mb': work_mb})
+    module = types.ModuleType("execution")
+    module.PromptExecutor = executor_class
+    return module
+
+
+def make_prompt(nodes=6, seed=0):
+    """Small text-to-image style prompt graph."""
+    prompt = {
+        "1": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "model.safetensors"}},
+        "2": {"class_type": "CLIPTextEncode", "inputs": {"text": "a strawberry", "clip": ["1", 1]}},
+        "3": {"class_type": "EmptyLatentImage", "inputs": {"width": 1024, "height": 1024, "batch_size": 1}},
+        "4": {"class_type": "KSampler", "inputs": {"seed": seed, "steps": 20, "model": ["1", 0], "positive": ["2", 0]}},
+        "5": {"class_type": "VAEDecode", "inputs": {"samples": ["4", 0], "vae": ["1", 2]}},
+        "6": {"class_type": "SaveImage", "inputs": {"images": ["5", 0], "filename_prefix": "bench"}}
+    }
+    return dict(list(prompt.items())[:nodes])
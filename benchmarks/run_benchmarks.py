@@ -0,0 +1,248 @@
+"""Per-prompt overhead benchmarks for the StrawberryFist nodes.
+
+Runs on a CPU-only machine: the GPU, the CUDA allocator and ComfyUI's
+``execution.PromptExecutor`` are simulated (see ``fakes.py``). Results are
+written as JSON; pass ``--baseline`` to fail on regressions.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+from fakes import FakeCudaAllocator, make_execution_module, make_fake_torch, make_prompt
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+CONFIGURATIONS = {
+    'disabled': {'enabled': "Off"},
+    'every_time_sync': {'auto_clean': "Every Time", 'cleanup_execution': "Sync"},
+    'every_time_async': {'auto_clean': "Every Time", 'cleanup_execution': "Async"},
+    'only_when_high_sync': {'auto_clean': "Only When High", 'cleanup_execution': "Sync"},
+    'predictive_sync': {'auto_clean': "Predictive", 'cleanup_execution': "Sync"},
+    'both_timings_sync': {'auto_clean': "Every Time", 'run_timing': "Both", 'cleanup_execution': "Sync"},
+}
+
+BASE_SETTINGS = {
+    'enabled': "On",
+    'clear_mode': "Standard",
+    'auto_clean': "Every Time",
+    'run_timing': "After Queue",
+    'force_run': 0,
+    'cleanup_execution': "Sync",
+    # Every prompt should pay for a real cleanup, not a rate-limit skip
+    'min_interval': 0.0,
+    'min_reclaim_mb': 0.0
+}
+
+# Ignore p50 differences below this (ms), they are timer noise
+NOISE_FLOOR_MS = 0.05
+
+
+def load_package():
+    """Import the node package from its folder (folder names may not be identifiers)."""
+    spec = importlib.util.spec_from_file_location(
+        "strawberry_vram_optimizer", PACKAGE_DIR / "__init__.py",
+        submodule_search_locations=[str(PACKAGE_DIR)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def summarize(samples):
+    """Percentiles (ms) of a list of durations in seconds."""
+    ordered = sorted(s * 1000 for s in samples)
+    count = len(ordered)
+
+    def percentile(q):
+        return ordered[min(count - 1, max(0, -(-q * count // 100) - 1))]
+
+    return {
+        'count': count,
+        'mean': sum(ordered) / count,
+        'min': ordered[0],
+        'p50': percentile(50),
+        'p90': percentile(90),
+        'p99': percentile(99),
+        'max': ordered[-1]
+    }
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class Harness:
+    """Wires the nodes to the simulated GPU and executor."""
+
+    def __init__(self, devices=1, work_mb=2048.0):
+        os.environ["STRAWBERRY_TELEMETRY_BACKEND"] = "fake"
+        # Every read below should hit the backend unless a benchmark asks for the cache
+        os.environ.setdefault("STRAWBERRY_TELEMETRY_CACHE_TTL", "0")
+
+        self.package = load_package()
+        utils = sys.modules["strawberry_vram_optimizer.utils"]
+
+        self.backend = utils.FakeBackend(devices=devices)
+        self.monitor = utils.GPUMonitor.shared()
+        self.monitor._backend = self.backend
+
+        self.allocator = FakeCudaAllocator(devices=devices, backend=self.backend)
+        sys.modules["execution"] = make_execution_module(self.allocator, work_mb)
+
+        self.optimizer = self.package.StrawberryVramOptimizer()
+        fake_torch = make_fake_torch(self.allocator)
+        self.optimizer.vram_cleaner._torch = fake_torch
+        self.gpu_node = self.package.StrawberryGPUMonitor()
+        self.utils = utils
+
+    def configure(self, overrides):
+        settings = dict(BASE_SETTINGS, **overrides)
+        self.optimizer.setup_and_run(**settings)
+        self.optimizer.cleanup_worker.wait_idle(timeout=5)
+
+    def run_prompt(self, executor, prompt, prompt_id):
+        """Hooked execute; returns the plugin's share of the call (seconds)."""
+        start = time.perf_counter()
+        executor.execute(prompt, prompt_id)
+        total = time.perf_counter() - start
+        return total - executor.inner_time
+
+
+def bench_hook_overhead(harness, iterations):
+    results = {}
+    execution = sys.modules["execution"]
+    for name, overrides in CONFIGURATIONS.items():
+        harness.configure(overrides)
+        executor = execution.PromptExecutor(None)
+        overhead = []
+        cleanup = []
+        for i in range(iterations):
+            overhead.append(harness.run_prompt(executor, make_prompt(seed=i), f"{name}-{i}"))
+            # Let async cleanups finish outside the measured window
+            harness.optimizer.cleanup_worker.wait_idle(timeout=5)
+        for i in range(iterations):
+            harness.allocator.alloc(512)
+            harness.allocator.free(512)
+            start = time.perf_counter()
+            harness.optimizer.perform_vram_cleanup(force_run=True, reason="benchmark")
+            cleanup.append(time.perf_counter() - start)
+        results[name] = {
+            'hook_overhead': summarize(overhead),
+            'cleanup_latency': summarize(cleanup)
+        }
+    return results
+
+
+def bench_sampling(harness, iterations):
+    monitor = harness.monitor
+    return {
+        'sample_uncached': summarize(timed(lambda: monitor.get_all_gpu_info(max_age=0), iterations)),
+        'sample_cached': summarize(timed(lambda: monitor.get_all_gpu_info(max_age=3600), iterations))
+    }
+
+
+def bench_render(harness, iterations):
+    node = harness.gpu_node
+    results = {}
+    for history_length in (60, 3600, 86400):
+        node.monitor_data['devices'] = {}
+        node.settings['history_length'] = history_length
+        now = time.time()
+        gpu_infos = harness.monitor.get_all_gpu_info(max_age=0)
+        for i in range(history_length):
+            for gpu_info in gpu_infos:
+                gpu_info = dict(gpu_info, percent=40 + (i % 50), used=10000 + i % 5000)
+                node.on_sample([gpu_info], now - history_length + i)
+        results[f'monitor_render_{history_length}'] = summarize(
+            timed(lambda: node.generate_status_display(80.0), iterations))
+
+    registry = harness.utils.MetricsRegistry.shared()
+    results['metrics_render'] = summarize(timed(registry.render, iterations))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Metrics whose p50 regressed by more than ``tolerance`` against the baseline."""
+    regressions = []
+
+    def walk(current, previous, path):
+        if 'p50' in current and 'p50' in previous:
+            limit = previous['p50'] * (1 + tolerance)
+            if current['p50'] > limit and current['p50'] - previous['p50'] > NOISE_FLOOR_MS:
+                regressions.append({'metric': path, 'baseline_p50': previous['p50'], 'p50': current['p50']})
+            return
+        for key, value in current.items():
+            if isinstance(value, dict) and isinstance(previous.get(key), dict):
+                walk(value, previous[key], f"{path}.{key}" if path else key)
+
+    walk(results, baseline, "")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StrawberryFist overhead benchmarks (CPU-only)")
+    parser.add_argument("--iterations", type=int, default=200, help="samples per measurement")
+    parser.add_argument("--devices", type=int, default=1, help="number of simulated GPUs")
+    parser.add_argument("--output", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="previous JSON results; exit 1 if any p50 regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown ratio")
+    parser.add_argument("--verbose", action="store_true", help="show the nodes' console output")
+    args = parser.parse_args(argv)
+
+    # The nodes log every cleanup; keep terminal I/O out of the measurements
+    sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with sink:
+        harness = Harness(devices=args.devices)
+        results = {
+            'configurations': bench_hook_overhead(harness, args.iterations),
+            'telemetry': bench_sampling(harness, args.iterations * 10),
+            'render': bench_render(harness, args.iterations)
+        }
+        harness.optimizer.cleanup_worker.stop()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'devices': args.devices,
+            'unit': 'ms'
+        },
+        'results': results
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(results, baseline.get('results', {}), args.tolerance)
+        exit_code = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,3 @@
-from .comfyui_hooks import ComfyUIHooks
+from .comfyui_hooks import ComfyUIHooks, register_server_routes
 
-__all__ = ['ComfyUIHooks']
\ No newline at end of file
+__all__ = ['ComfyUIHooks', 'register_server_routes']
\ No newline at end of file
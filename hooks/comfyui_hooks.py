@@ -1,4 +1,159 @@
+import sys
 import time
+import asyncio
+import functools
+import json
+from ..utils import StrawberryMetrics, MetricsRegistry, TelemetryStream, TimeSeriesStore, NodeProfiler, PromptPeakTracker, attach_to_history, format_sse, is_oom_error, find_executor_oom
+
+# 프록시가 유휴 SSE 연결을 끊지 않도록 보내는 keep-alive 주기 (초)
+STREAM_KEEPALIVE = 15.0
+
+
+def register_server_routes():
+    """PromptServer에 StrawberryFist HTTP 라우트 등록 (서버 시작 전, 패키지 import 시점에 호출)
+
+    ComfyUI가 custom node를 불러올 때는 server 모듈이 이미 로드되어 있다. 로드되어 있지 않으면
+    ComfyUI 밖(헤드리스 모니터 등)이므로 import하지 않고 건너뛴다.
+    """
+    server = sys.modules.get('server')
+    if server is None:
+        return False
+    try:
+        from aiohttp import web
+    except ImportError:
+        return False
+    
+    if hasattr(server, '_strawberry_routes_registered'):
+        return True
+    
+    prompt_server = getattr(getattr(server, 'PromptServer', None), 'instance', None)
+    if prompt_server is None:
+        return False
+    
+    # 메트릭 정의 등록 (스크레이프 시 모든 시리즈 노출)
+    StrawberryMetrics.shared()
+    
+    @prompt_server.routes.get("/strawberry/metrics")
+    async def strawberry_metrics(request):
+        return web.Response(
+            text=MetricsRegistry.shared().render(),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={"X-Content-Type-Options": "nosniff"}
+        )
+    
+    @prompt_server.routes.get("/strawberry/telemetry")
+    async def strawberry_telemetry(request):
+        """GPU 텔레메트리 SSE 스트림 (?interval=초, 첫 이벤트 snapshot 이후 delta)"""
+        stream = TelemetryStream.shared()
+        try:
+            interval = float(request.query['interval']) if 'interval' in request.query else None
+        except ValueError:
+            return web.Response(status=400, text="interval must be a number")
+        
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        subscriber = stream.subscribe(interval, notify=lambda: loop.call_soon_threadsafe(wakeup.set))
+        
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        try:
+            await response.prepare(request)
+            while True:
+                wakeup.clear()
+                event = stream.next_event(subscriber)
+                if event is not None:
+                    # write()는 전송 버퍼가 빠질 때까지 대기 → 느린 클라이언트는 델타가 병합됨
+                    await response.write(format_sse(*event))
+                    await asyncio.sleep(subscriber.interval)
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+        except ConnectionResetError:
+            pass
+        finally:
+            stream.unsubscribe(subscriber)
+        return response
+    
+    @prompt_server.routes.get("/strawberry/history")
+    async def strawberry_history(request):
+        """저장된 GPU 기록 스트리밍 내보내기 (?level=raw|1s|1m|1h&format=csv|json&gpu=&start=&end=)"""
+        query = request.query
+        fmt = query.get('format', 'csv')
+        try:
+            gpu = int(query['gpu']) if 'gpu' in query else None
+            start = float(query['start']) if 'start' in query else None
+            end = float(query['end']) if 'end' in query else None
+            # 기록 저장소를 열지 않는다 (persist_history Off이거나 다른 프로세스가 폴더에 기록 중일 수 있음)
+            chunks = TimeSeriesStore.export_all(None, query.get('level', '1m'), fmt, start, end, gpu)
+        except ValueError as e:
+            return web.Response(status=400, text=str(e))
+        except OSError as e:
+            return web.Response(status=503, text=f"history store unavailable: {e}")
+        
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/csv; charset=utf-8" if fmt == 'csv' else "application/json",
+            "Content-Disposition": f"attachment; filename=strawberry_history.{fmt}"
+        })
+        await response.prepare(request)
+        buffer = []
+        for chunk in chunks:
+            buffer.append(chunk)
+            if len(buffer) >= 512:
+                await response.write("".join(buffer).encode("utf-8"))
+                buffer = []
+        if buffer:
+            await response.write("".join(buffer).encode("utf-8"))
+        await response.write_eof()
+        return response
+    
+    @prompt_server.routes.get("/strawberry/prompts")
+    async def strawberry_prompts(request):
+        """최근 프롬프트별 VRAM 피크 (?limit=50&fingerprint=)"""
+        try:
+            limit = int(request.query.get('limit', 50))
+        except ValueError:
+            return web.Response(status=400, text="limit must be an integer")
+        records = PromptPeakTracker.shared().recent(limit, request.query.get('fingerprint'))
+        return web.json_response({'prompts': records}, dumps=lambda data: json.dumps(data, default=str))
+    
+    @prompt_server.routes.get("/strawberry/prompts/{prompt_id}")
+    async def strawberry_prompt(request):
+        """프롬프트 하나의 VRAM 피크 기록"""
+        record = PromptPeakTracker.shared().get(request.match_info['prompt_id'])
+        if record is None:
+            return web.Response(status=404, text="unknown prompt_id (not executed or no longer kept)")
+        return web.json_response(record, dumps=lambda data: json.dumps(data, default=str))
+    
+    server._strawberry_routes_registered = True
+    print(f"🍓 [StrawberryFist] /strawberry/metrics, /strawberry/telemetry, /strawberry/history, /strawberry/prompts 라우트 등록 완료!")
+    return True
+
+
+def _resolve_node(args, kwargs):
+    """execution.execute 인자에서 (prompt_id, node_id, class_type) 추출"""
+    prompt = kwargs.get('dynprompt', args[1] if len(args) > 1 else None)
+    if prompt is None:
+        prompt = kwargs.get('prompt')
+    node_id = kwargs.get('current_item', args[3] if len(args) > 3 else None)
+    prompt_id = kwargs.get('prompt_id', args[6] if len(args) > 6 else None)
+    
+    class_type = "Unknown"
+    try:
+        if hasattr(prompt, 'get_node'):
+            class_type = prompt.get_node(node_id)['class_type']
+        elif isinstance(prompt, dict):
+            class_type = prompt[node_id]['class_type']
+    except Exception:
+        pass
+    
+    return prompt_id, node_id, class_type
+
 
 class ComfyUIHooks:
     """ComfyUI 훅 시스템 관리 클래스"""
@@ -17,22 +172,77 @@ class ComfyUIHooks:
             original_execute = execution.PromptExecutor.execute
             
             def hooked_execute(self_executor, prompt, prompt_id, extra_data={}, execute_outputs=[]):
+                hook_start = time.perf_counter()
                 current_time = time.strftime("%H:%M:%S", time.localtime())
                 
-                # 큐 실행 전 정리
-                if self.optimizer_instance.settings['run_timing'] in ['Before Queue', 'Both']:
-                    print(f"\n🔥 [{current_time}] ═══ 큐 실행 전 VRAM 정리 시작 (ID: {prompt_id}) ═══")
-                    self.optimizer_instance.perform_vram_cleanup(reason=f"큐 실행 전 (ID: {prompt_id})")
-                    print(f"🔥 [{current_time}] ═══ 큐 실행 전 VRAM 정리 완료 ═══\n")
+                optimizer = self.optimizer_instance
+                worker = optimizer.cleanup_worker
                 
-                # 원래 실행
-                result = original_execute(self_executor, prompt, prompt_id, extra_data, execute_outputs)
+                # 대기 중인 백그라운드 정리 처리 (Wait: 먼저 실행 / Cancel: 취소 / Defer: 프롬프트 이후로 보류)
+                if worker.is_pending():
+                    if optimizer.settings['pending_cleanup'] == 'Wait':
+                        worker.wait_idle()
+                    elif optimizer.settings['pending_cleanup'] == 'Cancel':
+                        worker.cancel_pending()
+                worker.pause()
                 
-                # 큐 실행 후 정리
-                if self.optimizer_instance.settings['run_timing'] in ['After Queue', 'Both']:
-                    print(f"\n🔥 [{current_time}] ═══ 큐 실행 후 VRAM 정리 시작 (ID: {prompt_id}) ═══")
-                    self.optimizer_instance.perform_vram_cleanup(reason=f"큐 실행 후 (ID: {prompt_id})")
-                    print(f"🔥 [{current_time}] ═══ 큐 실행 후 VRAM 정리 완료 ═══\n")
+                try:
+                    # 큐 실행 전 정리
+                    if optimizer.settings['run_timing'] in ['Before Queue', 'Both'] and optimizer.is_cleanup_deferred_for(prompt):
+                        print(f"♻️ [{current_time}] 보류 중인 정리와 같은 모델 구성 → 큐 실행 전 정리 생략 (ID: {prompt_id})")
+                    elif optimizer.settings['run_timing'] in ['Before Queue', 'Both']:
+                        print(f"\n🔥 [{current_time}] ═══ 큐 실행 전 VRAM 정리 시작 (ID: {prompt_id}) ═══")
+                        optimizer.perform_vram_cleanup(reason=f"큐 실행 전 (ID: {prompt_id})", prompt=prompt)
+                        print(f"🔥 [{current_time}] ═══ 큐 실행 전 VRAM 정리 완료 ═══\n")
+                    
+                    # 원래 실행 (전후로 프롬프트 단위 통계 수집)
+                    optimizer.on_prompt_start(prompt, prompt_id)
+                    # 피크 카운터는 실행 전 정리 이후에 초기화해야 프롬프트 자체의 피크만 남는다
+                    prompt_peaks = optimizer.prompt_peaks
+                    prompt_peaks.begin(prompt_id, prompt, optimizer.last_fingerprint)
+                    execute_start = time.perf_counter()
+                    try:
+                        # OOM 발생 시 정리 후 재시도 (oom_retries = 0이면 그대로 실행)
+                        result = optimizer.oom_recovery.run(
+                            lambda: original_execute(self_executor, prompt, prompt_id, extra_data, execute_outputs),
+                            self_executor,
+                            prompt_id
+                        )
+                    except BaseException as e:
+                        optimizer.record_trace(prompt_peaks.end(prompt_id, success=False), oom=is_oom_error(e))
+                        raise
+                    execute_time = time.perf_counter() - execute_start
+                    
+                    # 프롬프트 피크 기록 → ComfyUI history 항목에 함께 저장
+                    profiler = NodeProfiler.shared()
+                    peak_record = prompt_peaks.end(
+                        prompt_id,
+                        success=getattr(self_executor, 'success', True),
+                        node_peak_allocated=profiler.get_prompt_peak() if profiler.enabled else None,
+                        node_peak_reserved=profiler.get_prompt_peak('peak_reserved') if profiler.enabled else None
+                    )
+                    attach_to_history(self_executor, peak_record)
+                    optimizer.record_trace(peak_record, oom=find_executor_oom(self_executor) is not None)
+                    optimizer.on_prompt_end(prompt, prompt_id)
+                    
+                    # 큐 실행 후 정리 (워커 재개 전에 실행: 프롬프트 중 쌓인 예측/idle 정리 요청이 그 뒤에 속도 제한을 거친다)
+                    if optimizer.settings['run_timing'] in ['After Queue', 'Both']:
+                        if optimizer.defer_after_queue_cleanup():
+                            # 다음 프롬프트가 같은 모델을 쓰면 따뜻한 할당자 블록을 유지 (모델 변경/큐 idle 시 정리)
+                            print(f"♻️ [{current_time}] 다음 프롬프트가 같은 모델 구성 사용 → 큐 실행 후 정리 보류 (ID: {prompt_id})")
+                        elif optimizer.settings['cleanup_execution'] == 'Async':
+                            # 백그라운드 워커에 요청 (연속 요청은 한 번으로 병합)
+                            worker.request(f"큐 실행 후 (ID: {prompt_id})")
+                        else:
+                            print(f"\n🔥 [{current_time}] ═══ 큐 실행 후 VRAM 정리 시작 (ID: {prompt_id}) ═══")
+                            optimizer.perform_vram_cleanup(reason=f"큐 실행 후 (ID: {prompt_id})")
+                            print(f"🔥 [{current_time}] ═══ 큐 실행 후 VRAM 정리 완료 ═══\n")
+                finally:
+                    worker.resume()
+                
+                # 프롬프트당 훅 오버헤드 (원래 실행 시간 제외)
+                optimizer.metrics.prompts.inc()
+                optimizer.metrics.hook_overhead.observe(time.perf_counter() - hook_start - execute_time)
                 
                 return result
             
@@ -44,6 +254,48 @@ class ComfyUIHooks:
             print(f"🍓 [StrawberryFist] execution 훅 등록 실패: {e}")
             raise
     
+    def register_node_hooks(self, profiler):
+        """노드 단위 실행 함수 훅 등록 (노드별 VRAM 프로파일링)"""
+        try:
+            import execution
+            
+            if hasattr(execution, '_strawberry_node_hooked'):
+                return
+            
+            # 최신 ComfyUI는 execute, 이전 버전은 recursive_execute
+            function_name = 'execute' if hasattr(execution, 'execute') else 'recursive_execute'
+            original_function = getattr(execution, function_name)
+            
+            def begin(args, kwargs):
+                prompt_id, node_id, class_type = _resolve_node(args, kwargs)
+                if prompt_id != getattr(profiler, 'current_prompt_id', None):
+                    profiler.current_prompt_id = prompt_id
+                    profiler.begin_prompt()
+                return profiler.profile_node(node_id, class_type)
+            
+            if asyncio.iscoroutinefunction(original_function):
+                @functools.wraps(original_function)
+                async def hooked_node_execute(*args, **kwargs):
+                    if not profiler.enabled:
+                        return await original_function(*args, **kwargs)
+                    with begin(args, kwargs):
+                        return await original_function(*args, **kwargs)
+            else:
+                @functools.wraps(original_function)
+                def hooked_node_execute(*args, **kwargs):
+                    if not profiler.enabled:
+                        return original_function(*args, **kwargs)
+                    with begin(args, kwargs):
+                        return original_function(*args, **kwargs)
+            
+            setattr(execution, function_name, hooked_node_execute)
+            execution._strawberry_node_hooked = True
+            print(f"🍓 [StrawberryFist] 노드 프로파일러 훅 등록 완료! ({function_name})")
+            
+        except Exception as e:
+            print(f"🍓 [StrawberryFist] 노드 프로파일러 훅 등록 실패: {e}")
+            raise
+    
     def register_server_hooks(self):
         """server 모듈 훅 등록"""
         try:
@@ -52,17 +304,10 @@ class ComfyUIHooks:
             if hasattr(server, '_strawberry_server_hooked'):
                 return
             
-            # PromptServer 후킹 시도
+            # 라우트는 서버 시작 전에만 추가 가능 (패키지 import 시 이미 등록되었을 수 있음)
             if hasattr(server, 'PromptServer'):
-                original_prompt_handler = None
-                
-                # 기존 핸들러 찾기
-                for handler in server.PromptServer.instance.app.router._resources:
-                    if hasattr(handler, '_path') and '/prompt' in str(handler._path):
-                        original_prompt_handler = handler
-                        break
-                
                 print(f"🍓 [StrawberryFist] server 훅 등록 시도...")
+                register_server_routes()
                 server._strawberry_server_hooked = True
                 
         except Exception as e:
@@ -7,6 +7,7 @@ import os
 import sys
 import subprocess
 import importlib.util
+from importlib import metadata
 
 def install_package(package_name):
     """Install a Python package using pip"""
@@ -20,17 +21,28 @@ def install_package(package_name):
 
 def check_package(package_name):
     """Check if a package is already installed"""
-    spec = importlib.util.find_spec(package_name)
-    return spec is not None
+    try:
+        metadata.version(package_name)
+        return True
+    except metadata.PackageNotFoundError:
+        spec = importlib.util.find_spec(package_name)
+        return spec is not None
+
+def read_requirements():
+    """Read required packages from requirements.txt next to this script"""
+    requirements_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "requirements.txt")
+    if not os.path.exists(requirements_file):
+        return ["GPUtil>=1.4.0"]
+    
+    with open(requirements_file, encoding="utf-8") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
 
 def main():
     print("🍓 StrawberryFist VRAM Optimizer Installation")
     print("=" * 50)
     
     # Required packages
-    required_packages = [
-        "GPUtil>=1.4.0",
-    ]
+    required_packages = read_requirements()
     
     print("📋 Checking required packages...")
     
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# __main__.py 스크립트 실행처럼 utils를 최상위 패키지로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
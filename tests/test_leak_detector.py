@@ -0,0 +1,106 @@
+import types
+
+import pytest
+
+from utils.leak_detector import TensorLeakDetector
+
+
+class FakeDevice:
+    def __init__(self, name):
+        self.type = name.split(':')[0]
+        self._name = name
+
+    def __str__(self):
+        return self._name
+
+
+class FakeTensor:
+    """torch 없이 탐지기를 검증하기 위한 최소 텐서"""
+
+    def __init__(self, shape, device="cpu", dtype="torch.float32", itemsize=4):
+        self.shape = shape
+        self.dtype = dtype
+        self.device = FakeDevice(device)
+        self._itemsize = itemsize
+
+    def element_size(self):
+        return self._itemsize
+
+    def nelement(self):
+        count = 1
+        for dim in self.shape:
+            count *= dim
+        return count
+
+
+class Cache:
+    def __init__(self):
+        self.items = []
+
+
+fake_torch = types.SimpleNamespace(Tensor=FakeTensor)
+
+
+def test_unavailable_without_tensor_type():
+    detector = TensorLeakDetector(device="cpu", torch_module=types.SimpleNamespace())
+    assert not detector.is_available()
+    assert detector.step() is None
+
+
+def test_reports_growth_of_fake_tensors():
+    detector = TensorLeakDetector(device="cpu", torch_module=fake_torch)
+    cache = Cache()
+    cache.items.append(FakeTensor((64, 64)))
+    other_device = [FakeTensor((64, 64), device="cuda:0")]
+
+    baseline = detector.scan()
+    assert baseline['baseline']
+    # 다른 장치의 텐서는 세지 않음
+    assert baseline['tensors'] == 1
+    assert baseline['growth'] == []
+
+    cache.items.extend(FakeTensor((64, 64)) for _ in range(3))
+    report = detector.scan()
+    assert not report['baseline']
+    growth = report['growth']
+    assert len(growth) == 1
+    assert growth[0]['shape'] == [64, 64]
+    assert growth[0]['delta_count'] == 3
+    assert growth[0]['delta_mb'] == pytest.approx(3 * 64 * 64 * 4 / 1024**2)
+    assert "+3 × [64×64]" in detector.format_report(report)
+    assert len(other_device) == 1
+
+
+def test_device_index_filter():
+    detector = TensorLeakDetector(device="cuda:1", torch_module=fake_torch)
+    held = [FakeTensor((4,), device="cuda:0"), FakeTensor((4,), device="cuda:1"), FakeTensor((4,))]
+    assert detector.scan()['tensors'] == 1
+    assert len(held) == 3
+
+
+def test_incremental_scan_matches_full_scan():
+    detector = TensorLeakDetector(device="cpu", torch_module=fake_torch)
+    held = [FakeTensor((8,)) for _ in range(5)]
+
+    report = None
+    while report is None:
+        report = detector.step(time_budget=0.0)
+        if report is None:
+            assert detector.is_scanning()
+    assert report['tensors'] >= len(held)
+    assert not detector.is_scanning()
+
+
+def test_reports_growth_of_cpu_tensors():
+    torch = pytest.importorskip("torch")
+    detector = TensorLeakDetector(device="cpu", torch_module=torch)
+    cache = Cache()
+
+    detector.scan()
+    cache.items.extend(torch.zeros(32, 16) for _ in range(4))
+    report = detector.scan()
+
+    group = next(group for group in report['growth'] if group['shape'] == [32, 16])
+    assert group['delta_count'] == 4
+    assert group['dtype'] == str(torch.float32)
+    assert group['referrer'] in ('list', f"{__name__}.Cache")
@@ -0,0 +1,68 @@
+from utils.model_eviction import FakeModelManager, ModelEvictor
+
+
+def make_evictor():
+    manager = FakeModelManager(total_mb=24576.0, used_mb=1024.0)
+    # 나중에 로드한 모델이 가장 최근 사용 (rank 0)
+    manager.load('vae', 300.0)
+    manager.load('unet', 10000.0)
+    manager.load('clip', 1500.0)
+    return manager, ModelEvictor(manager, load_bandwidth_mb_s=2000.0, reload_overhead_s=0.5)
+
+
+def test_plan_is_empty_when_target_is_met():
+    manager, evictor = make_evictor()
+    assert evictor.plan(0, manager.get_free_memory(0)) == []
+
+
+def test_plan_orders_by_score_and_stops_at_target():
+    manager, evictor = make_evictor()
+    free = manager.get_free_memory(0)
+
+    plan = evictor.plan(0, free + 200.0)
+    assert [model['key'] for model in plan] == ['unet']
+
+    plan = evictor.plan(0, free + 11000.0)
+    scores = [evictor.score(model) for model in plan]
+    assert scores == sorted(scores, reverse=True)
+    assert sum(model['size_mb'] for model in plan) >= 11000.0
+
+
+def test_protected_models_are_not_planned():
+    manager, evictor = make_evictor()
+    plan = evictor.plan(0, manager.total_mb, protected={'unet'})
+    assert 'unet' not in [model['key'] for model in plan]
+    assert {model['key'] for model in plan} == {'vae', 'clip'}
+
+
+def test_evict_unloads_until_target():
+    manager, evictor = make_evictor()
+    target = manager.get_free_memory(0) + 1000.0
+
+    result = evictor.evict(0, target)
+    assert result['met']
+    assert manager.unloaded == [model['name'] for model in result['evicted']]
+    assert result['free_after'] - result['free_before'] == sum(model['size_mb'] for model in result['evicted'])
+    assert evictor.evictions == len(result['evicted'])
+
+
+def test_evict_reports_unmet_target():
+    manager, evictor = make_evictor()
+    result = evictor.evict(0, manager.total_mb, protected={'unet'})
+    assert not result['met']
+    assert 'unet' not in manager.unloaded
+    assert result['protected'] == 1
+
+
+def test_model_sets_are_protected_per_loader_configuration():
+    _, evictor = make_evictor()
+    evictor.begin_prompt()
+    evictor._record_usage({'unet', 'clip'})
+    evictor.end_prompt('set-a')
+
+    assert evictor.get_protected('set-a') == {'unet', 'clip'}
+    assert evictor.get_protected('set-b') == set()
+
+    # 프롬프트 밖에서 기록된 사용은 무시
+    evictor._record_usage({'vae'})
+    assert evictor.get_protected('set-a') == {'unet', 'clip'}
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from utils.policy_simulator import (DEFAULT_POLICY, CleanupCostModel, compare_policies, load_trace,
+                                    parse_policy, simulate, summarize_recorded)
+
+
+def make_prompt(t, wf="wf-a", models="models-a"):
+    # 시작 시 캐시 1GB, 프롬프트 중 9GB까지 할당, 끝나면 모델 3GB만 남음
+    return {
+        'type': 'prompt', 't': t, 'id': f"p{t:g}", 'dur': 5.0, 'ok': True, 'oom': False,
+        'wf': wf, 'models': models,
+        'gpus': [{'i': 0, 'total': 24576.0, 'used': 6000.0, 'res0': 4000.0, 'alloc0': 3000.0,
+                  'peak_alloc': 9000.0, 'peak_res': 10000.0, 'res1': 10000.0, 'alloc1': 3000.0}]
+    }
+
+
+@pytest.fixture
+def trace(tmp_path):
+    lines = [json.dumps(make_prompt(t)) for t in (30.0, 0.0, 20.0, 10.0)]
+    lines += [
+        json.dumps({'type': 'cleanup', 't': 5.0, 'mode': 'Standard', 'dur': 0.1,
+                    'gpus': [{'i': 0, 'before': 5000.0, 'after': 4000.0, 'dur': 0.1}]}),
+        json.dumps({'type': 'cleanup', 't': 15.0, 'mode': 'Standard', 'dur': 0.3,
+                    'gpus': [{'i': 0, 'before': 7000.0, 'after': 4000.0, 'dur': 0.3}]}),
+        '{"type": "prompt", "t": 40'
+    ]
+    (tmp_path / "trace-1.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_load_trace_sorts_and_skips_truncated_lines(trace):
+    prompts, cleanups = load_trace([str(trace)])
+    assert [prompt['t'] for prompt in prompts] == [0.0, 10.0, 20.0, 30.0]
+    assert len(cleanups) == 2
+    assert load_trace([str(trace / "trace-1.jsonl")])[0] == prompts
+
+    recorded = summarize_recorded(prompts, cleanups)
+    assert recorded['prompts'] == 4
+    assert recorded['cleanup_time'] == pytest.approx(0.4)
+    assert recorded['span'] == pytest.approx(35.0)
+
+
+def test_cost_model_fits_recorded_cleanups(trace):
+    _, cleanups = load_trace([str(trace)])
+    model = CleanupCostModel(cleanups)
+    assert model.fitted == {'Standard': 2, 'Aggressive': 0}
+    assert model.estimate('Standard', 2000.0) == pytest.approx(0.2)
+    # 관측되지 않은 모드는 기본값 차이만큼 보정
+    assert model.estimate('Aggressive', 2000.0) > model.estimate('Standard', 2000.0)
+
+
+def test_every_time_trades_cleanups_for_churn(trace):
+    prompts, _ = load_trace([str(trace)])
+    off = simulate(prompts, parse_policy("auto_clean=Off"))
+    every_time = simulate(prompts, dict(DEFAULT_POLICY))
+
+    assert off['cleanups'] == 0
+    assert off['churn_prompts'] == 1
+    assert off['churn_mb'] == pytest.approx(5000.0)
+
+    assert every_time['cleanups'] == 4
+    assert every_time['reclaimed_mb'] == pytest.approx(4 * 6000.0)
+    assert every_time['churn_prompts'] == 4
+    assert every_time['churn_mb'] == pytest.approx(5000.0 + 3 * 6000.0)
+    assert every_time['oom'] == off['oom'] == 0
+
+
+def test_threshold_interval_and_deferral(trace):
+    prompts, _ = load_trace([str(trace)])
+    # 다른 몫 2GB + 예약 9GB ≈ 45%
+    assert simulate(prompts, parse_policy("auto_clean=Only When High,threshold=80"))['cleanups'] == 0
+    assert simulate(prompts, parse_policy("auto_clean=Only When High,threshold=40"))['cleanups'] == 4
+    # 5초, 35초에만 정리
+    assert simulate(prompts, parse_policy("min_interval=30"))['cleanups'] == 2
+
+    deferred = simulate(prompts, parse_policy("model_set_deferral=On"))
+    assert deferred['deferred'] == 3
+    assert deferred['cleanups'] == 1
+
+
+def test_predictive_skips_learned_workflow(trace):
+    prompts, _ = load_trace([str(trace)])
+    result = simulate(prompts, parse_policy("auto_clean=Predictive,threshold=40"))
+    # 같은 임계값의 Only When High는 4번 정리하지만, 워크플로는 첫 프롬프트가 끝나면서 학습되고
+    # 작업 집합이 들어맞으므로 After Queue 정리가 한 번도 일어나지 않음
+    assert result['cleanups'] == 0
+    assert result['oom'] == 0
+
+
+def test_compare_policies_orders_by_overhead(trace):
+    prompts, cleanups = load_trace([str(trace)])
+    results = compare_policies(prompts, cleanups, [dict(DEFAULT_POLICY), parse_policy("auto_clean=Off")])
+    assert [result['policy'] for result in results] == ["Off", "Every Time / Standard / After Queue"]
+
+
+@pytest.mark.parametrize("spec", ["auto_clean=Sometimes", "threshold", "unknown=1", "run_timing=Later"])
+def test_parse_policy_rejects_invalid_settings(spec):
+    with pytest.raises(ValueError):
+        parse_policy(spec)
@@ -0,0 +1,42 @@
+import pytest
+
+from utils.sample_history import SampleHistory
+
+
+def test_stats_follow_the_window():
+    history = SampleHistory(capacity=5)
+    for second, percent in enumerate([90.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0]):
+        history.append(float(second), percent, percent * 10)
+
+    # 가장 오래된 90%와 10%는 밀려남
+    assert len(history) == 5
+    assert [sample[1] for sample in history.samples()] == [20.0, 30.0, 40.0, 50.0, 60.0]
+    stats = history.get_stats()
+    assert stats['count'] == 5
+    assert stats['mean'] == pytest.approx(40.0)
+    assert stats['mean_used'] == pytest.approx(400.0)
+    assert stats['min'] == 20.0
+    assert stats['max'] == 60.0
+    assert stats['p50'] == 40.0
+    assert stats['p95'] == 60.0
+    assert history.latest() == (6.0, 60.0, 600.0)
+
+
+def test_empty_history():
+    history = SampleHistory(capacity=3)
+    assert history.latest() is None
+    assert history.get_stats()['max'] == 0.0
+    with pytest.raises(IndexError):
+        history.get(0)
+
+
+def test_resize_keeps_recent_samples():
+    history = SampleHistory(capacity=10)
+    for second in range(10):
+        history.append(float(second), float(second), 0.0)
+
+    history.resize(3)
+    assert history.capacity == 3
+    assert [sample[0] for sample in history.samples()] == [7.0, 8.0, 9.0]
+    assert history.min() == 7.0
+    assert history.mean() == pytest.approx(8.0)
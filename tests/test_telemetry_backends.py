@@ -0,0 +1,27 @@
+from utils.telemetry_backends import FakeBackend, select_backend
+
+
+def test_select_fake_backend():
+    backend = select_backend("fake")
+    assert isinstance(backend, FakeBackend)
+    assert backend.device_count() == 1
+
+
+def test_select_backend_from_environment(monkeypatch):
+    monkeypatch.setenv("STRAWBERRY_TELEMETRY_BACKEND", "FAKE")
+    assert isinstance(select_backend(), FakeBackend)
+
+
+def test_explicit_backend_overrides_environment(monkeypatch):
+    monkeypatch.setenv("STRAWBERRY_TELEMETRY_BACKEND", "nvml")
+    assert isinstance(select_backend("fake"), FakeBackend)
+
+
+def test_fake_backend_reports_usage():
+    backend = FakeBackend(total=8192.0, devices=2)
+    backend.set_used(2048.0, index=1)
+
+    infos = backend.get_all_gpu_info()
+    assert [info['percent'] for info in infos] == [0.0, 25.0]
+    assert infos[1]['used'] == 2048.0
+    assert backend.get_gpu_info(2) is None
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+
+import pytest
+
+from utils.timeseries_store import RECORD, TimeSeriesStore
+
+
+@pytest.fixture(autouse=True)
+def no_shared_store(monkeypatch):
+    monkeypatch.setattr(TimeSeriesStore, "_shared_instance", None)
+
+
+def write_samples(store, start, count, step=0.25, gpu=0):
+    for index in range(count):
+        assert store.append(start + index * step, gpu, 10.0 + index, 1000.0 + index)
+
+
+def test_append_rollup_round_trip(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), max_bytes=1024**2, flush_interval=0.05)
+    # 1000.0 ~ 1002.75: 1초 버킷 3개, 1분/1시간 버킷 1개
+    write_samples(store, 1000.0, 12)
+    store.close()
+
+    reader = TimeSeriesStore(str(tmp_path), read_only=True)
+    try:
+        raw = list(reader.query('raw'))
+        assert [row['timestamp'] for row in raw] == [1000.0 + index * 0.25 for index in range(12)]
+
+        seconds = list(reader.query('1s'))
+        assert [(row['timestamp'], row['count']) for row in seconds] == [(1000.0, 4), (1001.0, 4), (1002.0, 4)]
+        assert seconds[0]['percent_min'] == pytest.approx(10.0)
+        assert seconds[0]['percent_mean'] == pytest.approx(11.5)
+        assert seconds[0]['percent_max'] == pytest.approx(13.0)
+
+        (minute,) = reader.query('1m')
+        assert minute['timestamp'] == 960.0
+        assert minute['count'] == 12
+        assert minute['used_max'] == pytest.approx(1011.0)
+
+        assert [row['timestamp'] for row in reader.query('raw', start=1001.0, end=1001.5)] == [1001.0, 1001.25]
+        with pytest.raises(ValueError):
+            reader.append(1003.0, 0, 1.0, 1.0)
+    finally:
+        reader.close()
+
+
+def test_export_csv_and_json(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), max_bytes=1024**2, flush_interval=0.05)
+    write_samples(store, 2000.0, 3, step=1.0, gpu=1)
+    store.close()
+
+    reader = TimeSeriesStore(str(tmp_path), read_only=True)
+    try:
+        rows = list(csv.DictReader(io.StringIO("".join(reader.export('raw', 'csv')))))
+        assert [float(row['timestamp']) for row in rows] == [2000.0, 2001.0, 2002.0]
+        assert {row['gpu'] for row in rows} == {'1'}
+
+        records = json.loads("".join(reader.export('1s', 'json', gpu=1)))
+        assert [record['percent_mean'] for record in records] == pytest.approx([10.0, 11.0, 12.0])
+        assert list(reader.query('raw', gpu=0)) == []
+
+        with pytest.raises(ValueError):
+            reader.export('raw', 'xml')
+        with pytest.raises(ValueError):
+            reader.export('5m')
+    finally:
+        reader.close()
+
+
+def test_ring_keeps_newest_records(tmp_path):
+    # 원본 레벨은 전체 용량의 절반: 레코드 10개
+    store = TimeSeriesStore(str(tmp_path), max_bytes=RECORD.size * 20, flush_interval=0.05)
+    write_samples(store, 3000.0, 25, step=1.0)
+    store.close()
+
+    reader = TimeSeriesStore(str(tmp_path), read_only=True)
+    try:
+        assert [row['timestamp'] for row in reader.query('raw')] == [3015.0 + index for index in range(10)]
+        assert reader.get_stats()['levels']['raw']['records'] == 10
+    finally:
+        reader.close()
+
+
+def test_second_writer_uses_subfolder_and_export_all_merges(tmp_path):
+    first = TimeSeriesStore(str(tmp_path), max_bytes=1024**2, flush_interval=0.05)
+    second = TimeSeriesStore(str(tmp_path), max_bytes=1024**2, flush_interval=0.05)
+    try:
+        assert first.directory == str(tmp_path)
+        assert second.directory == str(tmp_path / "writer-1")
+        write_samples(first, 4000.0, 3, step=1.0)
+        write_samples(second, 4000.5, 3, step=1.0)
+    finally:
+        first.close()
+        second.close()
+
+    rows = list(csv.DictReader(io.StringIO("".join(TimeSeriesStore.export_all(str(tmp_path))))))
+    assert [float(row['timestamp']) for row in rows] == [4000.0, 4000.5, 4001.0, 4001.5, 4002.0, 4002.5]
+    # 내보내기는 기록 저장소를 새로 만들지 않음
+    assert not (tmp_path / "writer-2").exists()
+
+    with pytest.raises(ValueError):
+        TimeSeriesStore.export_all(str(tmp_path), level='5m')
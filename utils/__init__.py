@@ -1,11 +1,88 @@
-from .dependency_installer import install_dependencies, install_from_requirements, get_gputil_or_mock
-from .gpu_monitor import GPUMonitor
+from .dependency_installer import install_dependencies, install_from_requirements, check_dependencies, get_gputil_or_mock
+from .telemetry_backends import TelemetryBackend, NVMLBackend, TorchCudaBackend, GPUtilBackend, FakeBackend, select_backend
+from .gpu_monitor import GPUMonitor, parse_device_thresholds
 from .vram_cleaner import VRAMCleaner
+from .host_memory import read_host_memory, format_host_memory, format_size, malloc_trim
+from .leak_detector import TensorLeakDetector
+from .sample_history import SampleHistory
+from .cleanup_policy import PredictiveCleanupPolicy, compute_workflow_fingerprint, compute_model_set_fingerprint
+from .node_profiler import NodeProfiler, CudaMemoryProbe, FakeMemoryProbe
+from .cleanup_worker import CleanupWorker
+from .prompt_peaks import PromptPeakTracker, attach_to_history, extract_prompt_dimensions
+from .queue_lookahead import ModelSetDeferral, get_prompt_queue, peek_next_prompt
+from .trace_recorder import TraceRecorder, default_trace_directory
+from .policy_simulator import CleanupCostModel, load_trace, parse_policy, default_policies, simulate, compare_policies, summarize_recorded, format_comparison
+from .oom_recovery import OOMRecovery, is_oom_error, find_executor_oom
+from .model_eviction import ModelEvictor, ComfyModelManager, FakeModelManager
+from .metrics import MetricsRegistry, StrawberryMetrics
+from .trend_analysis import TrendAnalyzer, format_duration
+from .sampler_service import SamplerService, SamplerSubscription
+from .telemetry_stream import TelemetryStream, format_sse
+from .timeseries_store import TimeSeriesStore, default_store_directory
+from .gpu_coordination import GPUCoordinator, SharedTelemetryBackend, TelemetrySegment, FileLock, segment_path
 
 __all__ = [
     'install_dependencies',
     'install_from_requirements', 
+    'check_dependencies',
     'get_gputil_or_mock',
+    'TelemetryBackend',
+    'NVMLBackend',
+    'TorchCudaBackend',
+    'GPUtilBackend',
+    'FakeBackend',
+    'select_backend',
     'GPUMonitor',
-    'VRAMCleaner'
+    'parse_device_thresholds',
+    'VRAMCleaner',
+    'read_host_memory',
+    'format_host_memory',
+    'format_size',
+    'malloc_trim',
+    'TensorLeakDetector',
+    'SampleHistory',
+    'PredictiveCleanupPolicy',
+    'compute_workflow_fingerprint',
+    'compute_model_set_fingerprint',
+    'NodeProfiler',
+    'CudaMemoryProbe',
+    'FakeMemoryProbe',
+    'CleanupWorker',
+    'PromptPeakTracker',
+    'attach_to_history',
+    'extract_prompt_dimensions',
+    'ModelSetDeferral',
+    'get_prompt_queue',
+    'peek_next_prompt',
+    'TraceRecorder',
+    'default_trace_directory',
+    'CleanupCostModel',
+    'load_trace',
+    'parse_policy',
+    'default_policies',
+    'simulate',
+    'compare_policies',
+    'summarize_recorded',
+    'format_comparison',
+    'OOMRecovery',
+    'is_oom_error',
+    'find_executor_oom',
+    'ModelEvictor',
+    'ComfyModelManager',
+    'FakeModelManager',
+    'MetricsRegistry',
+    'StrawberryMetrics',
+    'TrendAnalyzer',
+    'format_duration',
+    'SamplerService',
+    'SamplerSubscription',
+    'TelemetryStream',
+    'format_sse',
+    'TimeSeriesStore',
+    'default_store_directory',
+    'GPUCoordinator',
+    'SharedTelemetryBackend',
+    'TelemetrySegment',
+    'FileLock',
+    'segment_path'
 ]
\ No newline at end of file
@@ -0,0 +1,159 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+# 피크 메모리에 영향을 주지 않는 입력 (시드, 프롬프트 텍스트, 파일명 등)
+IGNORED_INPUTS = {
+    'seed', 'noise_seed', 'control_after_generate', 'text', 'text_g', 'text_l',
+    'filename_prefix', 'prompt'
+}
+
+
+def compute_workflow_fingerprint(prompt):
+    """프롬프트 그래프의 워크플로우 지문 (노드 구성 + 메모리 관련 입력값)"""
+    if not prompt:
+        return None
+
+    entries = []
+    for node_id, node in prompt.items():
+        if not isinstance(node, dict):
+            continue
+        inputs = []
+        for name, value in sorted(node.get('inputs', {}).items()):
+            if name in IGNORED_INPUTS:
+                continue
+            # 링크 ([node_id, slot])는 연결 여부만 반영
+            if isinstance(value, list):
+                value = "<link>"
+            inputs.append((name, value))
+        entries.append((node.get('class_type', ''), inputs))
+
+    entries.sort(key=lambda entry: json.dumps(entry, sort_keys=True, default=str))
+    payload = json.dumps(entries, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compute_model_set_fingerprint(prompt):
+    """프롬프트가 로드하는 모델 구성의 지문 (로더 노드와 파일명), 로더가 없으면 None"""
+    if not prompt:
+        return None
+
+    loaders = []
+    for node in prompt.values():
+        if not isinstance(node, dict) or 'Loader' not in node.get('class_type', ''):
+            continue
+        inputs = sorted(
+            (name, value) for name, value in node.get('inputs', {}).items()
+            if not isinstance(value, list)
+        )
+        loaders.append((node['class_type'], inputs))
+    if not loaders:
+        return None
+
+    payload = json.dumps(sorted(loaders, key=lambda entry: json.dumps(entry, default=str)), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class PredictiveCleanupPolicy:
+    """워크플로우 지문별 피크 VRAM을 학습해 필요할 때만 정리하는 정책"""
+
+    def __init__(self, safety_margin_mb=512.0, smoothing=0.3, max_workflows=256):
+        self.safety_margin_mb = safety_margin_mb
+        self.smoothing = smoothing
+        self.max_workflows = max_workflows
+        self.profiles = OrderedDict()
+
+        # 예측 정확도 통계
+        self.predictions = 0
+        self.abs_error_sum = 0.0
+        self.under_predictions = 0
+        self.last_prediction = None
+
+    def predict(self, fingerprint, device=0):
+        """학습된 피크 VRAM (MB), 처음 보는 워크플로우면 None"""
+        profile = self.profiles.get(fingerprint)
+        if not profile or device not in profile['peaks']:
+            return None
+
+        # 평활 평균과 최근 실측값 중 큰 값 사용 (과소 예측 방지)
+        return max(profile['peaks'][device], profile['last_peaks'][device])
+
+    def get_devices_to_clean(self, fingerprint, gpu_infos, reserved_by_device):
+        """예측 피크가 여유 메모리에 들어가지 않는 장치 목록, 예측 불가면 None"""
+        if fingerprint not in self.profiles:
+            self.last_prediction = None
+            return None
+
+        devices = []
+        decisions = {}
+        for gpu_info in gpu_infos:
+            device = gpu_info['index']
+            predicted_peak = self.predict(fingerprint, device)
+            if predicted_peak is None:
+                continue
+
+            # 이미 예약된 메모리는 재사용되므로 추가로 필요한 양만 비교
+            free_mb = gpu_info['total'] - gpu_info['used']
+            needed_mb = max(0.0, predicted_peak - reserved_by_device.get(device, 0.0))
+            fits = needed_mb + self.safety_margin_mb <= free_mb
+            decisions[device] = {
+                'predicted_peak': predicted_peak,
+                'needed': needed_mb,
+                'free': free_mb,
+                'fits': fits
+            }
+            if not fits:
+                devices.append(device)
+
+        self.last_prediction = {'fingerprint': fingerprint, 'devices': decisions}
+        return devices
+
+    def record(self, fingerprint, peaks_by_device):
+        """실행 후 실측 피크 VRAM(MB) 기록 및 예측 정확도 갱신"""
+        if not fingerprint:
+            return
+
+        profile = self.profiles.get(fingerprint)
+        if profile is None:
+            profile = {'peaks': {}, 'last_peaks': {}, 'runs': 0}
+            self.profiles[fingerprint] = profile
+            if len(self.profiles) > self.max_workflows:
+                self.profiles.popitem(last=False)
+        else:
+            self.profiles.move_to_end(fingerprint)
+
+        for device, peak in peaks_by_device.items():
+            predicted_peak = self.predict(fingerprint, device)
+            if predicted_peak is not None:
+                self.predictions += 1
+                self.abs_error_sum += abs(predicted_peak - peak)
+                if predicted_peak < peak:
+                    self.under_predictions += 1
+
+            previous = profile['peaks'].get(device)
+            if previous is None:
+                profile['peaks'][device] = peak
+            else:
+                profile['peaks'][device] = previous + self.smoothing * (peak - previous)
+            profile['last_peaks'][device] = peak
+
+        profile['runs'] += 1
+
+    def get_stats(self):
+        """예측 정확도 요약"""
+        return {
+            'workflows': len(self.profiles),
+            'predictions': self.predictions,
+            'mean_abs_error': self.abs_error_sum / self.predictions if self.predictions else 0.0,
+            'under_prediction_rate': self.under_predictions / self.predictions * 100 if self.predictions else 0.0
+        }
+
+    def format_stats(self):
+        """UI/로그용 정확도 요약 문자열"""
+        stats = self.get_stats()
+        if not stats['predictions']:
+            return f"🔮 Predictive: learning ({stats['workflows']} workflows seen, no predictions verified yet)"
+        return (
+            f"🔮 Predictive accuracy: MAE {stats['mean_abs_error']:.1f}MB over {stats['predictions']} predictions, "
+            f"under-predicted {stats['under_prediction_rate']:.1f}% ({stats['workflows']} workflows)"
+        )
@@ -0,0 +1,147 @@
+import threading
+
+
+class CleanupWorker:
+    """실행 스레드 밖에서 VRAM 정리를 수행하는 백그라운드 워커
+
+    연속된 요청은 한 번의 정리로 병합되고, 프롬프트 실행 중(pause)에는
+    대기 중인 정리를 시작하지 않는다.
+    """
+
+    def __init__(self, cleanup_fn):
+        # cleanup_fn(reason, merged_requests)
+        self.cleanup_fn = cleanup_fn
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._pending = False
+        self._pending_reason = None
+        self._pending_count = 0
+        self._running = False
+        self._paused = 0
+
+        self.requested = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.last_result = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="StrawberryCleanupWorker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._pending or self._paused):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                reason = self._pending_reason
+                merged = self._pending_count
+                self._pending = False
+                self._pending_reason = None
+                self._pending_count = 0
+                self._running = True
+
+            try:
+                self.last_result = self.cleanup_fn(reason, merged)
+            except Exception as e:
+                print(f"🍓 [StrawberryFist] Background cleanup error: {e}")
+            finally:
+                with self._cond:
+                    self._running = False
+                    self.executed += 1
+                    self._cond.notify_all()
+
+    def request(self, reason):
+        """정리 요청 (이미 대기 중인 요청이 있으면 병합)"""
+        with self._cond:
+            self._request(reason)
+
+    def request_unless_paused(self, reason):
+        """프롬프트 실행 중이 아닐 때만 정리 요청, 요청했으면 True
+
+        실행 중에 요청하면 프롬프트가 끝난 뒤에야 실행되므로, 그 시점의 상태로
+        판단한 요청(예측/idle 정리)은 만들지 않는다.
+        """
+        with self._cond:
+            if self._paused:
+                return False
+            self._request(reason)
+            return True
+
+    def _request(self, reason):
+        # self._cond를 쥔 상태에서 호출
+        self.requested += 1
+        if self._pending:
+            self.coalesced += 1
+        self._pending = True
+        self._pending_reason = reason
+        self._pending_count += 1
+        self._ensure_thread()
+        self._cond.notify_all()
+
+    def cancel_pending(self):
+        """아직 시작하지 않은 정리 요청 취소"""
+        with self._cond:
+            if not self._pending:
+                return False
+            self.cancelled += self._pending_count
+            self._pending = False
+            self._pending_reason = None
+            self._pending_count = 0
+            self._cond.notify_all()
+            return True
+
+    def pause(self):
+        """프롬프트 실행 시작: 진행 중인 정리가 끝날 때까지 기다리고 새 정리 시작을 보류"""
+        with self._cond:
+            self._paused += 1
+            while self._running:
+                self._cond.wait()
+
+    def resume(self):
+        """프롬프트 실행 종료: 보류된 정리 재개"""
+        with self._cond:
+            self._paused = max(0, self._paused - 1)
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """대기/진행 중인 정리가 모두 끝날 때까지 대기"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._running and (not self._pending or self._paused or self._stopped),
+                timeout
+            )
+
+    def is_pending(self):
+        with self._cond:
+            return self._pending
+
+    def is_paused(self):
+        """프롬프트 실행 중이면 True"""
+        with self._cond:
+            return self._paused > 0
+
+    def get_stats(self):
+        """요청/실행/병합/취소 횟수"""
+        with self._cond:
+            return {
+                'requested': self.requested,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'cancelled': self.cancelled,
+                'pending': self._pending,
+                'running': self._running
+            }
+
+    def stop(self, timeout=1):
+        """워커 종료"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
@@ -1,6 +1,55 @@
 import sys
 import subprocess
 import os
+import re
+from functools import lru_cache
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:  # Python < 3.8
+    importlib_metadata = None
+
+def get_requirements_file():
+    """requirements.txt 경로"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(current_dir), "requirements.txt")
+
+def _parse_version(version):
+    """비교용 숫자 버전 튜플"""
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:4])
+
+@lru_cache(maxsize=None)
+def check_dependencies():
+    """importlib.metadata로 requirements.txt 종속성 확인 (프로세스 실행 없음, 결과 캐시)
+
+    Returns:
+        설치되지 않았거나 최소 버전보다 낮은 요구사항 문자열 튜플
+    """
+    requirements_file = get_requirements_file()
+    if importlib_metadata is None or not os.path.exists(requirements_file):
+        return ()
+    
+    missing = []
+    with open(requirements_file, encoding="utf-8") as f:
+        for line in f:
+            requirement = line.split("#", 1)[0].strip()
+            if not requirement:
+                continue
+            
+            match = re.match(r"^([A-Za-z0-9_.\-]+)\s*(>=\s*([\w.]+))?", requirement)
+            if not match:
+                continue
+            
+            try:
+                installed = importlib_metadata.version(match.group(1))
+            except importlib_metadata.PackageNotFoundError:
+                missing.append(requirement)
+                continue
+            
+            if match.group(3) and _parse_version(installed) < _parse_version(match.group(3)):
+                missing.append(requirement)
+    
+    return tuple(missing)
 
 def install_dependencies():
     """필요한 패키지 자동 설치"""
@@ -33,10 +82,8 @@ def install_dependencies():
                     print(f"🍓 [StrawberryFist] {package} 설치 실패 - 수동 설치 필요")
 
 def install_from_requirements():
-    """requirements.txt에서 종속성 설치"""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    parent_dir = os.path.dirname(current_dir)
-    requirements_file = os.path.join(parent_dir, "requirements.txt")
+    """requirements.txt에서 종속성 설치 (install_script.py에서 명시적으로 실행)"""
+    requirements_file = get_requirements_file()
     
     if os.path.exists(requirements_file):
         print(f"🍓 [StrawberryFist] requirements.txt에서 종속성 설치 중...")
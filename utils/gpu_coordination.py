@@ -0,0 +1,420 @@
+import atexit
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from .telemetry_backends import TelemetryBackend
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# 공유 세그먼트 레이아웃: 헤더 | GPU 레코드 × MAX_GPUS | 프로세스 슬롯 × MAX_PROCESSES
+MAGIC = b"SFGS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQdfI")        # magic, version, gpu_count, sequence, timestamp, interval, leader_pid
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+HEADER_SIZE = 64
+GPU_RECORD = struct.Struct("<I4xddd48s")   # index, used, total, percent, name
+MAX_GPUS = 16
+PROCESS_SLOT = struct.Struct("<Iffd")      # pid, reserved_mb, budget_mb, updated
+MAX_PROCESSES = 32
+PROCESS_OFFSET = HEADER_SIZE + GPU_RECORD.size * MAX_GPUS
+SEGMENT_SIZE = 4096
+
+# 이 시간 동안 갱신이 없는 프로세스 슬롯은 종료된 것으로 간주 (재사용 가능)
+SLOT_TTL = 60.0
+
+
+def default_coordination_directory():
+    """프로세스 간 공유 파일 위치 (STRAWBERRY_COORDINATION_DIR → /dev/shm → 임시 폴더)"""
+    directory = os.environ.get("STRAWBERRY_COORDINATION_DIR")
+    if not directory:
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        directory = os.path.join(base, "strawberryfist")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def default_namespace():
+    """같은 GPU 인덱스 체계를 쓰는 프로세스끼리만 세그먼트를 공유 (CUDA_VISIBLE_DEVICES 기준)"""
+    visible = os.environ.get("CUDA_VISIBLE_DEVICES", "all")
+    return hashlib.sha1(visible.encode("utf-8")).hexdigest()[:12]
+
+
+def segment_path(directory=None, namespace=None):
+    """공유 텔레메트리 세그먼트 파일 경로 (잠금 파일은 같은 접두사 사용)"""
+    directory = directory or default_coordination_directory()
+    namespace = namespace or default_namespace()
+    return os.path.join(directory, f"telemetry-{namespace}.shm")
+
+
+class FileLock:
+    """프로세스 간 배타 잠금 (POSIX flock / Windows msvcrt.locking)
+
+    잠금은 파일 디스크립터에 묶이므로 보유 프로세스가 죽으면 OS가 해제한다.
+    같은 프로세스의 스레드끼리는 내부 스레드 잠금으로 직렬화한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self, timeout=0.0):
+        """잠금 획득 (timeout 초까지 재시도), 성공하면 True"""
+        deadline = time.monotonic() + timeout
+        acquired = self._thread_lock.acquire(timeout=timeout) if timeout > 0 else self._thread_lock.acquire(blocking=False)
+        if not acquired:
+            return False
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError:
+            self._thread_lock.release()
+            raise
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self._fd = fd
+                return True
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    self._thread_lock.release()
+                    return False
+                time.sleep(0.01)
+
+    def release(self):
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+            self._thread_lock.release()
+
+
+class TelemetrySegment:
+    """메모리 매핑 파일 기반 공유 텔레메트리 세그먼트
+
+    GPU 레코드는 리더 프로세스 하나만 쓰며, 시퀀스 잠금(쓰기 중 홀수)으로 읽는 쪽이
+    쓰다 만 값을 보지 않게 한다. 프로세스 슬롯은 각 프로세스가 자기 슬롯만 갱신한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if os.fstat(fd).st_size < SEGMENT_SIZE:
+                os.ftruncate(fd, SEGMENT_SIZE)
+            self._mmap = mmap.mmap(fd, SEGMENT_SIZE)
+        finally:
+            os.close(fd)
+        self._slot = None
+
+    def write(self, gpu_infos, timestamp, interval):
+        """GPU 스냅샷 기록 (리더 전용)"""
+        m = self._mmap
+        sequence = SEQUENCE.unpack_from(m, SEQUENCE_OFFSET)[0]
+        # 쓰던 리더가 죽어 홀수로 남았어도 다음 값은 홀수에서 시작
+        writing = sequence + 1 if sequence % 2 == 0 else sequence + 2
+        SEQUENCE.pack_into(m, SEQUENCE_OFFSET, writing)
+
+        gpu_infos = gpu_infos[:MAX_GPUS]
+        for slot, gpu_info in enumerate(gpu_infos):
+            GPU_RECORD.pack_into(
+                m, HEADER_SIZE + slot * GPU_RECORD.size,
+                gpu_info['index'], gpu_info['used'], gpu_info['total'], gpu_info['percent'],
+                str(gpu_info.get('name', '')).encode("utf-8")[:48]
+            )
+        HEADER.pack_into(m, 0, MAGIC, VERSION, len(gpu_infos), writing + 1, timestamp, interval, os.getpid())
+
+    def read(self, retries=8):
+        """최신 GPU 스냅샷 {gpu_infos, timestamp, interval, leader_pid}, 없거나 쓰는 중이면 None"""
+        m = self._mmap
+        for _ in range(retries):
+            sequence = SEQUENCE.unpack_from(m, SEQUENCE_OFFSET)[0]
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            magic, version, count, _, timestamp, interval, leader_pid = HEADER.unpack_from(m, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            gpu_infos = []
+            for slot in range(min(count, MAX_GPUS)):
+                index, used, total, percent, name = GPU_RECORD.unpack_from(m, HEADER_SIZE + slot * GPU_RECORD.size)
+                gpu_infos.append({
+                    'index': index,
+                    'used': used,
+                    'total': total,
+                    'percent': percent,
+                    'name': name.rstrip(b"\0").decode("utf-8", "replace")
+                })
+            if SEQUENCE.unpack_from(m, SEQUENCE_OFFSET)[0] == sequence:
+                return {'gpu_infos': gpu_infos, 'timestamp': timestamp, 'interval': interval, 'leader_pid': leader_pid}
+        return None
+
+    def _slot_offset(self, slot):
+        return PROCESS_OFFSET + slot * PROCESS_SLOT.size
+
+    def read_processes(self, now=None):
+        """최근에 갱신된 프로세스 슬롯 목록"""
+        now = time.time() if now is None else now
+        processes = []
+        for slot in range(MAX_PROCESSES):
+            pid, reserved, budget, updated = PROCESS_SLOT.unpack_from(self._mmap, self._slot_offset(slot))
+            if pid and now - updated <= SLOT_TTL:
+                processes.append({'pid': pid, 'reserved_mb': reserved, 'budget_mb': budget, 'updated': updated})
+        return processes
+
+    def update_process(self, reserved_mb, budget_mb, claim_lock):
+        """이 프로세스의 슬롯 갱신 (처음에는 claim_lock 아래에서 빈 슬롯 확보)"""
+        pid = os.getpid()
+        now = time.time()
+        if self._slot is not None:
+            owner = PROCESS_SLOT.unpack_from(self._mmap, self._slot_offset(self._slot))[0]
+            if owner != pid:
+                self._slot = None
+        if self._slot is None:
+            if not claim_lock.acquire(timeout=1.0):
+                return False
+            try:
+                for slot in range(MAX_PROCESSES):
+                    owner, _, _, updated = PROCESS_SLOT.unpack_from(self._mmap, self._slot_offset(slot))
+                    if owner == pid or not owner or now - updated > SLOT_TTL:
+                        self._slot = slot
+                        PROCESS_SLOT.pack_into(self._mmap, self._slot_offset(slot), pid, reserved_mb, budget_mb, now)
+                        return True
+                return False
+            finally:
+                claim_lock.release()
+        PROCESS_SLOT.pack_into(self._mmap, self._slot_offset(self._slot), pid, reserved_mb, budget_mb, now)
+        return True
+
+    def release_process(self):
+        """종료 시 슬롯 비우기"""
+        if self._slot is not None:
+            PROCESS_SLOT.pack_into(self._mmap, self._slot_offset(self._slot), 0, 0.0, 0.0, 0.0)
+            self._slot = None
+
+    def close(self):
+        self._mmap.close()
+
+
+class SharedTelemetryBackend(TelemetryBackend):
+    """한 GPU를 여러 ComfyUI 프로세스가 공유할 때 리더 프로세스만 하드웨어를 조회하는 백엔드
+
+    팔로워는 공유 세그먼트를 읽고, 세그먼트가 오래되면(리더 종료) 리더 선출을 시도한다.
+    리더가 살아 있지만 갱신이 멈춘 경우에만 팔로워가 직접 조회한다.
+    """
+
+    def __init__(self, inner, coordinator):
+        self.inner = inner
+        self.coordinator = coordinator
+        self.name = f"shared:{inner.name}"
+        self.segment_reads = 0
+        self.hardware_reads = 0
+
+    def device_count(self):
+        return len(self.get_all_gpu_info())
+
+    def get_gpu_info(self, index=0):
+        for gpu_info in self.get_all_gpu_info():
+            if gpu_info['index'] == index:
+                return gpu_info
+        return None
+
+    def get_all_gpu_info(self):
+        coordinator = self.coordinator
+        if not coordinator.is_leader:
+            snapshot = coordinator.segment.read()
+            if snapshot is not None and time.time() - snapshot['timestamp'] <= coordinator.stale_after:
+                self.segment_reads += 1
+                return snapshot['gpu_infos']
+            coordinator.try_lead()
+
+        gpu_infos = self.inner.get_all_gpu_info()
+        self.hardware_reads += 1
+        if coordinator.is_leader:
+            coordinator.segment.write(gpu_infos, time.time(), coordinator.interval)
+        return gpu_infos
+
+    def close(self):
+        self.inner.close()
+
+
+class GPUCoordinator:
+    """같은 GPU를 쓰는 ComfyUI 프로세스 간 조율
+
+    - 리더 선출: sampler.lock을 잡은 프로세스가 GPU를 샘플링해 공유 세그먼트에 기록
+    - 정리 뮤텍스: cleanup.lock으로 여러 프로세스의 정리가 동시에 실행되지 않게 함
+    - 프로세스 슬롯: 프로세스별 예약 VRAM과 예산을 공유해 서로의 사용량을 표시
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory=None, namespace=None, interval=1.0, cleanup_timeout=2.0):
+        self.directory = directory or default_coordination_directory()
+        self.namespace = namespace or default_namespace()
+        self.interval = interval
+        self.cleanup_timeout = cleanup_timeout
+
+        path = segment_path(self.directory, self.namespace)
+        prefix = path[:-len(".shm")]
+        self.segment = TelemetrySegment(path)
+        self.leader_lock = FileLock(prefix + ".sampler.lock")
+        self.cleanup_mutex = FileLock(prefix + ".cleanup.lock")
+        self.slot_lock = FileLock(prefix + ".slots.lock")
+
+        self._monitors = []
+        self._subscription = None
+        self.cleanups_waited = 0
+        self.cleanups_skipped = 0
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 조율기"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                interval = float(os.environ.get("STRAWBERRY_COORDINATION_INTERVAL", "1.0"))
+                cls._shared_instance = cls(interval=interval)
+                atexit.register(cls._shared_instance.close)
+            return cls._shared_instance
+
+    @classmethod
+    def current(cls):
+        """모니터에 연결되어 동작 중인 조율기 (없으면 None)"""
+        coordinator = cls._shared_instance
+        return coordinator if coordinator is not None and coordinator.active else None
+
+    @property
+    def is_leader(self):
+        return self.leader_lock.held
+
+    @property
+    def stale_after(self):
+        """이보다 오래된 세그먼트는 리더가 없는 것으로 간주 (초)"""
+        return max(2.0, self.interval * 3)
+
+    @property
+    def active(self):
+        return bool(self._monitors)
+
+    def attach(self, monitor):
+        """모니터의 백엔드를 공유 백엔드로 감싸고 리더 선출 시도"""
+        if not isinstance(monitor.backend, SharedTelemetryBackend):
+            monitor._backend = SharedTelemetryBackend(monitor.backend, self)
+            monitor.invalidate_cache()
+        if monitor not in self._monitors:
+            self._monitors.append(monitor)
+        self.try_lead()
+        return monitor._backend
+
+    def detach(self, monitor):
+        """공유 백엔드 해제, 리더였으면 리더 자리를 넘김"""
+        if isinstance(monitor._backend, SharedTelemetryBackend):
+            monitor._backend = monitor._backend.inner
+            monitor.invalidate_cache()
+        if monitor in self._monitors:
+            self._monitors.remove(monitor)
+        if not self._monitors:
+            self.resign()
+            self.segment.release_process()
+
+    def try_lead(self):
+        """리더 잠금 획득 시도, 성공하면 공유 주기로 샘플링 시작"""
+        if self.is_leader:
+            return True
+        if not self.leader_lock.acquire():
+            return False
+        # 세그먼트는 모니터 조회 경로에서 기록되므로 구독 콜백은 할 일이 없다
+        from .sampler_service import SamplerService
+        self._subscription = SamplerService.shared().subscribe("gpu_coordinator", self.interval, lambda gpu_infos, timestamp: None)
+        print(f"🤝 [StrawberryFist] GPU telemetry leader for {self.namespace} (pid {os.getpid()})")
+        return True
+
+    def resign(self):
+        if self._subscription is not None:
+            self._subscription.cancel()
+            self._subscription = None
+        self.leader_lock.release()
+
+    def close(self):
+        """종료 시 리더 자리와 프로세스 슬롯 반환"""
+        self.resign()
+        self.cleanup_mutex.release()
+        self.segment.release_process()
+
+    def acquire_cleanup(self, timeout=None):
+        """프로세스 간 정리 뮤텍스 획득 (다른 프로세스가 정리 중이면 timeout까지 대기)"""
+        timeout = self.cleanup_timeout if timeout is None else timeout
+        if self.cleanup_mutex.acquire():
+            return True
+        self.cleanups_waited += 1
+        if self.cleanup_mutex.acquire(timeout=timeout):
+            return True
+        self.cleanups_skipped += 1
+        return False
+
+    def release_cleanup(self):
+        self.cleanup_mutex.release()
+
+    def update_process(self, reserved_mb, budget_mb=0.0):
+        """이 프로세스의 VRAM 사용량/예산을 공유"""
+        return self.segment.update_process(reserved_mb, budget_mb, self.slot_lock)
+
+    def get_processes(self):
+        return self.segment.read_processes()
+
+    def get_stats(self):
+        snapshot = self.segment.read()
+        backend = next((m._backend for m in self._monitors if isinstance(m._backend, SharedTelemetryBackend)), None)
+        return {
+            'namespace': self.namespace,
+            'directory': self.directory,
+            'leader': self.is_leader,
+            'leader_pid': snapshot['leader_pid'] if snapshot else None,
+            'segment_age': time.time() - snapshot['timestamp'] if snapshot else None,
+            'segment_reads': backend.segment_reads if backend else 0,
+            'hardware_reads': backend.hardware_reads if backend else 0,
+            'cleanups_waited': self.cleanups_waited,
+            'cleanups_skipped': self.cleanups_skipped,
+            'processes': self.get_processes()
+        }
+
+    def format_stats(self):
+        """UI/로그용 요약"""
+        stats = self.get_stats()
+        role = "leader" if stats['leader'] else f"follower of pid {stats['leader_pid']}"
+        age = f"{stats['segment_age']:.1f}s old" if stats['segment_age'] is not None else "empty"
+        lines = [
+            f"🤝 Shared GPU telemetry: {role}, segment {age}, "
+            f"{stats['segment_reads']} shared / {stats['hardware_reads']} hardware reads"
+        ]
+        for process in stats['processes']:
+            budget = f" / budget {process['budget_mb']:.0f}MB" if process['budget_mb'] else ""
+            me = " (this process)" if process['pid'] == os.getpid() else ""
+            lines.append(f"   pid {process['pid']}{me}: reserved {process['reserved_mb']:.0f}MB{budget}")
+        if stats['cleanups_waited']:
+            lines.append(f"   cleanups waited for another worker {stats['cleanups_waited']} times, skipped {stats['cleanups_skipped']}")
+        return "\n".join(lines)
@@ -1,29 +1,127 @@
+import os
 import time
-from .dependency_installer import get_gputil_or_mock
+import threading
+from .telemetry_backends import select_backend
+from .host_memory import read_host_memory, format_host_memory
+from .metrics import StrawberryMetrics
 
 class GPUMonitor:
     """GPU 메모리 모니터링 클래스"""
     
-    def __init__(self):
-        self.GPUtil = get_gputil_or_mock()
+    _shared_instance = None
+    _shared_lock = threading.Lock()
     
-    def get_gpu_info(self):
-        """GPU 정보 가져오기"""
-        try:
-            gpus = self.GPUtil.getGPUs()
-            if not gpus:
-                return None
+    def __init__(self, backend=None, cache_ttl=0.5):
+        # 텔레메트리 백엔드 (지정하지 않으면 첫 조회 시 NVML → torch → GPUtil 순으로 자동 선택)
+        self._backend = backend
+        
+        # 스냅샷 캐시 (같은 순간에 대한 중복 하드웨어 조회 방지)
+        self.cache_ttl = cache_ttl
+        self._cache_lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_time = 0.0
+        self._host_snapshot = None
+        self._host_snapshot_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.metrics = StrawberryMetrics.shared()
+    
+    @property
+    def backend(self):
+        """텔레메트리 백엔드 (지연 선택)"""
+        if self._backend is None:
+            self._backend = select_backend()
+        return self._backend
+    
+    @classmethod
+    def shared(cls):
+        """노드들이 공유하는 프로세스 단일 모니터 인스턴스"""
+        created = False
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cache_ttl = float(os.environ.get("STRAWBERRY_TELEMETRY_CACHE_TTL", "0.5"))
+                cls._shared_instance = cls(cache_ttl=cache_ttl)
+                created = True
+            instance = cls._shared_instance
+        # 여러 ComfyUI 프로세스가 한 GPU를 쓰면 환경 변수로 공유 텔레메트리 사용
+        # (리더 선출이 SamplerService.shared()를 거치므로 잠금 밖에서 연결)
+        if created and os.environ.get("STRAWBERRY_COORDINATION") == "1":
+            from .gpu_coordination import GPUCoordinator
+            GPUCoordinator.shared().attach(instance)
+        return instance
+    
+    def get_all_gpu_info(self, max_age=None):
+        """모든 GPU 정보 가져오기 (max_age 초 이내 스냅샷이 있으면 재사용)"""
+        if max_age is None:
+            max_age = self.cache_ttl
+        
+        with self._cache_lock:
+            now = time.monotonic()
+            if self._snapshot is not None and now - self._snapshot_time <= max_age:
+                self.cache_hits += 1
+                self.metrics.telemetry_cache_hits.inc()
+                return self._snapshot
+            
+            self.cache_misses += 1
+            try:
+                gpu_infos = self.backend.get_all_gpu_info()
+            except Exception as e:
+                print(f"🍓 [StrawberryFist] GPU 정보 가져오기 실패: {e}")
+                return []
+            
+            self.metrics.telemetry_samples.labels(self.backend.name).inc()
+            self.metrics.record_gpu_infos(gpu_infos)
             
-            gpu = gpus[0]
-            return {
-                'name': gpu.name,
-                'total': gpu.memoryTotal,
-                'used': gpu.memoryUsed,
-                'percent': gpu.memoryUtil * 100
-            }
-        except Exception as e:
-            print(f"🍓 [StrawberryFist] GPU 정보 가져오기 실패: {e}")
-            return None
+            self._snapshot = gpu_infos
+            self._snapshot_time = time.monotonic()
+            return gpu_infos
+    
+    def get_host_memory_info(self, max_age=None):
+        """호스트 메모리 정보 (프로세스 RSS, 시스템 가용 메모리, 스왑), GPU 스냅샷과 같은 TTL로 캐시"""
+        if max_age is None:
+            max_age = self.cache_ttl
+        
+        with self._cache_lock:
+            now = time.monotonic()
+            if self._host_snapshot is not None and now - self._host_snapshot_time <= max_age:
+                return self._host_snapshot
+            try:
+                info = read_host_memory()
+            except Exception as e:
+                print(f"🍓 [StrawberryFist] 호스트 메모리 정보 가져오기 실패: {e}")
+                return None
+            if info is not None:
+                self.metrics.record_host_memory(info)
+            self._host_snapshot = info
+            self._host_snapshot_time = time.monotonic()
+            return info
+    
+    def get_gpu_info(self, index=0, max_age=None):
+        """GPU 정보 가져오기"""
+        for gpu_info in self.get_all_gpu_info(max_age=max_age):
+            if gpu_info['index'] == index:
+                return gpu_info
+        return None
+    
+    def invalidate_cache(self):
+        """스냅샷 캐시 무효화 (정리 직후 호출)"""
+        with self._cache_lock:
+            self._snapshot = None
+            self._host_snapshot = None
+    
+    def set_cache_ttl(self, cache_ttl):
+        """스냅샷 캐시 TTL(초) 변경"""
+        self.cache_ttl = max(0.0, float(cache_ttl))
+    
+    def get_cache_stats(self):
+        """캐시 히트/미스 카운터"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total * 100 if total else 0.0,
+            'ttl': self.cache_ttl
+        }
     
     def generate_memory_bar(self, percent, bar_length=25):
         """메모리 사용률 시각화 바 생성"""
@@ -52,25 +150,56 @@ class GPUMonitor:
     def log_gpu_status(self, execution_count=0):
         """Log GPU status"""
         current_time = time.strftime("%H:%M:%S", time.localtime())
-        gpu_info = self.get_gpu_info()
+        gpu_infos = self.get_all_gpu_info()
         
-        if gpu_info:
-            print(f"📊 [{current_time}] GPU memory status: {gpu_info['used']:.1f}MB / {gpu_info['total']:.1f}MB ({gpu_info['percent']:.1f}%)")
+        if gpu_infos:
+            for gpu_info in gpu_infos:
+                print(f"📊 [{current_time}] GPU{gpu_info['index']} memory status: {gpu_info['used']:.1f}MB / {gpu_info['total']:.1f}MB ({gpu_info['percent']:.1f}%)")
+            host_info = self.get_host_memory_info()
+            if host_info is not None:
+                print(f"📊 [{current_time}] {format_host_memory(host_info)}")
             return True
         else:
             print(f"❌ [{current_time}] Cannot get GPU information.")
             return False
     
-    def should_clean_memory(self, auto_clean_mode, threshold=70):
+    def should_clean_memory(self, auto_clean_mode, threshold=70, index=0):
         """메모리 정리 필요 여부 판단"""
         if auto_clean_mode == "Every Time":
             return True
         
-        gpu_info = self.get_gpu_info()
+        gpu_info = self.get_gpu_info(index)
         if not gpu_info:
             return False
         
         if auto_clean_mode == "Only When High" and gpu_info['percent'] >= threshold:
             return True
         
-        return False
\ No newline at end of file
+        return False
+    
+    def get_devices_to_clean(self, auto_clean_mode, device_thresholds=None, default_threshold=70):
+        """장치별 임계값에 따라 정리가 필요한 GPU 인덱스 목록 반환"""
+        device_thresholds = device_thresholds or {}
+        devices = []
+        
+        for gpu_info in self.get_all_gpu_info():
+            threshold = device_thresholds.get(gpu_info['index'], default_threshold)
+            if self.should_clean_memory(auto_clean_mode, threshold, gpu_info['index']):
+                devices.append(gpu_info['index'])
+        
+        return devices
+
+
+def parse_device_thresholds(text):
+    """'0:70,1:85' 형식의 장치별 임계값 문자열 파싱"""
+    device_thresholds = {}
+    for entry in (text or "").replace(";", ",").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            index, threshold = entry.split(":", 1)
+            device_thresholds[int(index)] = float(threshold)
+        except ValueError:
+            print(f"🍓 [StrawberryFist] Invalid device threshold entry ignored: '{entry}'")
+    return device_thresholds
\ No newline at end of file
@@ -0,0 +1,144 @@
+import ctypes
+import os
+import sys
+
+_libc = None
+
+
+def _read_kb_fields(path, fields):
+    """'Key:   123 kB' 형식 파일에서 필요한 필드만 MB로 읽기"""
+    values = {}
+    with open(path, encoding="ascii") as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in fields:
+                values[key] = int(rest.split()[0]) / 1024
+                if len(values) == len(fields):
+                    break
+    return values
+
+
+def _read_cgroup_limit():
+    """cgroup v2 메모리 제한과 사용량 (MB), 제한이 없으면 None"""
+    try:
+        with open("/sys/fs/cgroup/memory.max", encoding="ascii") as f:
+            limit = f.read().strip()
+        if limit == "max":
+            return None
+        with open("/sys/fs/cgroup/memory.current", encoding="ascii") as f:
+            current = int(f.read().strip())
+        return int(limit) / 1024**2, current / 1024**2
+    except (OSError, ValueError):
+        return None
+
+
+def _read_procfs():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        status = _read_kb_fields("/proc/self/status", ("VmRSS",))
+        meminfo = _read_kb_fields("/proc/meminfo", ("MemTotal", "MemAvailable", "SwapTotal", "SwapFree"))
+    except (OSError, ValueError, IndexError):
+        return None
+    if "MemAvailable" not in meminfo:
+        return None
+
+    total = meminfo["MemTotal"]
+    available = meminfo["MemAvailable"]
+    limited = False
+    # 컨테이너에서는 호스트 전체보다 cgroup 제한이 먼저 OOM killer를 부른다
+    cgroup = _read_cgroup_limit()
+    if cgroup is not None and cgroup[0] < total:
+        limit, current = cgroup
+        total = limit
+        available = max(0.0, min(available, limit - current))
+        limited = True
+
+    return {
+        'rss': status.get("VmRSS", 0.0),
+        'total': total,
+        'available': available,
+        'swap_total': meminfo.get("SwapTotal", 0.0),
+        'swap_used': meminfo.get("SwapTotal", 0.0) - meminfo.get("SwapFree", 0.0),
+        'cgroup_limited': limited,
+        'source': 'procfs'
+    }
+
+
+def _read_psutil():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    virtual = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    return {
+        'rss': psutil.Process(os.getpid()).memory_info().rss / 1024**2,
+        'total': virtual.total / 1024**2,
+        'available': virtual.available / 1024**2,
+        'swap_total': swap.total / 1024**2,
+        'swap_used': swap.used / 1024**2,
+        'cgroup_limited': False,
+        'source': 'psutil'
+    }
+
+
+def read_host_memory():
+    """프로세스 RSS, 시스템 가용 메모리, 스왑 (MB, Linux는 /proc, 그 외 psutil), 읽을 수 없으면 None"""
+    info = _read_procfs() or _read_psutil()
+    if info is None:
+        return None
+    info['used'] = info['total'] - info['available']
+    info['percent'] = info['used'] / info['total'] * 100 if info['total'] else 0.0
+    info['swap_percent'] = info['swap_used'] / info['swap_total'] * 100 if info['swap_total'] else 0.0
+    return info
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL("libc.so.6")
+                # musl 등 glibc가 아니면 malloc_trim이 없다
+                libc.malloc_trim.argtypes = [ctypes.c_size_t]
+                libc.malloc_trim.restype = ctypes.c_int
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc
+
+
+def can_malloc_trim():
+    return bool(_get_libc())
+
+
+def malloc_trim():
+    """glibc 힙의 빈 페이지를 OS에 반환 (반환했으면 True, 지원하지 않으면 None)"""
+    libc = _get_libc()
+    if not libc:
+        return None
+    return bool(libc.malloc_trim(0))
+
+
+def get_host_empty_cache(torch):
+    """고정(pinned) 호스트 메모리 캐시 해제 함수 (torch 버전에 없으면 None)"""
+    return getattr(getattr(torch, '_C', None), '_host_emptyCache', None)
+
+
+def format_size(mb):
+    """MB 값을 MB/GB 단위 문자열로"""
+    return f"{mb:.0f}MB" if abs(mb) < 1024 else f"{mb / 1024:.1f}GB"
+
+
+def format_host_memory(info):
+    """UI/로그용 호스트 메모리 한 줄 요약"""
+    if info is None:
+        return "🧠 Host RAM: unavailable"
+    limit = " (cgroup limit)" if info['cgroup_limited'] else ""
+    line = (f"🧠 Host RAM: {format_size(info['used'])} / {format_size(info['total'])}{limit} ({info['percent']:.1f}%), "
+            f"process RSS {format_size(info['rss'])}")
+    if info['swap_total']:
+        line += f", swap {format_size(info['swap_used'])} / {format_size(info['swap_total'])} ({info['swap_percent']:.1f}%)"
+    return line
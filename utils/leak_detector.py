@@ -0,0 +1,221 @@
+import gc
+import time
+
+# 참조 주체로서 정보가 적은 범용 컨테이너 (더 구체적인 참조 타입이 보이면 교체)
+GENERIC_REFERRERS = frozenset(('dict', 'list', 'tuple', 'set', 'frozenset', 'cell', 'collections.deque'))
+
+# 시간 예산을 확인하는 간격 (객체 수)
+SCAN_CHUNK = 2048
+
+
+class TensorLeakDetector:
+    """gc 객체를 훑어 특정 장치의 텐서를 그룹별로 세고 스캔 간 증가를 보고하는 누수 탐지기
+
+    텐서는 (shape, dtype, 텐서당 바이트, 참조 타입)으로 묶는다. 참조 타입은 텐서를 직접
+    가리키는 객체의 타입이며, dict/list 같은 범용 컨테이너보다 클래스 인스턴스를 우선한다.
+
+    스캔은 증분식이다: 시작 시 gc.get_objects() 목록(포인터 복사)을 만들고, step()마다
+    time_budget 초 안에서 이어서 처리한다. 스캔이 끝나기 전까지는 목록이 시작 시점의
+    객체를 잡고 있으므로 그 객체들의 해제가 늦어질 수 있다 (cancel()로 즉시 놓을 수 있음).
+    """
+
+    def __init__(self, device="cuda", time_budget=0.05, top_n=10, torch_module=None):
+        self.device = device
+        self.time_budget = time_budget
+        self.top_n = top_n
+        self._torch = torch_module
+
+        self.scans = 0
+        self.last_report = None
+        self._previous_groups = None
+        self._reset_scan()
+
+    def _reset_scan(self):
+        self._pending = None
+        self._position = 0
+        self._found = {}
+        self._steps = 0
+        self._scan_time = 0.0
+        self._started = None
+
+    @property
+    def torch(self):
+        if self._torch is None:
+            try:
+                import torch
+                self._torch = torch
+            except ImportError:
+                return None
+        return self._torch
+
+    def is_available(self):
+        return getattr(self.torch, 'Tensor', None) is not None
+
+    def is_scanning(self):
+        return self._pending is not None
+
+    def cancel(self):
+        """진행 중인 스캔 중단 (잡고 있던 객체 목록 해제)"""
+        self._reset_scan()
+
+    def _matches_device(self, tensor):
+        device = tensor.device
+        # "cuda"는 모든 GPU, "cuda:1"은 해당 GPU만
+        if ':' in self.device:
+            return str(device) == self.device
+        return device.type == self.device
+
+    @staticmethod
+    def _referrer_name(obj):
+        cls = type(obj)
+        if cls.__module__ == 'builtins':
+            if cls.__name__ == 'frame':
+                return f"frame:{obj.f_code.co_name}"
+            return cls.__name__
+        return f"{cls.__module__}.{cls.__qualname__}"
+
+    def _record(self, tensor, referrer):
+        entry = self._found.get(id(tensor))
+        if entry is None:
+            try:
+                if not self._matches_device(tensor):
+                    self._found[id(tensor)] = False
+                    return
+                key = (tuple(tensor.shape), str(tensor.dtype), tensor.element_size() * tensor.nelement())
+            except Exception:
+                # meta/희소 텐서 등 크기를 알 수 없는 텐서
+                self._found[id(tensor)] = False
+                return
+            self._found[id(tensor)] = [key, referrer]
+        elif entry and referrer is not None and (entry[1] is None or entry[1] in GENERIC_REFERRERS):
+            entry[1] = referrer
+
+    def _visit(self, obj, tensor_type):
+        if isinstance(obj, tensor_type):
+            self._record(obj, None)
+            return
+        try:
+            referents = gc.get_referents(obj)
+            # 3.11 이전에는 인스턴스 속성이 별도 __dict__에 있으므로 직접 확인
+            if type(obj).__dictoffset__ and not isinstance(obj, type):
+                attributes = getattr(obj, '__dict__', None)
+                if type(attributes) is dict:
+                    referents.extend(attributes.values())
+        except Exception:
+            return
+        referrer = None
+        for ref in referents:
+            if isinstance(ref, tensor_type):
+                if referrer is None:
+                    referrer = self._referrer_name(obj)
+                self._record(ref, referrer)
+
+    def step(self, time_budget=None):
+        """스캔을 time_budget 초만큼 진행, 스캔이 끝나면 보고서 반환 (아니면 None)"""
+        if not self.is_available():
+            return None
+        tensor_type = self.torch.Tensor
+        budget = self.time_budget if time_budget is None else time_budget
+
+        start = time.perf_counter()
+        if self._pending is None:
+            self._started = time.time()
+            self._pending = gc.get_objects()
+        pending = self._pending
+        deadline = start + budget
+
+        while self._position < len(pending):
+            end = min(self._position + SCAN_CHUNK, len(pending))
+            for index in range(self._position, end):
+                self._visit(pending[index], tensor_type)
+            self._position = end
+            if time.perf_counter() >= deadline:
+                break
+
+        self._steps += 1
+        self._scan_time += time.perf_counter() - start
+        if self._position < len(pending):
+            return None
+        return self._finish(len(pending))
+
+    def scan(self):
+        """시간 제한 없이 전체 스캔 (테스트/수동 점검용)"""
+        report = None
+        while report is None and self.is_available():
+            report = self.step(time_budget=float('inf'))
+        return report
+
+    def _finish(self, objects_scanned):
+        groups = {}
+        for entry in self._found.values():
+            if not entry:
+                continue
+            (shape, dtype, size), referrer = entry
+            group = groups.setdefault((shape, dtype, size, referrer or 'untracked'), [0, 0])
+            group[0] += 1
+            group[1] += size
+
+        report = {
+            'device': self.device,
+            'started': self._started,
+            'objects_scanned': objects_scanned,
+            'steps': self._steps,
+            'scan_time': self._scan_time,
+            'tensors': sum(count for count, _ in groups.values()),
+            'total_mb': sum(size for _, size in groups.values()) / 1024**2,
+            'groups': len(groups),
+            'baseline': self._previous_groups is None,
+            'growth': self._diff(groups)
+        }
+        self._previous_groups = groups
+        self._reset_scan()
+        self.scans += 1
+        self.last_report = report
+        return report
+
+    def _diff(self, groups):
+        """이전 스캔 대비 증가한 그룹 (증가 바이트 순 상위 top_n)"""
+        if self._previous_groups is None:
+            return []
+        growth = []
+        for key, (count, size) in groups.items():
+            previous_count, previous_size = self._previous_groups.get(key, (0, 0))
+            if count <= previous_count:
+                continue
+            shape, dtype, tensor_size, referrer = key
+            growth.append({
+                'shape': list(shape),
+                'dtype': dtype,
+                'tensor_mb': tensor_size / 1024**2,
+                'referrer': referrer,
+                'count': count,
+                'delta_count': count - previous_count,
+                'delta_mb': (size - previous_size) / 1024**2
+            })
+        growth.sort(key=lambda group: (group['delta_mb'], group['delta_count']), reverse=True)
+        return growth[:self.top_n]
+
+    def format_report(self, report=None):
+        """UI/로그용 보고서 문자열"""
+        report = report or self.last_report
+        if report is None:
+            if self.is_scanning():
+                return f"🔍 Leak scan ({self.device}): {self._position}/{len(self._pending)} objects scanned"
+            return f"🔍 Leak scan ({self.device}): no scan completed yet"
+
+        lines = [
+            f"🔍 Leak scan ({report['device']}): {report['tensors']} tensors, {report['total_mb']:.1f}MB in "
+            f"{report['groups']} groups ({report['objects_scanned']} objects, {report['steps']} steps, "
+            f"{report['scan_time'] * 1000:.0f}ms)"
+        ]
+        if report['baseline']:
+            lines.append("   baseline recorded, growth is reported from the next scan")
+        elif not report['growth']:
+            lines.append("   no growing tensor groups since the previous scan")
+        for group in report['growth']:
+            shape = "×".join(str(dim) for dim in group['shape']) or "scalar"
+            lines.append(
+                f"   +{group['delta_count']} × [{shape}] {group['dtype']} ({group['tensor_mb']:.2f}MB each) "
+                f"held by {group['referrer']} → +{group['delta_mb']:.1f}MB, {group['count']} total"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,297 @@
+import bisect
+import math
+import threading
+
+# 기본 지연 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Metric:
+    """레이블별 자식 값을 가지는 메트릭 기본 클래스"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *labelvalues, **labelkwargs):
+        """레이블 값에 해당하는 자식 (캐시되므로 핫 패스에서는 dict 조회 한 번)"""
+        if labelkwargs:
+            labelvalues = tuple(str(labelkwargs[name]) for name in self.labelnames)
+        else:
+            labelvalues = tuple(str(value) for value in labelvalues)
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labelvalues)
+                if child is None:
+                    child = self._new_child()
+                    self._children[labelvalues] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        for labelvalues, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, labelvalues))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+    def render(self, name, labelnames, labelvalues):
+        return [f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(self.value)}"]
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1.0):
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labelnames, labelvalues):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            labels = _format_labels(labelnames, labelvalues, ('le', _format_value(bound)))
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, labelvalues)
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default.set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+
+class MetricsRegistry:
+    """인메모리 메트릭 레지스트리 (Prometheus 텍스트 포맷 출력)"""
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 레지스트리"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def _register(self, metric_class, name, documentation, labelnames=(), **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """텍스트 노출 포맷 (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StrawberryMetrics:
+    """프로젝트 공용 메트릭 정의"""
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, registry=None):
+        registry = registry or MetricsRegistry.shared()
+        self.registry = registry
+
+        self.cleanups = registry.counter(
+            "strawberry_cleanups_total", "VRAM cleanups executed", ("mode",))
+        self.cleanup_failures = registry.counter(
+            "strawberry_cleanup_failures_total", "VRAM cleanups that raised an error")
+        self.reclaimed_bytes = registry.counter(
+            "strawberry_cleanup_reclaimed_bytes_total", "Reserved memory returned to the driver by cleanups", ("gpu",))
+        self.cleanup_duration = registry.histogram(
+            "strawberry_cleanup_duration_seconds", "Total time spent in one cleanup")
+        self.cleanup_step = registry.histogram(
+            "strawberry_cleanup_step_seconds", "Time spent in each cleanup step", ("step",))
+        self.skipped = registry.counter(
+            "strawberry_cleanups_skipped_total", "Cleanups skipped by the policy", ("reason",))
+        self.gpu_used = registry.gauge(
+            "strawberry_gpu_memory_used_bytes", "GPU memory in use (driver level)", ("gpu", "name"))
+        self.gpu_total = registry.gauge(
+            "strawberry_gpu_memory_total_bytes", "GPU memory capacity", ("gpu", "name"))
+        self.gpu_usage = registry.gauge(
+            "strawberry_gpu_memory_usage_percent", "GPU memory usage percentage", ("gpu", "name"))
+        self.telemetry_samples = registry.counter(
+            "strawberry_telemetry_samples_total", "Hardware telemetry queries", ("backend",))
+        self.telemetry_cache_hits = registry.counter(
+            "strawberry_telemetry_cache_hits_total", "Telemetry requests served from the snapshot cache")
+        self.oom_attempts = registry.counter(
+            "strawberry_oom_recovery_attempts_total", "OOM recovery attempts by outcome", ("outcome",))
+        self.evicted_models = registry.counter(
+            "strawberry_evicted_models_total", "Models unloaded by LRU eviction", ("gpu",))
+        self.host_rss = registry.gauge(
+            "strawberry_host_process_rss_bytes", "Resident memory of the ComfyUI process")
+        self.host_available = registry.gauge(
+            "strawberry_host_memory_available_bytes", "Host memory available (cgroup limit applied)")
+        self.host_total = registry.gauge(
+            "strawberry_host_memory_total_bytes", "Host memory capacity (cgroup limit applied)")
+        self.swap_used = registry.gauge(
+            "strawberry_host_swap_used_bytes", "Swap in use")
+        self.host_reclaimed_bytes = registry.counter(
+            "strawberry_host_cleanup_reclaimed_bytes_total", "Process RSS released by host cleanups")
+        self.prompts = registry.counter(
+            "strawberry_prompts_total", "Prompts executed through the execution hook")
+        self.hook_overhead = registry.histogram(
+            "strawberry_hook_overhead_seconds", "Time the execution hook adds to a prompt, excluding the prompt itself")
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 메트릭 세트"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def record_gpu_infos(self, gpu_infos):
+        """텔레메트리 샘플을 게이지에 반영"""
+        for gpu_info in gpu_infos:
+            labels = (gpu_info['index'], gpu_info['name'])
+            self.gpu_used.labels(*labels).set(gpu_info['used'] * 1024**2)
+            self.gpu_total.labels(*labels).set(gpu_info['total'] * 1024**2)
+            self.gpu_usage.labels(*labels).set(gpu_info['percent'])
+
+    def record_host_memory(self, info):
+        """호스트 메모리 샘플을 게이지에 반영"""
+        self.host_rss.set(info['rss'] * 1024**2)
+        self.host_available.set(info['available'] * 1024**2)
+        self.host_total.set(info['total'] * 1024**2)
+        self.swap_used.set(info['swap_used'] * 1024**2)
+
+    def record_host_cleanup(self, result):
+        """호스트 정리 결과 반영 (단계 시간은 host_ 접두사로 구분)"""
+        for step, seconds in result.get('timings', {}).items():
+            self.cleanup_step.labels(f"host_{step}").observe(seconds)
+        if result.get('released', 0.0) > 0:
+            self.host_reclaimed_bytes.inc(result['released'] * 1024**2)
+
+    def record_cleanup(self, result):
+        """정리 결과를 카운터/히스토그램에 반영"""
+        if not result.get('success'):
+            self.cleanup_failures.inc()
+            return
+
+        self.cleanups.labels(result.get('mode', 'Standard')).inc()
+        self.cleanup_duration.observe(result.get('duration', 0.0))
+        for step, seconds in result.get('timings', {}).items():
+            self.cleanup_step.labels(step).observe(seconds)
+
+        device_results = result.get('devices') or {result.get('device', 0): result}
+        for device, device_result in device_results.items():
+            cleared = device_result.get('cleared', 0.0)
+            if cleared > 0:
+                self.reclaimed_bytes.labels(device).inc(cleared * 1024**2)
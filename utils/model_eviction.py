@@ -0,0 +1,267 @@
+import functools
+import threading
+import time
+
+
+class ComfyModelManager:
+    """comfy.model_management 어댑터 (로드된 모델 목록/언로드/여유 메모리)
+
+    ComfyUI 밖에서는 available()이 False이고 모든 조회가 빈 결과를 반환한다.
+    """
+
+    def __init__(self, model_management=None):
+        self._mm = model_management
+
+    @property
+    def mm(self):
+        if self._mm is None:
+            try:
+                import comfy.model_management as model_management
+                self._mm = model_management
+            except ImportError:
+                return None
+        return self._mm
+
+    def available(self):
+        return self.mm is not None
+
+    def list_models(self):
+        """로드된 모델 목록 (가장 최근에 사용된 모델이 먼저)"""
+        mm = self.mm
+        if mm is None:
+            return []
+        models = []
+        for rank, loaded in enumerate(list(mm.current_loaded_models)):
+            device = getattr(loaded, 'device', None)
+            if getattr(device, 'type', None) != 'cuda':
+                continue
+            # 부분 로드(lowvram)된 모델은 실제 GPU에 올라간 양만 계산
+            if hasattr(loaded, 'model_loaded_memory'):
+                size = loaded.model_loaded_memory()
+            else:
+                size = loaded.model_memory()
+            inner = getattr(loaded.model, 'model', None)
+            models.append({
+                'key': id(loaded.model),
+                'name': type(inner).__name__ if inner is not None else type(loaded.model).__name__,
+                'device': device.index or 0,
+                'size_mb': size / 1024**2,
+                'total_mb': loaded.model_memory() / 1024**2,
+                'rank': rank
+            })
+        return models
+
+    def unload(self, key):
+        """모델 하나를 GPU에서 내림 (ComfyUI free_memory와 같은 방식)"""
+        mm = self.mm
+        if mm is None:
+            return False
+        for index, loaded in enumerate(mm.current_loaded_models):
+            if id(loaded.model) != key:
+                continue
+            fully_unloaded = loaded.model_unload()
+            # 구버전은 None 반환 (항상 전체 언로드)
+            if fully_unloaded is None or fully_unloaded:
+                mm.current_loaded_models.pop(index)
+            return True
+        return False
+
+    def get_free_memory(self, device):
+        """ComfyUI 기준 여유 메모리 MB (드라이버 여유 + torch 캐시 여유)"""
+        mm = self.mm
+        if mm is None:
+            return 0.0
+        import torch
+        return mm.get_free_memory(torch.device('cuda', device)) / 1024**2
+
+    def empty_cache(self):
+        if self.mm is not None:
+            self.mm.soft_empty_cache()
+
+    def install_usage_tracker(self, callback):
+        """load_models_gpu 호출마다 callback(model_keys) (프롬프트별 사용 모델 기록용)"""
+        mm = self.mm
+        if mm is None or getattr(mm, '_strawberry_usage_tracked', False):
+            return False
+        original = mm.load_models_gpu
+
+        @functools.wraps(original)
+        def tracked_load_models_gpu(models, *args, **kwargs):
+            try:
+                callback([id(model) for model in models])
+            except Exception as e:
+                print(f"🍓 [StrawberryFist] Model usage tracking error: {e}")
+            return original(models, *args, **kwargs)
+
+        mm.load_models_gpu = tracked_load_models_gpu
+        mm._strawberry_usage_tracked = True
+        return True
+
+
+class FakeModelManager:
+    """GPU/ComfyUI 없이 축출 정책을 검증하기 위한 가짜 모델 관리자"""
+
+    def __init__(self, total_mb=24576.0, used_mb=0.0, devices=1):
+        self.total_mb = total_mb
+        self.used = {device: used_mb for device in range(devices)}
+        self.models = []
+        self.unloaded = []
+
+    def available(self):
+        return True
+
+    def load(self, key, size_mb, device=0, name=None):
+        """모델 로드 (가장 최근 사용으로 맨 앞에 추가)"""
+        self.models = [model for model in self.models if model['key'] != key]
+        self.models.insert(0, {'key': key, 'name': name or str(key), 'device': device,
+                               'size_mb': size_mb, 'total_mb': size_mb})
+        self.used[device] = self.used.get(device, 0.0) + size_mb
+
+    def list_models(self):
+        return [dict(model, rank=rank) for rank, model in enumerate(self.models)]
+
+    def unload(self, key):
+        for model in self.models:
+            if model['key'] == key:
+                self.models.remove(model)
+                self.used[model['device']] -= model['size_mb']
+                self.unloaded.append(key)
+                return True
+        return False
+
+    def get_free_memory(self, device):
+        return self.total_mb - self.used.get(device, 0.0)
+
+    def empty_cache(self):
+        pass
+
+    def install_usage_tracker(self, callback):
+        return False
+
+
+class ModelEvictor:
+    """메모리 압박 시 로드된 모델을 LRU·크기·재로드 비용 가중치로 골라 내리는 축출기
+
+    점수 = (사용 후 경과 순위 + 1) × 확보 MB / 예상 재로드 시간. 오래 쓰이지 않았고
+    크게 비우면서 다시 올리기 싼 모델부터 내린다. 보호 목록의 모델은 내리지 않는다.
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, manager=None, load_bandwidth_mb_s=2000.0, reload_overhead_s=0.5, max_model_sets=64):
+        self.manager = manager or ComfyModelManager()
+        self.load_bandwidth_mb_s = load_bandwidth_mb_s
+        self.reload_overhead_s = reload_overhead_s
+        self.max_model_sets = max_model_sets
+
+        self._lock = threading.Lock()
+        self._prompt_models = None
+        self.model_sets = {}
+
+        self.evictions = 0
+        self.freed_mb = 0.0
+        self.last_result = None
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 축출기"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def reload_cost(self, model):
+        """예상 재로드 시간(초)"""
+        return self.reload_overhead_s + model['total_mb'] / self.load_bandwidth_mb_s
+
+    def score(self, model):
+        return (model['rank'] + 1) * model['size_mb'] / self.reload_cost(model)
+
+    # 프롬프트별 사용 모델 추적 (보호 목록 계산용)
+    def install_tracking(self):
+        return self.manager.install_usage_tracker(self._record_usage)
+
+    def _record_usage(self, keys):
+        with self._lock:
+            if self._prompt_models is not None:
+                self._prompt_models.update(keys)
+
+    def begin_prompt(self):
+        with self._lock:
+            self._prompt_models = set()
+
+    def end_prompt(self, model_set_key):
+        """프롬프트가 사용한 모델을 로더 구성 키에 연결"""
+        with self._lock:
+            used, self._prompt_models = self._prompt_models, None
+            if model_set_key and used:
+                self.model_sets.pop(model_set_key, None)
+                self.model_sets[model_set_key] = used
+                if len(self.model_sets) > self.max_model_sets:
+                    self.model_sets.pop(next(iter(self.model_sets)))
+
+    def get_protected(self, model_set_key):
+        """해당 로더 구성의 프롬프트가 사용했던 모델 키"""
+        with self._lock:
+            return set(self.model_sets.get(model_set_key, ()))
+
+    def plan(self, device, target_free_mb, protected=()):
+        """목표 여유 메모리까지 내릴 모델 목록 (점수 순)"""
+        free_mb = self.manager.get_free_memory(device)
+        if free_mb >= target_free_mb:
+            return []
+        candidates = [
+            model for model in self.manager.list_models()
+            if model['device'] == device and model['key'] not in protected and model['size_mb'] > 0
+        ]
+        candidates.sort(key=self.score, reverse=True)
+
+        plan = []
+        for model in candidates:
+            if free_mb >= target_free_mb:
+                break
+            plan.append(model)
+            free_mb += model['size_mb']
+        return plan
+
+    def evict(self, device, target_free_mb, protected=()):
+        """목표 여유 메모리를 만족할 때까지 모델 언로드"""
+        start = time.perf_counter()
+        free_before = self.manager.get_free_memory(device)
+        evicted = []
+        for model in self.plan(device, target_free_mb, protected):
+            if self.manager.unload(model['key']):
+                evicted.append({
+                    'name': model['name'],
+                    'size_mb': model['size_mb'],
+                    'rank': model['rank'],
+                    'reload_cost': self.reload_cost(model)
+                })
+        if evicted:
+            self.manager.empty_cache()
+        free_after = self.manager.get_free_memory(device)
+
+        result = {
+            'device': device,
+            'target': target_free_mb,
+            'free_before': free_before,
+            'free_after': free_after,
+            'evicted': evicted,
+            'protected': len(protected),
+            'met': free_after >= target_free_mb,
+            'duration': time.perf_counter() - start
+        }
+        self.evictions += len(evicted)
+        self.freed_mb += max(0.0, free_after - free_before)
+        self.last_result = result
+        return result
+
+    def format_result(self, result):
+        """UI/로그용 축출 결과"""
+        if not result['evicted']:
+            return (f"📦 GPU{result['device']}: no models evicted "
+                    f"(free {result['free_before']:.0f}MB, target {result['target']:.0f}MB, {result['protected']} protected)")
+        names = ", ".join(f"{model['name']} ({model['size_mb']:.0f}MB)" for model in result['evicted'])
+        return (f"📦 GPU{result['device']}: evicted {names} → free {result['free_before']:.0f}MB → "
+                f"{result['free_after']:.0f}MB (target {result['target']:.0f}MB{'' if result['met'] else ', not met'})")
@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class CudaMemoryProbe:
+    """torch.cuda 할당자 카운터 기반 메모리 프로브 (현재 장치)"""
+
+    def __init__(self, torch_module=None, synchronize=True):
+        self._torch = torch_module
+        self.synchronize = synchronize
+
+    @property
+    def torch(self):
+        if self._torch is None:
+            try:
+                import torch
+                self._torch = torch
+            except ImportError:
+                return None
+        return self._torch
+
+    def is_available(self):
+        return self.torch is not None and self.torch.cuda.is_available()
+
+    def reset_peak(self):
+        if self.is_available():
+            self.torch.cuda.reset_peak_memory_stats()
+
+    def read(self):
+        """(allocated, reserved, peak_allocated, peak_reserved) MB"""
+        if not self.is_available():
+            return 0.0, 0.0, 0.0, 0.0
+        # 비동기 커널이 끝난 뒤의 값과 시간을 측정
+        if self.synchronize:
+            self.torch.cuda.synchronize()
+        cuda = self.torch.cuda
+        return (
+            cuda.memory_allocated() / 1024**2,
+            cuda.memory_reserved() / 1024**2,
+            cuda.max_memory_allocated() / 1024**2,
+            cuda.max_memory_reserved() / 1024**2
+        )
+
+
+class FakeMemoryProbe:
+    """GPU 없이 프로파일러를 검증하기 위한 가짜 프로브"""
+
+    def __init__(self):
+        self.allocated = 0.0
+        self.reserved = 0.0
+        self.peak = 0.0
+        self.peak_reserved = 0.0
+
+    def allocate(self, mb):
+        """mb만큼 할당 (음수면 해제)"""
+        self.allocated = max(0.0, self.allocated + mb)
+        self.reserved = max(self.reserved, self.allocated)
+        self.peak = max(self.peak, self.allocated)
+        self.peak_reserved = max(self.peak_reserved, self.reserved)
+
+    def reset_peak(self):
+        self.peak = self.allocated
+        self.peak_reserved = self.reserved
+
+    def read(self):
+        return self.allocated, self.reserved, self.peak, self.peak_reserved
+
+
+class NodeProfiler:
+    """프롬프트 내 노드별 VRAM 변화량/실행 시간 프로파일러 (opt-in)"""
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    SORT_KEYS = {
+        'peak': 'max_peak_delta',
+        'time': 'total_time',
+        'allocated': 'total_allocated_delta',
+        'reserved': 'total_reserved_delta'
+    }
+
+    def __init__(self, probe=None):
+        self.probe = probe or CudaMemoryProbe()
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.class_stats = {}
+        self.last_prompt = []
+        self.prompt_count = 0
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 프로파일러 인스턴스"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def begin_prompt(self):
+        """새 프롬프트의 노드 기록 시작"""
+        with self._lock:
+            self.last_prompt = []
+            self.prompt_count += 1
+
+    @contextmanager
+    def profile_node(self, node_id, class_type):
+        """노드 하나의 실행을 측정 (비활성 상태면 측정하지 않음)"""
+        if not self.enabled:
+            yield
+            return
+
+        self.probe.reset_peak()
+        allocated_before, reserved_before, _, _ = self.probe.read()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated_after, reserved_after, peak, peak_reserved = self.probe.read()
+            self.record(node_id, class_type, {
+                'time': elapsed,
+                'allocated_delta': allocated_after - allocated_before,
+                'reserved_delta': reserved_after - reserved_before,
+                'peak_delta': peak - allocated_before,
+                'peak_allocated': peak,
+                'peak_reserved': peak_reserved,
+                'allocated_after': allocated_after,
+                'reserved_after': reserved_after
+            })
+
+    def record(self, node_id, class_type, sample):
+        """노드 측정값 기록 및 클래스별 통계 누적"""
+        sample = dict(sample, node_id=str(node_id), class_type=class_type)
+        with self._lock:
+            self.last_prompt.append(sample)
+
+            stats = self.class_stats.get(class_type)
+            if stats is None:
+                stats = {
+                    'class_type': class_type,
+                    'count': 0,
+                    'total_time': 0.0,
+                    'max_time': 0.0,
+                    'total_allocated_delta': 0.0,
+                    'total_reserved_delta': 0.0,
+                    'max_peak_delta': 0.0
+                }
+                self.class_stats[class_type] = stats
+
+            stats['count'] += 1
+            stats['total_time'] += sample['time']
+            stats['max_time'] = max(stats['max_time'], sample['time'])
+            stats['total_allocated_delta'] += sample['allocated_delta']
+            stats['total_reserved_delta'] += sample['reserved_delta']
+            stats['max_peak_delta'] = max(stats['max_peak_delta'], sample['peak_delta'])
+
+    def get_prompt_peak(self, key='peak_allocated'):
+        """마지막 프롬프트에서 측정된 노드별 피크의 최댓값 (MB, 측정 없으면 None)
+
+        key: 'peak_allocated' 또는 'peak_reserved'
+        """
+        with self._lock:
+            return max((sample[key] for sample in self.last_prompt if key in sample), default=None)
+
+    def run_mock_prompt(self, nodes):
+        """모의 실행 경로: [(node_id, class_type, callable), ...]을 순서대로 실행하며 측정"""
+        self.begin_prompt()
+        results = {}
+        for node_id, class_type, node_fn in nodes:
+            with self.profile_node(node_id, class_type):
+                results[node_id] = node_fn()
+        return results
+
+    def get_report(self, sort_by='peak', top_n=None):
+        """노드 클래스별 통계 순위"""
+        key = self.SORT_KEYS.get(sort_by, 'max_peak_delta')
+        with self._lock:
+            rows = []
+            for stats in self.class_stats.values():
+                row = dict(stats)
+                row['avg_time'] = stats['total_time'] / stats['count']
+                row['avg_allocated_delta'] = stats['total_allocated_delta'] / stats['count']
+                row['avg_reserved_delta'] = stats['total_reserved_delta'] / stats['count']
+                rows.append(row)
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:top_n] if top_n else rows
+
+    def to_json(self, sort_by='peak', top_n=None):
+        """JSON 보고서"""
+        with self._lock:
+            last_prompt = list(self.last_prompt)
+        return json.dumps({
+            'prompts': self.prompt_count,
+            'sort_by': sort_by,
+            'classes': self.get_report(sort_by, top_n),
+            'last_prompt': last_prompt
+        }, indent=2)
+
+    def format_table(self, sort_by='peak', top_n=15):
+        """UI용 텍스트 표"""
+        rows = self.get_report(sort_by, top_n)
+        if not rows:
+            return "🔬 No node profile data yet (enable profiling and queue a prompt)"
+
+        lines = [
+            f"🔬 Node VRAM profile ({self.prompt_count} prompts, sorted by {sort_by})",
+            f"{'#':>2} {'Node class':<32} {'Runs':>5} {'Avg ms':>9} {'Peak +MB':>10} {'Alloc +MB':>10} {'Rsv +MB':>9}"
+        ]
+        for rank, row in enumerate(rows, 1):
+            lines.append(
+                f"{rank:>2} {row['class_type'][:32]:<32} {row['count']:>5} {row['avg_time'] * 1000:>9.1f} "
+                f"{row['max_peak_delta']:>10.1f} {row['avg_allocated_delta']:>10.1f} {row['avg_reserved_delta']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """누적 통계 초기화"""
+        with self._lock:
+            self.class_stats = {}
+            self.last_prompt = []
+            self.prompt_count = 0
@@ -0,0 +1,162 @@
+import gc
+import time
+from collections import deque
+
+from .metrics import StrawberryMetrics
+
+# 실행기 오류 메시지/예외에서 OOM을 판별하는 문자열
+OOM_MARKERS = ("OutOfMemoryError", "out of memory", "Allocation on device")
+
+# 시도 횟수에 따라 단계적으로 강화되는 복구 단계
+RECOVERY_LADDER = ('empty_cache', 'gc_collect', 'unload_models')
+
+
+def is_oom_error(error):
+    """CUDA out-of-memory 예외 여부 (torch 미설치 환경에서도 이름/메시지로 판별)"""
+    if error is None:
+        return False
+    try:
+        import torch
+        oom_type = getattr(torch.cuda, 'OutOfMemoryError', None)
+        if oom_type is not None and isinstance(error, oom_type):
+            return True
+    except ImportError:
+        pass
+    text = f"{type(error).__name__}: {error}"
+    return any(marker in text for marker in OOM_MARKERS)
+
+
+def find_executor_oom(executor):
+    """실행기가 내부에서 처리한 OOM 오류 메시지 (ComfyUI는 노드 예외를 status_messages로 보고)"""
+    if getattr(executor, 'success', True):
+        return None
+    for event, data in getattr(executor, 'status_messages', []) or []:
+        if event != 'execution_error' or not isinstance(data, dict):
+            continue
+        text = f"{data.get('exception_type', '')}: {data.get('exception_message', '')}"
+        if any(marker in text for marker in OOM_MARKERS):
+            return text.strip()
+    return None
+
+
+def unload_comfy_models():
+    """ComfyUI가 캐시한 모델 언로드 (ComfyUI 밖에서는 False)"""
+    try:
+        import comfy.model_management as model_management
+    except ImportError:
+        return False
+    model_management.unload_all_models()
+    model_management.soft_empty_cache()
+    return True
+
+
+class OOMRecovery:
+    """OOM으로 실패한 프롬프트를 정리 후 재시도 (empty_cache → gc → 모델 언로드)"""
+
+    def __init__(self, vram_cleaner, max_retries=0, unload_models=None, history_size=50):
+        self.vram_cleaner = vram_cleaner
+        self.max_retries = max_retries
+        self.unload_models = unload_models or unload_comfy_models
+        self.attempts = deque(maxlen=history_size)
+        self.metrics = StrawberryMetrics.shared()
+
+        self.recovered = 0
+        self.failed = 0
+
+    def _memory_state(self):
+        """장치별 (allocated, reserved, driver_free) MB"""
+        state = {}
+        for device in range(self.vram_cleaner.get_device_count()):
+            snapshot = self.vram_cleaner.get_memory_snapshot(device)
+            if snapshot:
+                state[device] = {
+                    'allocated': snapshot['allocated'],
+                    'reserved': snapshot['reserved'],
+                    'driver_free': snapshot['driver_free']
+                }
+        return state
+
+    def _empty_cache(self):
+        torch = self.vram_cleaner.torch
+        if torch is None or not torch.cuda.is_available():
+            return
+        for device in range(self.vram_cleaner.get_device_count()):
+            with torch.cuda.device(device):
+                torch.cuda.empty_cache()
+
+    def recover(self, level):
+        """level 단계까지의 복구 수행, 실행한 단계 목록 반환"""
+        steps = list(RECOVERY_LADDER[:min(level, len(RECOVERY_LADDER) - 1) + 1])
+        if 'unload_models' in steps and not self.unload_models():
+            steps.remove('unload_models')
+        if 'gc_collect' in steps:
+            gc.collect()
+        # 해제된 텐서의 블록까지 돌려주도록 empty_cache는 마지막에
+        self._empty_cache()
+        return steps
+
+    def run(self, execute_fn, executor=None, prompt_id=None, max_retries=None):
+        """execute_fn() 실행, OOM이면 복구 후 최대 max_retries 회 재시도"""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            error = None
+            try:
+                result = execute_fn()
+            except Exception as e:
+                if not is_oom_error(e) or attempt >= max_retries:
+                    if attempt:
+                        self._record(prompt_id, attempt, None, str(e), 'failed', start)
+                        self.failed += 1
+                    raise
+                result = None
+                error = f"{type(e).__name__}: {e}"
+            else:
+                error = find_executor_oom(executor)
+
+            if error is None:
+                if attempt:
+                    self._record(prompt_id, attempt, None, None, 'recovered', start)
+                    self.recovered += 1
+                return result
+            if attempt >= max_retries:
+                if max_retries:
+                    self._record(prompt_id, attempt, None, error, 'failed', start)
+                    self.failed += 1
+                return result
+
+            memory_before = self._memory_state()
+            steps = self.recover(attempt)
+            attempt += 1
+            self._record(prompt_id, attempt, steps, error, 'retrying', start, memory_before)
+            print(f"🩹 [StrawberryFist] OOM ({error[:120]}) → {' + '.join(steps)}, retry {attempt}/{max_retries}")
+
+    def _record(self, prompt_id, attempt, steps, error, outcome, start, memory_before=None):
+        entry = {
+            'time': time.time(),
+            'prompt_id': prompt_id,
+            'attempt': attempt,
+            'steps': steps,
+            'error': error,
+            'outcome': outcome,
+            'duration': time.perf_counter() - start,
+            'memory_after': self._memory_state()
+        }
+        if memory_before is not None:
+            entry['memory_before'] = memory_before
+        self.attempts.append(entry)
+        self.metrics.oom_attempts.labels(outcome).inc()
+
+    def get_stats(self):
+        """복구/실패 횟수와 최근 시도 기록"""
+        return {
+            'max_retries': self.max_retries,
+            'recovered': self.recovered,
+            'failed': self.failed,
+            'attempts': list(self.attempts)
+        }
+
+    def format_stats(self):
+        """UI/로그용 요약 문자열"""
+        return f"🩹 OOM recovery: {self.recovered} recovered, {self.failed} failed (up to {self.max_retries} retries)"
@@ -0,0 +1,324 @@
+import glob
+import json
+import os
+
+from .cleanup_policy import PredictiveCleanupPolicy
+
+# 트레이스에 해당 모드의 정리 기록이 없을 때 쓰는 정리 비용 (초, 초/MB)
+DEFAULT_CLEANUP_COSTS = {
+    'Standard': (0.002, 0.000005),
+    'Aggressive': (0.050, 0.000005)
+}
+
+# 정책 기본값 (노드 기본값과 같음)
+DEFAULT_POLICY = {
+    'auto_clean': 'Every Time',
+    'clear_mode': 'Standard',
+    'run_timing': 'After Queue',
+    'threshold': 70.0,
+    'min_interval': 0.0,
+    'model_set_deferral': 'Off'
+}
+
+AUTO_CLEAN_MODES = ('Off', 'Every Time', 'Only When High', 'Predictive')
+CLEAR_MODES = ('Standard', 'Aggressive')
+RUN_TIMINGS = ('Before Queue', 'After Queue', 'Both')
+
+
+def load_trace(paths):
+    """트레이스 파일(또는 폴더의 *.jsonl)을 읽어 (prompts, cleanups) 시간순 목록 반환"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))))
+        else:
+            files.append(path)
+
+    prompts, cleanups = [], []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 기록 중 잘린 마지막 줄
+                    continue
+                if entry.get('type') == 'prompt':
+                    prompts.append(entry)
+                elif entry.get('type') == 'cleanup':
+                    cleanups.append(entry)
+    prompts.sort(key=lambda entry: entry['t'])
+    cleanups.sort(key=lambda entry: entry['t'])
+    return prompts, cleanups
+
+
+def parse_policy(spec):
+    """'auto_clean=Only When High,threshold=80,clear_mode=Aggressive' 형식의 정책 문자열 해석"""
+    policy = dict(DEFAULT_POLICY)
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        key, separator, value = part.partition('=')
+        key, value = key.strip(), value.strip()
+        if not separator or key not in DEFAULT_POLICY:
+            raise ValueError(f"invalid policy setting '{part.strip()}' (expected one of {', '.join(DEFAULT_POLICY)})")
+        if key in ('threshold', 'min_interval'):
+            policy[key] = float(value)
+        else:
+            policy[key] = value
+    for key, choices in (('auto_clean', AUTO_CLEAN_MODES), ('clear_mode', CLEAR_MODES),
+                         ('run_timing', RUN_TIMINGS), ('model_set_deferral', ('Off', 'On'))):
+        if policy[key] not in choices:
+            raise ValueError(f"{key} must be one of {', '.join(choices)}")
+    return policy
+
+
+def format_policy(policy):
+    """정책을 짧은 이름으로"""
+    name = policy['auto_clean']
+    if policy['auto_clean'] == 'Off':
+        return name
+    if policy['auto_clean'] == 'Only When High':
+        name += f" {policy['threshold']:.0f}%"
+    name += f" / {policy['clear_mode']} / {policy['run_timing']}"
+    if policy['model_set_deferral'] == 'On':
+        name += " / deferral"
+    if policy['min_interval'] != DEFAULT_POLICY['min_interval']:
+        name += f" / {policy['min_interval']:g}s"
+    return name
+
+
+def default_policies(threshold=70.0):
+    """비교할 기본 정책 목록 (정리 안 함, 모드 × 시점 × 조건, 같은 모델 보류)"""
+    policies = [dict(DEFAULT_POLICY, auto_clean='Off')]
+    for auto_clean in ('Every Time', 'Only When High', 'Predictive'):
+        for clear_mode in CLEAR_MODES:
+            for run_timing in ('After Queue', 'Before Queue'):
+                policies.append(dict(DEFAULT_POLICY, auto_clean=auto_clean, clear_mode=clear_mode,
+                                     run_timing=run_timing, threshold=threshold))
+    policies.append(dict(DEFAULT_POLICY, model_set_deferral='On', threshold=threshold))
+    return policies
+
+
+class CleanupCostModel:
+    """정리 비용 추정: 트레이스의 정리 기록으로 모드별 duration = base + per_mb × 회수량(MB)을 최소제곱 적합"""
+
+    def __init__(self, cleanups=()):
+        samples = {}
+        for cleanup in cleanups:
+            for gpu in cleanup.get('gpus', []):
+                samples.setdefault(cleanup.get('mode'), []).append((max(0.0, gpu['before'] - gpu['after']), gpu['dur']))
+
+        self.costs = {}
+        self.fitted = {}
+        for mode, default in DEFAULT_CLEANUP_COSTS.items():
+            points = samples.get(mode, [])
+            self.costs[mode] = self._fit(points) if points else default
+            self.fitted[mode] = len(points)
+        # 한 모드만 관측되면 다른 모드는 기본값 차이만큼 보정
+        if self.fitted['Standard'] and not self.fitted['Aggressive']:
+            base, per_mb = self.costs['Standard']
+            extra = DEFAULT_CLEANUP_COSTS['Aggressive'][0] - DEFAULT_CLEANUP_COSTS['Standard'][0]
+            self.costs['Aggressive'] = (base + extra, per_mb)
+        elif self.fitted['Aggressive'] and not self.fitted['Standard']:
+            base, per_mb = self.costs['Aggressive']
+            extra = DEFAULT_CLEANUP_COSTS['Aggressive'][0] - DEFAULT_CLEANUP_COSTS['Standard'][0]
+            self.costs['Standard'] = (max(0.0, base - extra), per_mb)
+
+    @staticmethod
+    def _fit(points):
+        count = len(points)
+        mean_x = sum(x for x, _ in points) / count
+        mean_y = sum(y for _, y in points) / count
+        variance = sum((x - mean_x) ** 2 for x, _ in points)
+        if variance <= 0:
+            return (mean_y, 0.0)
+        per_mb = max(0.0, sum((x - mean_x) * (y - mean_y) for x, y in points) / variance)
+        return (max(0.0, mean_y - per_mb * mean_x), per_mb)
+
+    def estimate(self, mode, cleared_mb):
+        base, per_mb = self.costs[mode]
+        return base + per_mb * max(0.0, cleared_mb)
+
+
+class _DeviceState:
+    __slots__ = ('reserved',)
+
+    def __init__(self, reserved):
+        self.reserved = reserved
+
+
+def _device_view(gpu, reserved):
+    """시뮬레이션 중 장치 상태 (드라이버 사용량 = 다른 프로세스/컨텍스트 몫 + 이 프로세스 예약 메모리)
+
+    GPU 정보 없이 기록된 프롬프트는 총량을 무한대로 두어 OOM 위험과 사용률 조건에서 제외한다.
+    """
+    total = gpu['total'] if gpu.get('total') else float('inf')
+    other = max(0.0, gpu['used'] - gpu['res0']) if gpu.get('used') is not None else 0.0
+    return total, other, {'index': gpu['i'], 'total': total, 'used': other + reserved}
+
+
+def simulate(prompts, policy, cost_model=None, oom_margin_mb=512.0, malloc_ms_per_gb=1.0):
+    """기록된 프롬프트들을 정책으로 재생해 정리 횟수/시간, OOM 위험, 할당자 재할당량 추정
+
+    프롬프트마다 관측값에서 정책과 무관한 양을 구한다:
+    - 살아 있는 메모리(할당): 시작 alloc0, 끝 alloc1
+    - 작업 집합: peak_alloc 이상, 시작 시 비어 있던 캐시(res0 - alloc0)를 뺀 peak_res
+    - 다른 프로세스/컨텍스트 몫: 시작 시 드라이버 사용량 - res0
+    시뮬레이션된 예약 메모리가 작업 집합보다 작으면 그 차이를 드라이버에서 다시 할당(churn)하고,
+    다른 몫 + max(예약, 작업 집합)이 총량에 가까우면 OOM 위험으로 센다.
+    """
+    cost_model = cost_model or CleanupCostModel()
+    predictive = PredictiveCleanupPolicy() if policy['auto_clean'] == 'Predictive' else None
+    states = {}
+    last_cleanup = None
+
+    result = {
+        'policy': format_policy(policy),
+        'settings': dict(policy),
+        'prompts': len(prompts),
+        'cleanups': 0,
+        'cleanup_time': 0.0,
+        'reclaimed_mb': 0.0,
+        'churn_mb': 0.0,
+        'churn_prompts': 0,
+        'oom': 0,
+        'near_oom': 0,
+        'min_headroom_mb': None,
+        'deferred': 0
+    }
+
+    def should_clean(gpu, state, fingerprint, now):
+        if policy['auto_clean'] == 'Off':
+            return False
+        if last_cleanup is not None and now - last_cleanup < policy['min_interval']:
+            return False
+        total, other, view = _device_view(gpu, state.reserved)
+        if policy['auto_clean'] == 'Every Time':
+            return True
+        if predictive is not None:
+            # 학습된 워크플로는 캐시를 정리하지 않는다: 맞지 않으면 모델만 언로드하는데,
+            # 모델 크기는 트레이스에 없으므로 재생하지 않는다
+            if predictive.get_devices_to_clean(fingerprint, [view], {gpu['i']: state.reserved}) is not None:
+                return False
+        # Only When High (Predictive는 처음 보는 워크플로에서 임계값으로 대체)
+        return view['used'] / total * 100 >= policy['threshold']
+
+    def clean(gpus, live_key, now, fingerprint):
+        nonlocal last_cleanup
+        cleaned = False
+        for gpu in gpus:
+            state = states[gpu['i']]
+            if not should_clean(gpu, state, fingerprint, now):
+                continue
+            cleared = max(0.0, state.reserved - gpu[live_key])
+            result['cleanup_time'] += cost_model.estimate(policy['clear_mode'], cleared)
+            result['reclaimed_mb'] += cleared
+            state.reserved = gpu[live_key]
+            cleaned = True
+        if cleaned:
+            result['cleanups'] += 1
+            last_cleanup = now
+
+    timing = policy['run_timing']
+    for position, prompt in enumerate(prompts):
+        gpus = [gpu for gpu in prompt['gpus'] if gpu.get('res0') is not None]
+        for gpu in gpus:
+            if gpu['i'] not in states:
+                states[gpu['i']] = _DeviceState(gpu['res0'])
+
+        if timing in ('Before Queue', 'Both'):
+            clean(gpus, 'alloc0', prompt['t'], prompt.get('wf'))
+
+        churned = False
+        for gpu in gpus:
+            state = states[gpu['i']]
+            state.reserved = max(state.reserved, gpu['alloc0'])
+            working = max(gpu['peak_alloc'], gpu['peak_res'] - max(0.0, gpu['res0'] - gpu['alloc0']))
+            grow = max(0.0, working - state.reserved)
+            if grow > 0:
+                result['churn_mb'] += grow
+                churned = True
+
+            total, other, _ = _device_view(gpu, state.reserved)
+            headroom = total - other - max(state.reserved, working)
+            if headroom == float('inf'):
+                pass
+            elif result['min_headroom_mb'] is None or headroom < result['min_headroom_mb']:
+                result['min_headroom_mb'] = headroom
+            if headroom < 0:
+                result['oom'] += 1
+            elif headroom < oom_margin_mb:
+                result['near_oom'] += 1
+
+            # 프롬프트 중 ComfyUI가 스스로 비운 캐시(모델 언로드 등)는 그대로 반영
+            released = max(0.0, gpu['peak_res'] - gpu['res1'])
+            state.reserved = max(gpu['alloc1'], max(state.reserved, working) - released)
+        if churned:
+            result['churn_prompts'] += 1
+        if predictive is not None and prompt.get('wf'):
+            predictive.record(prompt['wf'], {gpu['i']: gpu['peak_res'] for gpu in gpus})
+
+        if timing in ('After Queue', 'Both'):
+            following = prompts[position + 1] if position + 1 < len(prompts) else None
+            if (policy['model_set_deferral'] == 'On' and following is not None and prompt.get('models')
+                    and following.get('models') == prompt['models']):
+                result['deferred'] += 1
+                continue
+            clean(gpus, 'alloc1', prompt['t'] + prompt['dur'], prompt.get('wf'))
+
+    result['churn_time'] = result['churn_mb'] / 1024 * malloc_ms_per_gb / 1000
+    result['overhead'] = result['cleanup_time'] + result['churn_time']
+    return result
+
+
+def compare_policies(prompts, cleanups, policies, oom_margin_mb=512.0, malloc_ms_per_gb=1.0):
+    """정책별 시뮬레이션 결과 (OOM 위험이 적고 총 오버헤드가 작은 순)"""
+    cost_model = CleanupCostModel(cleanups)
+    results = [simulate(prompts, policy, cost_model, oom_margin_mb, malloc_ms_per_gb) for policy in policies]
+    results.sort(key=lambda r: (r['oom'], r['near_oom'], r['overhead']))
+    return results
+
+
+def summarize_recorded(prompts, cleanups):
+    """트레이스에 실제로 기록된 값 (시뮬레이션과 비교용)"""
+    return {
+        'prompts': len(prompts),
+        'failed': sum(1 for prompt in prompts if not prompt.get('ok', True)),
+        'oom': sum(1 for prompt in prompts if prompt.get('oom')),
+        'cleanups': len(cleanups),
+        'cleanup_time': sum(cleanup.get('dur', 0.0) for cleanup in cleanups),
+        'workflows': len({prompt.get('wf') for prompt in prompts if prompt.get('wf')}),
+        'model_sets': len({prompt.get('models') for prompt in prompts if prompt.get('models')}),
+        'span': prompts[-1]['t'] + prompts[-1]['dur'] - prompts[0]['t'] if prompts else 0.0
+    }
+
+
+def format_comparison(results, recorded=None, cost_model=None):
+    """정책 비교 표"""
+    lines = []
+    if recorded is not None:
+        lines.append(
+            f"🧾 Trace: {recorded['prompts']} prompts ({recorded['workflows']} workflows, {recorded['model_sets']} model sets) "
+            f"over {recorded['span'] / 60:.1f} min, {recorded['failed']} failed ({recorded['oom']} OOM), "
+            f"{recorded['cleanups']} cleanups recorded ({recorded['cleanup_time'] * 1000:.0f}ms)"
+        )
+    if cost_model is not None:
+        costs = ", ".join(
+            f"{mode} {base * 1000:.1f}ms + {per_mb * 1e6:.1f}ms/GB"
+            f" ({'fitted on ' + str(cost_model.fitted[mode]) + ' cleanups' if cost_model.fitted[mode] else 'default'})"
+            for mode, (base, per_mb) in cost_model.costs.items()
+        )
+        lines.append(f"⏱️ Cleanup cost model: {costs}")
+    lines.append("")
+    lines.append(f"{'#':>2}  {'POLICY':<46} {'CLEANUPS':>8} {'CLEAN ms':>9} {'CHURN GB':>9} {'OVERHEAD ms':>11} {'OOM':>4} {'NEAR':>5} {'MIN FREE':>9}")
+    for rank, r in enumerate(results, 1):
+        headroom = f"{r['min_headroom_mb']:.0f}MB" if r['min_headroom_mb'] is not None else "-"
+        lines.append(
+            f"{rank:>2}  {r['policy'][:46]:<46} {r['cleanups']:>8} {r['cleanup_time'] * 1000:>9.1f} "
+            f"{r['churn_mb'] / 1024:>9.2f} {r['overhead'] * 1000:>11.1f} {r['oom']:>4} {r['near_oom']:>5} {headroom:>9}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+
+# 메모리 크기를 결정하는 입력 (배치 크기/해상도 산정용으로 함께 기록)
+SIZE_INPUTS = ('width', 'height', 'batch_size', 'length')
+
+# ComfyUI history 항목에 추가되는 키
+HISTORY_KEY = 'strawberry_vram'
+
+
+def extract_prompt_dimensions(prompt):
+    """프롬프트에서 해상도/배치 입력을 가진 노드 {node_id: {class_type, width, height, ...}}"""
+    dimensions = {}
+    for node_id, node in (prompt or {}).items():
+        if not isinstance(node, dict):
+            continue
+        inputs = node.get('inputs', {})
+        values = {
+            name: inputs[name] for name in SIZE_INPUTS
+            if isinstance(inputs.get(name), (int, float)) and not isinstance(inputs.get(name), bool)
+        }
+        if values:
+            dimensions[str(node_id)] = dict(values, class_type=node.get('class_type'))
+    return dimensions
+
+
+class PromptPeakTracker:
+    """프롬프트별 VRAM 피크 기록
+
+    프롬프트 시작 시 할당자의 피크 카운터를 초기화하고 종료 시 읽어, 최근 프롬프트의
+    장치별 피크(할당/예약)를 prompt_id로 조회할 수 있게 보관한다 (오래된 기록부터 삭제).
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, vram_cleaner=None, history_size=500):
+        self.vram_cleaner = vram_cleaner
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._active = {}
+        self._records = OrderedDict()
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 기록기 (HTTP 라우트와 실행 훅이 공유)"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def begin(self, prompt_id, prompt=None, fingerprint=None):
+        """프롬프트 시작: 장치별 피크 카운터 초기화"""
+        cleaner = self.vram_cleaner
+        devices = {}
+        if cleaner is not None:
+            for device in range(cleaner.get_device_count()):
+                cleaner.reset_peak_memory_stats(device)
+                devices[device] = {
+                    'allocated_start': cleaner.get_allocated_memory(device),
+                    'reserved_start': cleaner.get_reserved_memory(device)
+                }
+        with self._lock:
+            self._active[prompt_id] = {
+                'prompt_id': prompt_id,
+                'started': time.time(),
+                'fingerprint': fingerprint,
+                'dimensions': extract_prompt_dimensions(prompt),
+                'devices': devices,
+                '_start': time.perf_counter()
+            }
+
+    def end(self, prompt_id, success=True, node_peak_allocated=None, node_peak_reserved=None):
+        """프롬프트 종료: 피크를 읽어 기록
+
+        node_peak_allocated/node_peak_reserved: 노드 프로파일러가 잰 현재 장치의 노드별 피크 최댓값 (MB)
+        """
+        with self._lock:
+            record = self._active.pop(prompt_id, None)
+        if record is None:
+            return None
+
+        cleaner = self.vram_cleaner
+        current_device = None
+        if node_peak_allocated is not None and cleaner is not None and cleaner.is_cuda_available():
+            current_device = cleaner.torch.cuda.current_device()
+        for device, entry in record['devices'].items():
+            entry['peak_allocated'] = cleaner.get_peak_allocated_memory(device)
+            entry['peak_reserved'] = cleaner.get_peak_memory(device)
+            entry['allocated_end'] = cleaner.get_allocated_memory(device)
+            entry['reserved_end'] = cleaner.get_reserved_memory(device)
+            # 노드 프로파일러는 노드마다 두 카운터를 함께 초기화하므로 노드별 피크의 최댓값이 프롬프트 피크다
+            if device == current_device:
+                entry['peak_allocated'] = max(entry['peak_allocated'], node_peak_allocated)
+                if node_peak_reserved is not None:
+                    entry['peak_reserved'] = max(entry['peak_reserved'], node_peak_reserved)
+
+        record['duration'] = time.perf_counter() - record.pop('_start')
+        record['success'] = success
+        record['peak_allocated'] = max((e['peak_allocated'] for e in record['devices'].values()), default=0.0)
+        record['peak_reserved'] = max((e['peak_reserved'] for e in record['devices'].values()), default=0.0)
+
+        with self._lock:
+            self._records.pop(prompt_id, None)
+            self._records[prompt_id] = record
+            while len(self._records) > self.history_size:
+                self._records.popitem(last=False)
+        return record
+
+    def get(self, prompt_id):
+        with self._lock:
+            return self._records.get(prompt_id)
+
+    def recent(self, limit=50, fingerprint=None):
+        """최근 프롬프트 기록 (최신순, fingerprint로 같은 워크플로만 필터 가능)"""
+        with self._lock:
+            records = list(reversed(self._records.values()))
+        if fingerprint:
+            records = [record for record in records if record['fingerprint'] == fingerprint]
+        return records[:limit] if limit else records
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def format_record(self, record):
+        """UI/로그용 한 줄 요약"""
+        if not record or not record['devices']:
+            return "📈 Prompt peak: no CUDA device"
+        devices = ", ".join(
+            f"GPU{device} {entry['peak_reserved']:.0f}MB reserved / {entry['peak_allocated']:.0f}MB allocated"
+            for device, entry in sorted(record['devices'].items())
+        )
+        return f"📈 Prompt peak ({record['duration']:.1f}s): {devices}"
+
+
+def attach_to_history(executor, record):
+    """피크 기록을 실행기의 history_result에 추가 (ComfyUI가 /history/{prompt_id}에 그대로 저장)"""
+    history_result = getattr(executor, 'history_result', None)
+    if record is None or not isinstance(history_result, dict):
+        return False
+    history_result[HISTORY_KEY] = {
+        'peak_allocated_mb': record['peak_allocated'],
+        'peak_reserved_mb': record['peak_reserved'],
+        'duration': record['duration'],
+        'devices': {str(device): entry for device, entry in record['devices'].items()},
+        'dimensions': record['dimensions']
+    }
+    return True
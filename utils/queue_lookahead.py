@@ -0,0 +1,119 @@
+import threading
+
+from .cleanup_policy import compute_model_set_fingerprint
+
+
+def get_prompt_queue():
+    """ComfyUI 서버의 프롬프트 큐 (서버 밖에서 실행 중이면 None)"""
+    try:
+        import server
+    except ImportError:
+        return None
+    prompt_server = getattr(getattr(server, 'PromptServer', None), 'instance', None)
+    return getattr(prompt_server, 'prompt_queue', None)
+
+
+def peek_next_prompt(prompt_queue):
+    """다음에 실행될 프롬프트 그래프 (큐가 비었으면 None)
+
+    PromptQueue.queue는 (번호, prompt_id, prompt, ...) 항목의 힙이므로 맨 앞이 다음 항목이다.
+    get_current_queue()는 큐 전체를 깊은 복사하므로 쓰지 않고 큐 잠금 아래에서 참조만 읽는다.
+    """
+    if prompt_queue is None:
+        return None
+    queue = getattr(prompt_queue, 'queue', None)
+    mutex = getattr(prompt_queue, 'mutex', None)
+    if queue is None or mutex is None:
+        return None
+    with mutex:
+        if not queue:
+            return None
+        item = queue[0]
+    return item[2] if len(item) > 2 else None
+
+
+class ModelSetDeferral:
+    """연속 프롬프트가 같은 모델 구성을 쓰는 동안 큐 실행 후 정리를 보류
+
+    프롬프트가 끝나면 큐의 다음 프롬프트를 보고, 로더 노드 지문(모델 파일과 로더 입력)이
+    같으면 정리를 보류한다. 다음 프롬프트가 같은 모델과 할당자 블록을 바로 다시 쓰기
+    때문이다. 모델 구성이 바뀌거나 큐가 비면(idle) 보류했던 정리를 실행한다.
+    """
+
+    def __init__(self, queue_provider=get_prompt_queue):
+        self.queue_provider = queue_provider
+        self._lock = threading.Lock()
+        # 정리를 보류 중인 모델 구성 지문 (None이면 보류 없음)
+        self.deferred_set = None
+
+        self.deferred = 0
+        self.released = 0
+        self.last_decision = None
+
+    def is_deferring(self):
+        return self.deferred_set is not None
+
+    def decide(self, model_set):
+        """프롬프트 종료 후 정리 여부 판단, 보류하면 True
+
+        model_set: 방금 끝난 프롬프트의 모델 구성 지문 (로더가 없으면 None → 항상 정리)
+        """
+        next_prompt = peek_next_prompt(self.queue_provider())
+        if next_prompt is None:
+            decision = 'idle'
+        elif model_set is None:
+            decision = 'no_loaders'
+        elif compute_model_set_fingerprint(next_prompt) == model_set:
+            decision = 'same_models'
+        else:
+            decision = 'model_change'
+
+        with self._lock:
+            self.last_decision = decision
+            if decision == 'same_models':
+                self.deferred_set = model_set
+                self.deferred += 1
+                return True
+            if self.deferred_set is not None:
+                self.released += 1
+            self.deferred_set = None
+            return False
+
+    def covers(self, model_set):
+        """큐 실행 전 정리도 생략할지 (보류 중인 모델 구성과 같은 프롬프트면 True)"""
+        return model_set is not None and model_set == self.deferred_set
+
+    def check_idle(self, executing):
+        """보류 중에 큐가 비고 실행 중인 프롬프트도 없으면 보류 해제 (정리가 필요하면 True)
+
+        다음 프롬프트가 큐에서 삭제되거나 취소되면 프롬프트 종료 시점의 판단이 다시 오지 않는다.
+        """
+        if self.deferred_set is None or executing:
+            return False
+        if peek_next_prompt(self.queue_provider()) is not None:
+            return False
+        with self._lock:
+            if self.deferred_set is None:
+                return False
+            self.deferred_set = None
+            self.released += 1
+            self.last_decision = 'idle'
+            return True
+
+    def reset(self):
+        with self._lock:
+            self.deferred_set = None
+
+    def get_stats(self):
+        return {
+            'deferred': self.deferred,
+            'released': self.released,
+            'deferring': self.deferred_set is not None,
+            'last_decision': self.last_decision
+        }
+
+    def format_stats(self):
+        """UI/로그용 한 줄 요약"""
+        state = "deferring" if self.deferred_set is not None else "idle"
+        return (f"♻️ Same-model deferral: {self.deferred} cleanups deferred, {self.released} released "
+                f"({state}, last: {self.last_decision or 'none'})")
@@ -0,0 +1,174 @@
+from array import array
+from collections import deque
+
+
+class _FenwickTree:
+    """고정 크기 구간 합 트리 (히스토그램 백분위 조회용)"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = array('l', [0]) * (size + 1)
+
+    def add(self, index, delta):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def find_rank(self, rank):
+        """누적 개수가 rank 이상이 되는 가장 작은 인덱스"""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            next_position = position + step
+            if next_position <= self.size and self.tree[next_position] < rank:
+                position = next_position
+                rank -= self.tree[next_position]
+            step >>= 1
+        return position
+
+
+class SampleHistory:
+    """(timestamp, percent, used_mb) 샘플 링 버퍼 + 증분 롤링 통계
+
+    추가/제거는 O(1) (백분위 히스토그램은 O(log bins)), 통계 조회 비용은
+    버퍼 크기와 무관하다. 메모리는 capacity에 비례하는 고정 크기.
+    """
+
+    # 사용률 백분위 히스토그램 해상도 (0.1% 단위)
+    PERCENT_RESOLUTION = 10
+    PERCENT_BINS = 100 * PERCENT_RESOLUTION + 1
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._times = array('d', [0.0]) * self.capacity
+        self._percents = array('d', [0.0]) * self.capacity
+        self._used = array('d', [0.0]) * self.capacity
+        self._head = 0
+        self._count = 0
+        self._seq = 0
+
+        # 증분 통계 상태
+        self._percent_sum = 0.0
+        self._used_sum = 0.0
+        self._evictions = 0
+        self._max_deque = deque()
+        self._min_deque = deque()
+        self._histogram = _FenwickTree(self.PERCENT_BINS)
+
+    def __len__(self):
+        return self._count
+
+    def _bin(self, percent):
+        index = int(round(percent * self.PERCENT_RESOLUTION))
+        return min(max(index, 0), self.PERCENT_BINS - 1)
+
+    def append(self, timestamp, percent, used):
+        """샘플 추가 (가득 차면 가장 오래된 샘플을 덮어씀)"""
+        if self._count == self.capacity:
+            # 가장 오래된 샘플 제거
+            oldest = self._head
+            self._percent_sum -= self._percents[oldest]
+            self._used_sum -= self._used[oldest]
+            self._histogram.add(self._bin(self._percents[oldest]), -1)
+            self._evictions += 1
+        else:
+            self._count += 1
+
+        self._times[self._head] = timestamp
+        self._percents[self._head] = percent
+        self._used[self._head] = used
+        self._head = (self._head + 1) % self.capacity
+
+        self._percent_sum += percent
+        self._used_sum += used
+        self._histogram.add(self._bin(percent), 1)
+
+        # 단조 덱으로 윈도우 최대/최소 유지
+        seq = self._seq
+        self._seq += 1
+        while self._max_deque and self._max_deque[-1][1] <= percent:
+            self._max_deque.pop()
+        self._max_deque.append((seq, percent))
+        while self._min_deque and self._min_deque[-1][1] >= percent:
+            self._min_deque.pop()
+        self._min_deque.append((seq, percent))
+
+        oldest_seq = self._seq - self._count
+        while self._max_deque[0][0] < oldest_seq:
+            self._max_deque.popleft()
+        while self._min_deque[0][0] < oldest_seq:
+            self._min_deque.popleft()
+
+        # 부동소수점 누적 오차 보정 (capacity 회 교체마다 한 번, 분할 상환 O(1))
+        if self._evictions >= self.capacity:
+            self._evictions = 0
+            self._percent_sum = sum(self._percents[i] for i in self._indices())
+            self._used_sum = sum(self._used[i] for i in self._indices())
+
+    def _indices(self):
+        start = (self._head - self._count) % self.capacity
+        for offset in range(self._count):
+            yield (start + offset) % self.capacity
+
+    def get(self, offset):
+        """offset번째 샘플 (음수는 최신부터) → (timestamp, percent, used)"""
+        if offset < 0:
+            offset += self._count
+        if not 0 <= offset < self._count:
+            raise IndexError("sample history index out of range")
+        index = (self._head - self._count + offset) % self.capacity
+        return self._times[index], self._percents[index], self._used[index]
+
+    def latest(self):
+        """가장 최근 샘플, 없으면 None"""
+        return self.get(-1) if self._count else None
+
+    def samples(self, last=None):
+        """오래된 순서의 샘플 목록 (내보내기/표시용)"""
+        count = self._count if last is None else min(last, self._count)
+        return [self.get(offset) for offset in range(-count, 0)]
+
+    def mean(self):
+        return self._percent_sum / self._count if self._count else 0.0
+
+    def mean_used(self):
+        return self._used_sum / self._count if self._count else 0.0
+
+    def max(self):
+        return self._max_deque[0][1] if self._count else 0.0
+
+    def min(self):
+        return self._min_deque[0][1] if self._count else 0.0
+
+    def percentile(self, q):
+        """사용률 백분위 (히스토그램 해상도 0.1%)"""
+        if not self._count:
+            return 0.0
+        rank = max(1, int(-(-q * self._count // 100)))
+        return self._histogram.find_rank(rank) / self.PERCENT_RESOLUTION
+
+    def get_stats(self):
+        """롤링 통계 요약"""
+        return {
+            'count': self._count,
+            'mean': self.mean(),
+            'min': self.min(),
+            'max': self.max(),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'mean_used': self.mean_used()
+        }
+
+    def resize(self, capacity):
+        """버퍼 크기 변경 (최근 샘플 유지, 설정 변경 시에만 O(n))"""
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+        recent = self.samples(last=capacity)
+        self.__init__(capacity)
+        for sample in recent:
+            self.append(*sample)
+
+    def clear(self):
+        self.__init__(self.capacity)
@@ -0,0 +1,158 @@
+import atexit
+import threading
+import time
+
+from .gpu_monitor import GPUMonitor
+
+
+class SamplerSubscription:
+    """샘플러 구독 (주기/콜백은 실행 중에도 변경 가능)"""
+
+    def __init__(self, service, name, interval, callback):
+        self.service = service
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.next_due = time.monotonic()
+        self.deliveries = 0
+        self.errors = 0
+
+    def update(self, interval=None, callback=None):
+        """주기/콜백 변경 (다음 샘플부터 적용)"""
+        self.service.reconfigure(self, interval, callback)
+
+    def cancel(self):
+        self.service.unsubscribe(self)
+
+    @property
+    def active(self):
+        return self in self.service._subscriptions
+
+
+class SamplerService:
+    """프로세스 단일 GPU 샘플러
+
+    구독자마다 주기와 콜백(callback(gpu_infos, timestamp))을 가지며, 샘플링은 가장
+    빠른 구독자가 필요로 하는 만큼만 수행한다. 같은 시점에 도래한 구독자들은 한 번의
+    하드웨어 조회를 공유한다. 콜백은 샘플러 스레드에서 호출되므로 빠르게 반환해야 한다.
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, monitor=None, min_interval=0.05):
+        self.monitor = monitor or GPUMonitor.shared()
+        self.min_interval = min_interval
+        self._cond = threading.Condition()
+        self._subscriptions = []
+        self._thread = None
+        self._stopped = False
+
+        self.samples = 0
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 샘플러 (인터프리터 종료 시 정리)"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+                atexit.register(cls._shared_instance.stop)
+            return cls._shared_instance
+
+    def subscribe(self, name, interval, callback):
+        """구독 등록 (첫 샘플은 즉시)"""
+        subscription = SamplerSubscription(self, name, max(self.min_interval, float(interval)), callback)
+        with self._cond:
+            self._subscriptions.append(subscription)
+            self._stopped = False
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="StrawberrySampler", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            self._cond.notify_all()
+
+    def reconfigure(self, subscription, interval=None, callback=None):
+        """구독 주기/콜백 변경"""
+        with self._cond:
+            if callback is not None:
+                subscription.callback = callback
+            if interval is not None:
+                interval = max(self.min_interval, float(interval))
+                if interval != subscription.interval:
+                    # 주기가 짧아지면 기존 예정 시각까지 기다리지 않음
+                    subscription.next_due = min(subscription.next_due, time.monotonic() + interval)
+                    subscription.interval = interval
+            self._cond.notify_all()
+
+    def get_sample_interval(self):
+        """현재 유효 샘플링 주기 (구독자가 없으면 None)"""
+        with self._cond:
+            if not self._subscriptions:
+                return None
+            return min(subscription.interval for subscription in self._subscriptions)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped or not self._subscriptions:
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    next_due = min(subscription.next_due for subscription in self._subscriptions)
+                    if next_due <= now:
+                        break
+                    self._cond.wait(next_due - now)
+
+                # 곧 도래할 구독자도 같은 샘플로 처리 (주기의 10% 이내)
+                due = [
+                    subscription for subscription in self._subscriptions
+                    if subscription.next_due <= now + subscription.interval * 0.1
+                ]
+                for subscription in due:
+                    subscription.next_due += subscription.interval
+                    if subscription.next_due <= now:
+                        # 밀린 주기는 건너뜀
+                        subscription.next_due = now + subscription.interval
+
+            # 주기 안에 다른 경로(온디맨드 조회)로 얻은 스냅샷이 있으면 재사용
+            fastest = min(subscription.interval for subscription in due)
+            gpu_infos = self.monitor.get_all_gpu_info(max_age=fastest * 0.5)
+            timestamp = time.time()
+            self.samples += 1
+
+            for subscription in due:
+                try:
+                    subscription.callback(gpu_infos, timestamp)
+                    subscription.deliveries += 1
+                except Exception as e:
+                    subscription.errors += 1
+                    print(f"🍓 [StrawberryFist] Sampler subscriber '{subscription.name}' error: {e}")
+
+    def stop(self, timeout=1):
+        """모든 구독 해제 후 샘플러 스레드 종료"""
+        with self._cond:
+            self._stopped = True
+            self._subscriptions = []
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def get_stats(self):
+        """구독자별 주기/전달 횟수"""
+        with self._cond:
+            return {
+                'samples': self.samples,
+                'interval': min((s.interval for s in self._subscriptions), default=None),
+                'subscribers': [
+                    {'name': s.name, 'interval': s.interval, 'deliveries': s.deliveries, 'errors': s.errors}
+                    for s in self._subscriptions
+                ]
+            }
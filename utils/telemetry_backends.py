@@ -0,0 +1,229 @@
+import os
+from .dependency_installer import get_gputil_or_mock
+
+
+def get_visible_device_ids():
+    """CUDA_VISIBLE_DEVICES의 물리 장치 번호 목록 (지정되지 않았거나 UUID 형식이면 None)"""
+    visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+    if visible is None:
+        return None
+    try:
+        return [int(v) for v in visible.split(",") if v.strip()]
+    except ValueError:
+        return None
+
+
+class TelemetryBackend:
+    """GPU 텔레메트리 백엔드 기본 클래스"""
+
+    name = "base"
+
+    def device_count(self):
+        """사용 가능한 GPU 개수"""
+        return 0
+
+    def get_gpu_info(self, index=0):
+        """GPU 메모리 정보 (MB 단위) 반환, 장치가 없으면 None"""
+        raise NotImplementedError
+
+    def get_all_gpu_info(self):
+        """모든 GPU 정보를 한 번에 조회 (인덱스는 CUDA 장치 번호 기준)"""
+        gpu_infos = []
+        for index in range(self.device_count()):
+            gpu_info = self.get_gpu_info(index)
+            if gpu_info:
+                gpu_info['index'] = index
+                gpu_infos.append(gpu_info)
+        return gpu_infos
+
+    def close(self):
+        """백엔드 리소스 해제"""
+        pass
+
+
+class NVMLBackend(TelemetryBackend):
+    """NVML 인프로세스 백엔드 - 장치 핸들을 열어둔 채로 재사용"""
+
+    name = "nvml"
+
+    def __init__(self):
+        import pynvml
+        self._nvml = pynvml
+        pynvml.nvmlInit()
+        count = pynvml.nvmlDeviceGetCount()
+
+        # CUDA 장치 번호와 맞추기 위해 CUDA_VISIBLE_DEVICES 순서를 따름
+        device_ids = get_visible_device_ids()
+        if device_ids is None:
+            device_ids = range(count)
+        self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in device_ids if i < count]
+        self._names = []
+        for handle in self._handles:
+            name = pynvml.nvmlDeviceGetName(handle)
+            if isinstance(name, bytes):
+                name = name.decode("utf-8", errors="replace")
+            self._names.append(name)
+
+    def device_count(self):
+        return len(self._handles)
+
+    def get_gpu_info(self, index=0):
+        if index >= len(self._handles):
+            return None
+        mem = self._nvml.nvmlDeviceGetMemoryInfo(self._handles[index])
+        total = mem.total / 1024**2
+        used = mem.used / 1024**2
+        return {
+            'name': self._names[index],
+            'total': total,
+            'used': used,
+            'percent': used / total * 100 if total else 0.0
+        }
+
+    def close(self):
+        try:
+            self._nvml.nvmlShutdown()
+        except Exception:
+            pass
+        self._handles = []
+
+
+class TorchCudaBackend(TelemetryBackend):
+    """torch.cuda.mem_get_info 기반 백엔드 (드라이버 레벨 여유 메모리)"""
+
+    name = "torch"
+
+    def __init__(self):
+        import torch
+        if not torch.cuda.is_available():
+            raise RuntimeError("CUDA not available")
+        self._torch = torch
+        self._names = [torch.cuda.get_device_name(i) for i in range(torch.cuda.device_count())]
+
+    def device_count(self):
+        return len(self._names)
+
+    def get_gpu_info(self, index=0):
+        if index >= len(self._names):
+            return None
+        free, total = self._torch.cuda.mem_get_info(index)
+        total_mb = total / 1024**2
+        used_mb = (total - free) / 1024**2
+        return {
+            'name': self._names[index],
+            'total': total_mb,
+            'used': used_mb,
+            'percent': used_mb / total_mb * 100 if total_mb else 0.0
+        }
+
+
+class GPUtilBackend(TelemetryBackend):
+    """GPUtil 기반 백엔드 - 호출마다 nvidia-smi 프로세스 실행 (폴백용)"""
+
+    name = "gputil"
+
+    def __init__(self):
+        self.GPUtil = get_gputil_or_mock()
+
+    def _get_visible_gpus(self):
+        gpus = self.GPUtil.getGPUs()
+        device_ids = get_visible_device_ids()
+        if device_ids is None:
+            return gpus
+        return [gpus[i] for i in device_ids if i < len(gpus)]
+
+    def _to_info(self, gpu):
+        return {
+            'name': gpu.name,
+            'total': gpu.memoryTotal,
+            'used': gpu.memoryUsed,
+            'percent': gpu.memoryUtil * 100
+        }
+
+    def device_count(self):
+        return len(self._get_visible_gpus())
+
+    def get_gpu_info(self, index=0):
+        gpus = self._get_visible_gpus()
+        if index >= len(gpus):
+            return None
+        return self._to_info(gpus[index])
+
+    def get_all_gpu_info(self):
+        # nvidia-smi 한 번 호출로 모든 GPU 조회
+        gpu_infos = []
+        for index, gpu in enumerate(self._get_visible_gpus()):
+            gpu_info = self._to_info(gpu)
+            gpu_info['index'] = index
+            gpu_infos.append(gpu_info)
+        return gpu_infos
+
+
+class FakeBackend(TelemetryBackend):
+    """테스트용 결정적 가짜 백엔드"""
+
+    name = "fake"
+
+    def __init__(self, total=24576.0, used=0.0, gpu_name="Fake GPU", devices=1):
+        self.devices = [
+            {'name': gpu_name, 'total': float(total), 'used': float(used)}
+            for _ in range(devices)
+        ]
+        self.sample_count = 0
+
+    def set_used(self, used, index=0):
+        """사용 중 메모리(MB) 설정"""
+        self.devices[index]['used'] = float(used)
+
+    def device_count(self):
+        return len(self.devices)
+
+    def get_gpu_info(self, index=0):
+        self.sample_count += 1
+        if index >= len(self.devices):
+            return None
+
+        device = self.devices[index]
+        return {
+            'name': device['name'],
+            'total': device['total'],
+            'used': device['used'],
+            'percent': device['used'] / device['total'] * 100 if device['total'] else 0.0
+        }
+
+
+BACKENDS = {
+    'nvml': NVMLBackend,
+    'torch': TorchCudaBackend,
+    'gputil': GPUtilBackend,
+    'fake': FakeBackend
+}
+
+# 자동 선택 순서: 가장 빠른 인프로세스 백엔드부터
+AUTO_ORDER = ['nvml', 'torch', 'gputil']
+
+
+def select_backend(preferred=None):
+    """텔레메트리 백엔드 선택 (STRAWBERRY_TELEMETRY_BACKEND 환경변수로 지정 가능)"""
+    preferred = (preferred or os.environ.get("STRAWBERRY_TELEMETRY_BACKEND", "auto")).lower()
+
+    if preferred != "auto":
+        if preferred not in BACKENDS:
+            print(f"🍓 [StrawberryFist] Unknown telemetry backend '{preferred}', using auto selection")
+        else:
+            try:
+                return BACKENDS[preferred]()
+            except Exception as e:
+                print(f"🍓 [StrawberryFist] Telemetry backend '{preferred}' unavailable: {e}")
+
+    for backend_name in AUTO_ORDER:
+        try:
+            backend = BACKENDS[backend_name]()
+            if backend_name != 'gputil' and backend.device_count() == 0:
+                backend.close()
+                continue
+            return backend
+        except Exception:
+            continue
+
+    return GPUtilBackend()
@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+import time
+
+from .sampler_service import SamplerService
+
+# 델타에 포함할 최소 변화량 (노이즈 수준의 변화는 전송하지 않음)
+USED_EPSILON_MB = 0.5
+PERCENT_EPSILON = 0.05
+
+
+def format_sse(event, payload):
+    """server-sent events 메시지 인코딩"""
+    return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class StreamSubscriber:
+    """구독자 하나의 대기 중인 델타 (느린 클라이언트는 큐 대신 최신 값으로 병합)"""
+
+    def __init__(self, interval, notify=None):
+        self.interval = interval
+        self._notify = notify
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_time = None
+        self._needs_snapshot = True
+
+        self.sent = 0
+        self.coalesced = 0
+
+    def offer(self, delta, timestamp):
+        """새 델타 병합 (대기 중이던 델타가 없을 때만 깨움)"""
+        with self._lock:
+            was_empty = not self._pending
+            if not was_empty:
+                self.coalesced += 1
+            for index, fields in delta.items():
+                self._pending.setdefault(index, {}).update(fields)
+            self._pending_time = timestamp
+        if was_empty:
+            self.wakeup()
+
+    def wakeup(self):
+        if self._notify is None:
+            return
+        try:
+            self._notify()
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힌 연결
+            pass
+
+    def take(self, snapshot_fn):
+        """다음 이벤트 (kind, payload), 보낼 것이 없으면 None"""
+        with self._lock:
+            if self._needs_snapshot:
+                timestamp, devices = snapshot_fn()
+                if timestamp is None:
+                    # 아직 첫 샘플 전
+                    return None
+                self._needs_snapshot = False
+                self._pending = {}
+                self._pending_time = None
+                kind = "snapshot"
+            elif self._pending:
+                timestamp, devices = self._pending_time, self._pending
+                self._pending = {}
+                self._pending_time = None
+                kind = "delta"
+            else:
+                return None
+            self.sent += 1
+        return kind, {'time': timestamp, 'devices': {str(index): fields for index, fields in devices.items()}}
+
+
+class TelemetryStream:
+    """GPU 텔레메트리를 구독자들에게 델타로 푸시하는 팬아웃 허브
+
+    구독자가 있을 때만 공용 샘플러를 구독하며, 주기는 가장 빠른 구독자의 요청
+    주기(최소 min_interval)를 따른다. 구독자별로 대기 중인 델타는
+    하나로 병합되므로 느린 클라이언트가 있어도 메모리와 다른 구독자는 영향을 받지 않는다.
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, sampler=None, interval=1.0, min_interval=0.1):
+        self.sampler = sampler or SamplerService.shared()
+        self.interval = interval
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._state = {}
+        self._state_time = None
+        self._sampling = None
+
+        self.published = 0
+        self.empty_deltas = 0
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 스트림"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                interval = float(os.environ.get("STRAWBERRY_STREAM_INTERVAL", "1.0"))
+                cls._shared_instance = cls(interval=interval)
+            return cls._shared_instance
+
+    def subscribe(self, interval=None, notify=None):
+        """구독 등록 (interval 초마다 최대 한 번 이벤트 수신)"""
+        interval = self.interval if interval is None else max(self.min_interval, float(interval))
+        subscriber = StreamSubscriber(interval, notify)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            self._update_sampling()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            self._update_sampling()
+
+    def set_interval(self, interval):
+        """기본 업데이트 주기(초) 변경"""
+        self.interval = max(self.min_interval, float(interval))
+
+    def get_sample_interval(self):
+        """현재 샘플링 주기 (가장 빠른 구독자 기준)"""
+        with self._lock:
+            if not self._subscribers:
+                return self.interval
+            return max(self.min_interval, min(subscriber.interval for subscriber in self._subscribers))
+
+    def _update_sampling(self):
+        # self._lock 보유 상태에서 호출
+        if not self._subscribers:
+            if self._sampling is not None:
+                self._sampling.cancel()
+                self._sampling = None
+            return
+        interval = max(self.min_interval, min(subscriber.interval for subscriber in self._subscribers))
+        if self._sampling is None:
+            self._sampling = self.sampler.subscribe("telemetry_stream", interval, self.publish)
+        else:
+            self._sampling.update(interval)
+
+    def publish(self, gpu_infos, timestamp=None):
+        """새 샘플을 반영하고 변경된 값만 구독자에게 전달"""
+        timestamp = time.time() if timestamp is None else timestamp
+        delta = {}
+        with self._lock:
+            for gpu_info in gpu_infos:
+                index = gpu_info['index']
+                fields = {
+                    'name': gpu_info['name'],
+                    'used': round(gpu_info['used'], 1),
+                    'total': round(gpu_info['total'], 1),
+                    'percent': round(gpu_info['percent'], 2)
+                }
+                previous = self._state.get(index)
+                if previous is None:
+                    changed = fields
+                else:
+                    changed = {
+                        key: value for key, value in fields.items()
+                        if key in ('name', 'total') and value != previous[key]
+                    }
+                    if abs(fields['used'] - previous['used']) >= USED_EPSILON_MB:
+                        changed['used'] = fields['used']
+                    if abs(fields['percent'] - previous['percent']) >= PERCENT_EPSILON:
+                        changed['percent'] = fields['percent']
+                if changed:
+                    self._state.setdefault(index, {}).update(changed)
+                    delta[index] = changed
+            self._state_time = timestamp
+            subscribers = list(self._subscribers)
+
+            if not delta:
+                self.empty_deltas += 1
+                return delta
+            self.published += 1
+
+        for subscriber in subscribers:
+            subscriber.offer(delta, timestamp)
+        return delta
+
+    def get_snapshot(self):
+        """(timestamp, 장치별 전체 상태)"""
+        with self._lock:
+            return self._state_time, {index: dict(fields) for index, fields in self._state.items()}
+
+    def next_event(self, subscriber):
+        """구독자에게 보낼 다음 이벤트 (첫 이벤트는 전체 스냅샷)"""
+        return subscriber.take(self.get_snapshot)
+
+    def get_stats(self):
+        """구독자/발행/병합 통계"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            return {
+                'subscribers': len(subscribers),
+                'published': self.published,
+                'empty_deltas': self.empty_deltas,
+                'coalesced': sum(subscriber.coalesced for subscriber in subscribers),
+                'interval': self.interval
+            }
@@ -0,0 +1,492 @@
+import atexit
+import heapq
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+
+from .gpu_coordination import FileLock
+
+# 파일 헤더: magic, version, record_size, capacity, head, count
+HEADER = struct.Struct("<4sHHQQQ")
+HEADER_SIZE = 64
+MAGIC = b"SFTS"
+VERSION = 1
+
+# 레코드: timestamp, gpu, count, percent(min/mean/max), used_mb(min/mean/max)
+RECORD = struct.Struct("<dHxxIffffff")
+FIELDS = ('timestamp', 'gpu', 'count', 'percent_min', 'percent_mean', 'percent_max',
+          'used_min', 'used_mean', 'used_max')
+
+# 해상도별 버킷 크기(초)와 전체 용량 중 차지하는 비율
+LEVELS = {
+    'raw': (None, 0.50),
+    '1s': (1, 0.25),
+    '1m': (60, 0.15),
+    '1h': (3600, 0.10)
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024**2
+
+# 한 저장소 폴더에 동시에 기록할 수 있는 프로세스 수 (첫 프로세스는 폴더 자체, 나머지는 writer-<n> 하위 폴더)
+MAX_WRITERS = 16
+
+
+def default_store_directory():
+    """기록 저장 위치 (STRAWBERRY_HISTORY_DIR → ComfyUI user 디렉터리 → 패키지 폴더)"""
+    directory = os.environ.get("STRAWBERRY_HISTORY_DIR")
+    if directory:
+        return directory
+    try:
+        import folder_paths
+        return os.path.join(folder_paths.get_user_directory(), "strawberry_history")
+    except (ImportError, AttributeError):
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "history")
+
+
+def store_directories(directory=None):
+    """기록 폴더와 그 writer-<n> 하위 폴더 중 존재하는 것 (내보내기/조회용)"""
+    directory = directory or default_store_directory()
+    candidates = [directory] + [os.path.join(directory, f"writer-{slot}") for slot in range(1, MAX_WRITERS)]
+    return [path for path in candidates if os.path.isdir(path)]
+
+
+def _pread(fd, size, offset):
+    # os.pread는 Windows에 없음
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+class RingFile:
+    """고정 길이 레코드 링 파일 (mmap, 용량 초과 시 가장 오래된 레코드부터 덮어씀)"""
+
+    def __init__(self, path, capacity, read_only=False):
+        self.path = path
+        self.capacity = max(1, int(capacity))
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        if read_only:
+            self._open_read_only()
+        else:
+            self._open()
+
+    def _open_read_only(self):
+        """다른 프로세스가 기록 중인 파일 읽기 (용량은 파일 헤더를 따르고 파일을 바꾸지 않음)"""
+        self.sequence = 0
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+                raise ValueError(f"{self.path} is not a history file")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, capacity, _, _ = HEADER.unpack_from(self.map, 0)
+        if (magic, version, record_size) != (MAGIC, VERSION, RECORD.size) or len(self.map) < HEADER_SIZE + capacity * RECORD.size:
+            self.map.close()
+            raise ValueError(f"{self.path} is not a history file")
+        self.capacity = capacity
+        self._refresh()
+
+    def _refresh(self):
+        # 기록 중인 프로세스가 갱신한 head/count 다시 읽기
+        _, _, _, _, head, count = HEADER.unpack_from(self.map, 0)
+        self.head, self.count = head % self.capacity, min(count, self.capacity)
+
+    def _open(self):
+        size = HEADER_SIZE + self.capacity * RECORD.size
+        self.head = 0
+        self.count = 0
+        self.sequence = 0
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.fstat(fd).st_size
+            if existing >= HEADER_SIZE:
+                magic, version, record_size, capacity, head, count = HEADER.unpack(_pread(fd, HEADER.size, 0))
+                if (magic, version, record_size, capacity) == (MAGIC, VERSION, RECORD.size, self.capacity):
+                    self.head, self.count = head, min(count, capacity)
+                else:
+                    # 형식/용량이 바뀐 파일은 최근 레코드만 옮겨 담음
+                    recent = self._read_foreign(fd, existing)
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    self.map = mmap.mmap(fd, size)
+                    for record in recent[-self.capacity:]:
+                        self._write(record)
+                    self._sync_header()
+                    return
+            if existing != size:
+                os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size)
+            self._sync_header()
+        finally:
+            os.close(fd)
+
+    def _read_foreign(self, fd, existing):
+        try:
+            magic, version, record_size, capacity, head, count = HEADER.unpack(_pread(fd, HEADER.size, 0))
+        except struct.error:
+            return []
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            return []
+        if existing < HEADER_SIZE + capacity * RECORD.size:
+            return []
+        data = _pread(fd, capacity * RECORD.size, HEADER_SIZE)
+        start = (head - count) % capacity
+        return [
+            RECORD.unpack_from(data, ((start + offset) % capacity) * RECORD.size)
+            for offset in range(min(count, capacity))
+        ]
+
+    def _sync_header(self):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, self.capacity, self.head, self.count)
+
+    def _write(self, record):
+        RECORD.pack_into(self.map, HEADER_SIZE + self.head * RECORD.size, *record)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.sequence += 1
+
+    def append_many(self, records):
+        """레코드 일괄 추가 (헤더는 한 번만 갱신)"""
+        with self._lock:
+            for record in records:
+                self._write(record)
+            self._sync_header()
+
+    def __len__(self):
+        return self.count
+
+    def iter_records(self, start=None, end=None, gpu=None, chunk=4096):
+        """오래된 순서로 레코드 순회 (mmap에서 직접 언패킹, 청크 단위로 잠금)"""
+        with self._lock:
+            if self.read_only:
+                self._refresh()
+            count = self.count
+            first = (self.head - count) % self.capacity
+            sequence = self.sequence
+        offset = 0
+        while offset < count:
+            with self._lock:
+                # 순회 중 덮어써진 레코드는 건너뜀 (빈 슬롯이 먼저 채워진 뒤부터 덮어씀)
+                overwritten = max(0, self.sequence - sequence - (self.capacity - count))
+                rows = []
+                for position in range(max(offset, overwritten), min(offset + chunk, count)):
+                    index = (first + position) % self.capacity
+                    rows.append(RECORD.unpack_from(self.map, HEADER_SIZE + index * RECORD.size))
+            offset += chunk
+            for row in rows:
+                if start is not None and row[0] < start:
+                    continue
+                if end is not None and row[0] >= end:
+                    continue
+                if gpu is not None and row[1] != gpu:
+                    continue
+                yield row
+
+    def flush(self):
+        with self._lock:
+            self.map.flush()
+
+    def close(self):
+        with self._lock:
+            if not self.map.closed:
+                self.map.flush()
+                self.map.close()
+
+
+class _Bucket:
+    __slots__ = ('start', 'count', 'percent_sum', 'percent_min', 'percent_max', 'used_sum', 'used_min', 'used_max')
+
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        self.percent_sum = 0.0
+        self.used_sum = 0.0
+        self.percent_min = self.used_min = float('inf')
+        self.percent_max = self.used_max = float('-inf')
+
+    def add(self, percent, used):
+        self.count += 1
+        self.percent_sum += percent
+        self.used_sum += used
+        self.percent_min = min(self.percent_min, percent)
+        self.percent_max = max(self.percent_max, percent)
+        self.used_min = min(self.used_min, used)
+        self.used_max = max(self.used_max, used)
+
+    def to_record(self, gpu):
+        return (self.start, gpu, self.count,
+                self.percent_min, self.percent_sum / self.count, self.percent_max,
+                self.used_min, self.used_sum / self.count, self.used_max)
+
+
+class TimeSeriesStore:
+    """GPU 샘플 영구 저장소 (원본 + 1s/1m/1h 롤업, 크기 기반 보존)
+
+    append()는 제한된 큐에 넣기만 하므로 샘플러 스레드를 막지 않는다. 큐가 가득 차면
+    샘플을 버리고 dropped를 증가시킨다. 파일 기록과 롤업은 전용 writer 스레드가 수행한다.
+
+    링 파일의 head는 기록하는 프로세스의 메모리에만 있으므로 한 폴더에는 한 프로세스만 기록한다.
+    폴더 잠금을 다른 프로세스(같은 설치의 다른 ComfyUI 워커 등)가 쥐고 있으면 writer-<n> 하위 폴더에 기록한다.
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, queue_size=10000, flush_interval=5.0, read_only=False):
+        self.directory = directory or default_store_directory()
+        # 요청한 폴더 (잠금이 잡혀 있으면 실제 기록 폴더는 그 writer-<n> 하위 폴더)
+        self.base_directory = self.directory
+        self.max_bytes = int(max_bytes)
+        self.flush_interval = flush_interval
+        # 읽기 전용: 다른 프로세스(모니터 노드, 헤드리스 데몬)가 기록 중인 저장소 조회, 있는 레벨만 연다
+        self.read_only = read_only
+        self._directory_lock = None
+        if not read_only:
+            self.directory, self._directory_lock = self._acquire_directory(self.directory)
+
+        self.files = {}
+        for level, (_, share) in LEVELS.items():
+            capacity = int(self.max_bytes * share) // RECORD.size
+            path = os.path.join(self.directory, f"gpu_{level}.bin")
+            if read_only:
+                if os.path.exists(path):
+                    self.files[level] = RingFile(path, capacity, read_only=True)
+            else:
+                self.files[level] = RingFile(path, capacity)
+
+        self._buckets = {level: {} for level, (seconds, _) in LEVELS.items() if seconds}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self._closed = False
+
+        self.written = 0
+        self.dropped = 0
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 저장소"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                max_mb = float(os.environ.get("STRAWBERRY_HISTORY_MAX_MB", DEFAULT_MAX_BYTES / 1024**2))
+                cls._shared_instance = cls(max_bytes=max_mb * 1024**2)
+                # 종료 시 큐에 남은 샘플과 진행 중인 1s/1m/1h 롤업 버킷 기록
+                atexit.register(cls._shared_instance.close)
+            return cls._shared_instance
+
+    @staticmethod
+    def _acquire_directory(directory):
+        """기록할 폴더와 그 잠금 (폴더를 다른 프로세스가 쓰는 중이면 비어 있는 writer-<n> 하위 폴더)"""
+        for slot in range(MAX_WRITERS):
+            path = directory if slot == 0 else os.path.join(directory, f"writer-{slot}")
+            os.makedirs(path, exist_ok=True)
+            lock = FileLock(os.path.join(path, "writer.lock"))
+            if lock.acquire():
+                return path, lock
+        raise OSError(f"history store {directory}: all {MAX_WRITERS} writer slots are in use")
+
+    def append(self, timestamp, gpu, percent, used):
+        """샘플 추가 (블로킹 없음)"""
+        if self.read_only:
+            raise ValueError("history store was opened read-only")
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait((timestamp, gpu, percent, used))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        if self._thread is None:
+            self._start_writer()
+        return True
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="StrawberryHistoryWriter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopped:
+                    return
+                self.flush()
+                continue
+            if first is None:
+                self._flush_buckets()
+                return
+
+            batch = [first]
+            while len(batch) < 1024:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write_batch(batch)
+                    self._flush_buckets()
+                    return
+                batch.append(item)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        try:
+            raw = []
+            rollups = {level: [] for level in self._buckets}
+            for timestamp, gpu, percent, used in batch:
+                raw.append((timestamp, gpu, 1, percent, percent, percent, used, used, used))
+                for level, buckets in self._buckets.items():
+                    seconds = LEVELS[level][0]
+                    start = timestamp - timestamp % seconds
+                    bucket = buckets.get(gpu)
+                    if bucket is not None and bucket.start != start:
+                        rollups[level].append(bucket.to_record(gpu))
+                        bucket = None
+                    if bucket is None:
+                        bucket = _Bucket(start)
+                        buckets[gpu] = bucket
+                    bucket.add(percent, used)
+
+            self.files['raw'].append_many(raw)
+            for level, records in rollups.items():
+                if records:
+                    self.files[level].append_many(records)
+            self.written += len(batch)
+        except Exception as e:
+            print(f"🍓 [StrawberryFist] History write error: {e}")
+
+    def _flush_buckets(self):
+        """진행 중인 롤업 버킷 기록 (종료 시 writer 스레드에서)"""
+        try:
+            for level, buckets in self._buckets.items():
+                records = [bucket.to_record(gpu) for gpu, bucket in buckets.items()]
+                if records:
+                    self.files[level].append_many(records)
+                buckets.clear()
+        except Exception as e:
+            print(f"🍓 [StrawberryFist] History write error: {e}")
+
+    def flush(self):
+        for ring in self.files.values():
+            ring.flush()
+
+    def close(self, timeout=2):
+        """큐를 비우고 파일 닫기 (진행 중인 롤업 버킷은 writer 스레드가 종료 신호를 받을 때 기록)"""
+        if self._closed:
+            return
+        self._closed = True
+        thread = self._thread
+        if thread is not None:
+            self._stopped = True
+            self._queue.put(None)
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                # 아직 기록 중인 파일을 닫지 않는다 (daemon 스레드라 프로세스 종료 시 함께 끝남)
+                print(f"🍓 [StrawberryFist] History writer did not finish within {timeout}s, leaving {self.directory} open")
+                return
+            self._thread = None
+        for ring in self.files.values():
+            ring.close()
+        if self._directory_lock is not None:
+            self._directory_lock.release()
+            self._directory_lock = None
+
+    def query(self, level='raw', start=None, end=None, gpu=None):
+        """레코드 dict 순회"""
+        if level not in self.files:
+            raise ValueError(f"unknown level '{level}' (expected one of {', '.join(LEVELS)})")
+        for row in self.files[level].iter_records(start, end, gpu):
+            yield dict(zip(FIELDS, row))
+
+    def export(self, level='raw', fmt='csv', start=None, end=None, gpu=None):
+        """CSV/JSON 스트리밍 내보내기 (텍스트 조각 생성기, 잘못된 인자는 즉시 ValueError)"""
+        if fmt not in ('csv', 'json'):
+            raise ValueError("format must be 'csv' or 'json'")
+        if level not in self.files:
+            raise ValueError(f"unknown level '{level}' (expected one of {', '.join(LEVELS)})")
+        rows = self.files[level].iter_records(start, end, gpu)
+        return self._export_csv(rows) if fmt == 'csv' else self._export_json(rows)
+
+    @classmethod
+    def export_all(cls, directory=None, level='raw', fmt='csv', start=None, end=None, gpu=None):
+        """폴더와 writer-<n> 하위 폴더의 기록을 시간순으로 합쳐 내보내기 (기록 저장소를 새로 열지 않음)
+
+        이 프로세스의 공유 저장소가 이미 열려 있으면 그대로 쓰고, 나머지 폴더는 읽기 전용으로 연다.
+        잘못된 인자는 즉시 ValueError, 폴더를 열 수 없으면 OSError.
+        """
+        if fmt not in ('csv', 'json'):
+            raise ValueError("format must be 'csv' or 'json'")
+        if level not in LEVELS:
+            raise ValueError(f"unknown level '{level}' (expected one of {', '.join(LEVELS)})")
+
+        shared = cls._shared_instance
+        directory = directory or (shared.base_directory if shared is not None else default_store_directory())
+        stores = [shared] if shared is not None and not shared._closed else []
+        owned = []
+        try:
+            for path in store_directories(directory):
+                if stores and path == stores[0].directory:
+                    continue
+                try:
+                    owned.append(cls(path, read_only=True))
+                except ValueError:
+                    # 기록을 막 시작해 헤더가 아직 없는 파일 등은 건너뜀
+                    continue
+        except OSError:
+            for store in owned:
+                store.close()
+            raise
+        stores += owned
+
+        def rows():
+            try:
+                yield from heapq.merge(
+                    *(store.files[level].iter_records(start, end, gpu) for store in stores if level in store.files),
+                    key=lambda row: row[0]
+                )
+            finally:
+                for store in owned:
+                    store.close()
+
+        return cls._export_csv(rows()) if fmt == 'csv' else cls._export_json(rows())
+
+    @staticmethod
+    def _export_csv(rows):
+        yield ",".join(FIELDS) + "\n"
+        for row in rows:
+            yield "%.3f,%d,%d,%.2f,%.2f,%.2f,%.1f,%.1f,%.1f\n" % row
+
+    @staticmethod
+    def _export_json(rows):
+        yield "["
+        separator = ""
+        for row in rows:
+            yield separator + json.dumps(dict(zip(FIELDS, row)), separators=(',', ':'))
+            separator = ","
+        yield "]\n"
+
+    def export_to(self, path, level='raw', fmt='csv', start=None, end=None, gpu=None):
+        """파일로 내보내기, 기록한 바이트 수 반환"""
+        written = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for chunk in self.export(level, fmt, start, end, gpu):
+                f.write(chunk)
+                written += len(chunk)
+        return written
+
+    def get_stats(self):
+        """레벨별 레코드 수/용량, 기록/유실 샘플 수"""
+        return {
+            'directory': self.directory,
+            'max_bytes': self.max_bytes,
+            'levels': {level: {'records': len(ring), 'capacity': ring.capacity} for level, ring in self.files.items()},
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+
+TRACE_VERSION = 1
+
+
+def default_trace_directory():
+    """트레이스 저장 위치 (STRAWBERRY_TRACE_DIR → 기록 저장소 폴더의 traces)"""
+    directory = os.environ.get("STRAWBERRY_TRACE_DIR")
+    if directory:
+        return directory
+    from .timeseries_store import default_store_directory
+    return os.path.join(default_store_directory(), "traces")
+
+
+def _mb(value):
+    return round(float(value), 1)
+
+
+class TraceRecorder:
+    """프롬프트/정리 단위 JSONL 트레이스 기록 (오프라인 정책 시뮬레이터 입력)
+
+    한 줄에 한 이벤트를 기록한다:
+    - prompt: 시작 시각, 실행 시간, 성공/OOM 여부, 워크플로/모델 구성 지문, GPU별 시작 시 드라이버 사용량과
+      총량, 시작/끝 할당·예약 메모리, 피크 (MB)
+    - cleanup: 정리 모드, 사유, GPU별 정리 전후 예약 메모리, 남은 할당 메모리, 소요 시간
+
+    프로세스마다 별도 파일(trace-<날짜>-<pid>.jsonl)에 추가 기록하므로 여러 워커가 같은 폴더를 써도 된다.
+    """
+
+    _shared_instance = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.enabled = False
+        self.path = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._starts = {}
+
+        self.prompts = 0
+        self.cleanups = 0
+
+    @classmethod
+    def shared(cls):
+        """프로세스 단일 기록기"""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        """기록 중지 (파일 닫기, 다시 켜면 같은 파일에 이어서 기록)"""
+        self.enabled = False
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._starts.clear()
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(',', ':')) + "\n"
+        with self._lock:
+            if self._file is None:
+                directory = self.directory or default_trace_directory()
+                os.makedirs(directory, exist_ok=True)
+                if self.path is None:
+                    self.path = os.path.join(directory, f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def begin(self, prompt_id, gpu_infos):
+        """프롬프트 시작 시 드라이버 기준 사용량/총량 (다른 프로세스와 CUDA 컨텍스트 몫 산정용)"""
+        if not self.enabled:
+            return
+        self._starts[prompt_id] = {g['index']: (g['used'], g['total']) for g in gpu_infos}
+
+    def record_prompt(self, record, model_set=None, oom=False):
+        """PromptPeakTracker 기록을 트레이스 한 줄로 저장"""
+        if not self.enabled or record is None:
+            return False
+        starts = self._starts.pop(record['prompt_id'], {})
+        gpus = []
+        for device, entry in sorted(record['devices'].items()):
+            used, total = starts.get(device, (None, None))
+            gpus.append({
+                'i': device,
+                'total': _mb(total) if total is not None else None,
+                'used': _mb(used) if used is not None else None,
+                'res0': _mb(entry['reserved_start']),
+                'alloc0': _mb(entry['allocated_start']),
+                'peak_res': _mb(entry['peak_reserved']),
+                'peak_alloc': _mb(entry['peak_allocated']),
+                'res1': _mb(entry['reserved_end']),
+                'alloc1': _mb(entry['allocated_end'])
+            })
+        self._write({
+            'v': TRACE_VERSION,
+            'type': 'prompt',
+            't': round(record['started'], 3),
+            'id': record['prompt_id'],
+            'dur': round(record['duration'], 4),
+            'ok': bool(record['success']),
+            'oom': bool(oom),
+            'wf': record['fingerprint'],
+            'models': model_set,
+            'gpus': gpus
+        })
+        self.prompts += 1
+        return True
+
+    def record_cleanup(self, result, reason=None):
+        """VRAMCleaner 정리 결과를 트레이스 한 줄로 저장"""
+        if not self.enabled or not result or not result.get('success'):
+            return False
+        device_results = result.get('devices') or {}
+        gpus = [
+            {
+                'i': device,
+                'before': _mb(r['before']),
+                'after': _mb(r['after']),
+                'alloc': _mb(r.get('allocated', 0)),
+                'dur': round(r.get('duration', 0.0), 5)
+            }
+            for device, r in sorted(device_results.items()) if r.get('success')
+        ]
+        self._write({
+            'v': TRACE_VERSION,
+            'type': 'cleanup',
+            't': round(time.time(), 3),
+            'mode': result.get('mode'),
+            'reason': reason,
+            'dur': round(result.get('duration', 0.0), 5),
+            'gpus': gpus
+        })
+        self.cleanups += 1
+        return True
+
+    def format_stats(self):
+        """UI/로그용 한 줄 요약"""
+        location = self.path or (self.directory or "trace directory")
+        return f"🧾 Trace: {self.prompts} prompts, {self.cleanups} cleanups → {location}"
@@ -0,0 +1,164 @@
+from array import array
+
+# 이보다 완만한 증가(%/s)는 예측하지 않음
+MIN_FORECAST_SLOPE = 0.001
+
+
+class TrendAnalyzer:
+    """사용률 추세 분석 (롤링 최소제곱 기울기, EWMA, CUSUM 변화점 탐지)
+
+    회귀에 필요한 합계를 샘플 추가/제거 시 갱신하므로 추가와 조회 모두 O(1)이다.
+    CUSUM은 회귀선의 한 단계 예측 오차에 적용되어, 일정한 증가는 변화로 보지 않고
+    급격한 점프나 기울기 변화만 감지한다. 변화가 감지되면 회귀 윈도우를 새 구간부터 다시 시작한다.
+    """
+
+    def __init__(self, window=120, smoothing=0.2, cusum_drift=0.5, cusum_threshold=5.0, min_samples=5):
+        self.window = max(2, int(window))
+        self.smoothing = smoothing
+        self.cusum_drift = cusum_drift
+        self.cusum_threshold = cusum_threshold
+        self.min_samples = min_samples
+
+        self.ewma = None
+        self.change_points = 0
+        self.last_change_time = None
+        self._reset_window()
+
+    def _reset_window(self):
+        self._times = array('d', [0.0]) * self.window
+        self._values = array('d', [0.0]) * self.window
+        self._head = 0
+        self._count = 0
+        self._evictions = 0
+        self._origin = None
+        self._sum_t = self._sum_y = self._sum_tt = self._sum_ty = 0.0
+        self._cusum_pos = self._cusum_neg = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def _push(self, timestamp, percent):
+        if self._origin is None:
+            # 큰 epoch 값의 제곱으로 인한 정밀도 손실 방지
+            self._origin = timestamp
+        t = timestamp - self._origin
+
+        if self._count == self.window:
+            old_t = self._times[self._head]
+            old_y = self._values[self._head]
+            self._sum_t -= old_t
+            self._sum_y -= old_y
+            self._sum_tt -= old_t * old_t
+            self._sum_ty -= old_t * old_y
+            self._evictions += 1
+        else:
+            self._count += 1
+
+        self._times[self._head] = t
+        self._values[self._head] = percent
+        self._head = (self._head + 1) % self.window
+        self._sum_t += t
+        self._sum_y += percent
+        self._sum_tt += t * t
+        self._sum_ty += t * percent
+
+        # 누적 오차 보정 (window 회 교체마다 한 번)
+        if self._evictions >= self.window:
+            self._evictions = 0
+            times = [self._times[i] for i in self._indices()]
+            values = [self._values[i] for i in self._indices()]
+            self._sum_t = sum(times)
+            self._sum_y = sum(values)
+            self._sum_tt = sum(t * t for t in times)
+            self._sum_ty = sum(t * y for t, y in zip(times, values))
+
+    def _indices(self):
+        start = (self._head - self._count) % self.window
+        for offset in range(self._count):
+            yield (start + offset) % self.window
+
+    def add(self, timestamp, percent):
+        """샘플 추가, 변화점이 감지되면 True"""
+        changed = False
+        expected = self.predict(timestamp) if self._count >= self.min_samples else self.ewma
+        if expected is not None:
+            error = percent - expected
+            self._cusum_pos = max(0.0, self._cusum_pos + error - self.cusum_drift)
+            self._cusum_neg = max(0.0, self._cusum_neg - error - self.cusum_drift)
+            if self._cusum_pos > self.cusum_threshold or self._cusum_neg > self.cusum_threshold:
+                changed = True
+                self.change_points += 1
+                self.last_change_time = timestamp
+                self._reset_window()
+
+        self.ewma = percent if self.ewma is None or changed else self.ewma + self.smoothing * (percent - self.ewma)
+        self._push(timestamp, percent)
+        return changed
+
+    def slope(self):
+        """최소제곱 기울기 (%/s), 샘플이 부족하면 None"""
+        n = self._count
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (n * self._sum_ty - self._sum_t * self._sum_y) / denominator
+
+    def predict(self, timestamp):
+        """회귀선의 timestamp 시점 값"""
+        slope = self.slope()
+        if slope is None:
+            return None
+        n = self._count
+        intercept = (self._sum_y - slope * self._sum_t) / n
+        return intercept + slope * (timestamp - self._origin)
+
+    def latest_time(self):
+        if not self._count:
+            return None
+        return self._times[(self._head - 1) % self.window] + self._origin
+
+    def seconds_until_full(self, limit=100.0, max_horizon=86400.0):
+        """현재 추세로 limit%에 도달할 때까지 남은 초, 예측 불가/감소 추세면 -1"""
+        if self._count < self.min_samples:
+            return -1.0
+        slope = self.slope()
+        if slope is None or slope < MIN_FORECAST_SLOPE:
+            return -1.0
+        level = self.predict(self.latest_time())
+        seconds = max(0.0, (limit - level) / slope)
+        return seconds if seconds <= max_horizon else -1.0
+
+    def resize(self, window):
+        """윈도우 크기 변경 (최근 샘플 유지)"""
+        window = max(2, int(window))
+        if window == self.window:
+            return
+        recent = [(self._times[i] + self._origin, self._values[i]) for i in self._indices()][-window:]
+        self.window = window
+        self._reset_window()
+        for timestamp, percent in recent:
+            self._push(timestamp, percent)
+
+    def get_stats(self, limit=100.0):
+        """추세 요약"""
+        return {
+            'samples': self._count,
+            'slope': self.slope(),
+            'ewma': self.ewma,
+            'change_points': self.change_points,
+            'last_change_time': self.last_change_time,
+            'seconds_until_full': self.seconds_until_full(limit)
+        }
+
+
+def format_duration(seconds):
+    """예측 시간 표시 문자열"""
+    if seconds < 0:
+        return "no forecast"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds // 60:.0f}m{seconds % 60:02.0f}s"
+    return f"{seconds // 3600:.0f}h{seconds % 3600 // 60:02.0f}m"
@@ -1,25 +1,140 @@
-import torch
 import gc
 import time
+from collections import deque
+
+from .leak_detector import TensorLeakDetector
+from .host_memory import read_host_memory, can_malloc_trim, malloc_trim, get_host_empty_cache
 
 class VRAMCleaner:
     """VRAM 정리 전용 클래스"""
     
-    def __init__(self, clear_mode="Standard"):
+    def __init__(self, clear_mode="Standard", torch_module=None):
         self.clear_mode = clear_mode
+        self._torch = torch_module
+        
+        # 비용 기반 속도 제한 설정
+        self.min_interval = 0.0          # 자동 정리 최소 간격 (초, 0 = 제한 없음)
+        self.min_reclaim_mb = 0.0        # 이보다 적게 회수하면 효과 없는 정리로 간주 (0 = 사용 안 함)
+        self.max_backoff = 60.0          # 백오프 최대 간격 (초)
+        self.hysteresis = 10.0           # 재무장 밴드 폭 (%), 0이면 단일 임계값
+        
+        # 정리 이력 (회수량/비용)
+        self.recent_cleanups = deque(maxlen=8)
+        self.last_cleanup_time = None
+        self.ineffective_streak = 0
+        self.skipped_count = 0
+        self._armed = {}
+        
+        # 텐서 누수 탐지 (opt-in)
+        self.leak_detector = None
+    
+    @property
+    def torch(self):
+        """torch 모듈 (첫 사용 시 지연 import, 설치되지 않았으면 None)"""
+        if self._torch is None:
+            try:
+                import torch
+                self._torch = torch
+            except ImportError:
+                return None
+        return self._torch
     
     def is_cuda_available(self):
         """CUDA 사용 가능 여부 확인"""
-        return torch.cuda.is_available()
+        return self.torch is not None and self.torch.cuda.is_available()
     
-    def get_allocated_memory(self):
+    def get_device_count(self):
+        """CUDA 장치 개수"""
+        if self.is_cuda_available():
+            return self.torch.cuda.device_count()
+        return 0
+    
+    def get_allocated_memory(self, device=None):
         """현재 할당된 VRAM 메모리 크기 (MB)"""
         if self.is_cuda_available():
-            return torch.cuda.memory_allocated() / 1024**2
+            return self.torch.cuda.memory_allocated(device) / 1024**2
+        return 0
+    
+    def get_reserved_memory(self, device=None):
+        """캐싱 할당자가 예약한 VRAM 크기 (MB)"""
+        if self.is_cuda_available():
+            return self.torch.cuda.memory_reserved(device) / 1024**2
         return 0
     
-    def perform_cleanup(self):
-        """VRAM 정리 실행"""
+    def get_memory_snapshot(self, device=None):
+        """할당자 통계 + 드라이버 여유 메모리 스냅샷 (MB, fragmentation은 0~1 비율)"""
+        if not self.is_cuda_available():
+            return None
+        
+        cuda = self.torch.cuda
+        stats = cuda.memory_stats(device) if hasattr(cuda, 'memory_stats') else {}
+        allocated = stats.get('allocated_bytes.all.current', cuda.memory_allocated(device)) / 1024**2
+        reserved = stats.get('reserved_bytes.all.current', cuda.memory_reserved(device)) / 1024**2
+        inactive_split = stats.get('inactive_split_bytes.all.current', 0) / 1024**2
+        
+        driver_free = driver_total = 0.0
+        if hasattr(cuda, 'mem_get_info'):
+            free, total = cuda.mem_get_info(device)
+            driver_free, driver_total = free / 1024**2, total / 1024**2
+        
+        return {
+            'allocated': allocated,
+            'reserved': reserved,
+            'cached': reserved - allocated,
+            'inactive_split': inactive_split,
+            'fragmentation': inactive_split / reserved if reserved else 0.0,
+            'driver_free': driver_free,
+            'driver_total': driver_total
+        }
+    
+    def get_fragmentation_ratios(self, devices):
+        """장치별 단편화 비율 (비활성 분할 블록 / 예약 메모리)"""
+        ratios = {}
+        for device in devices:
+            snapshot = self.get_memory_snapshot(device)
+            if snapshot:
+                ratios[device] = snapshot['fragmentation']
+        return ratios
+    
+    def reset_peak_memory_stats(self, device=None):
+        """피크 메모리 카운터 초기화"""
+        if self.is_cuda_available():
+            self.torch.cuda.reset_peak_memory_stats(device)
+    
+    def get_peak_memory(self, device=None):
+        """마지막 초기화 이후 예약 메모리 피크 (MB)"""
+        if self.is_cuda_available():
+            return self.torch.cuda.max_memory_reserved(device) / 1024**2
+        return 0
+    
+    def enable_leak_detection(self, device="cuda", time_budget=0.05):
+        """텐서 누수 탐지 켜기 (device: "cuda", "cuda:1", "cpu" 등)"""
+        if self.leak_detector is None or self.leak_detector.device != device:
+            self.disable_leak_detection()
+            self.leak_detector = TensorLeakDetector(device=device, time_budget=time_budget, torch_module=self._torch)
+        self.leak_detector.time_budget = time_budget
+        return self.leak_detector
+    
+    def disable_leak_detection(self):
+        """텐서 누수 탐지 끄기 (진행 중인 스캔 해제)"""
+        if self.leak_detector is not None:
+            self.leak_detector.cancel()
+            self.leak_detector = None
+    
+    def scan_for_leaks(self, time_budget=None):
+        """누수 스캔을 시간 예산만큼 진행, 스캔이 끝나면 이전 스캔 대비 보고서 반환"""
+        if self.leak_detector is None:
+            return None
+        return self.leak_detector.step(time_budget)
+    
+    def get_peak_allocated_memory(self, device=None):
+        """마지막 초기화 이후 할당 메모리 피크 (MB)"""
+        if self.is_cuda_available():
+            return self.torch.cuda.max_memory_allocated(device) / 1024**2
+        return 0
+    
+    def perform_cleanup(self, device=None):
+        """VRAM 정리 실행 (device 지정 시 해당 장치 컨텍스트에서 실행)"""
         if not self.is_cuda_available():
             return {
                 'success': False,
@@ -29,27 +144,57 @@ class VRAMCleaner:
                 'cleared': 0
             }
         
+        if device is not None:
+            with self.torch.cuda.device(device):
+                result = self._cleanup_current_device()
+            result['device'] = device
+            return result
+        
+        return self._cleanup_current_device()
+    
+    def _timed(self, timings, step, fn):
+        """정리 단계 실행 시간 측정"""
+        start = time.perf_counter()
+        fn()
+        timings[step] = time.perf_counter() - start
+    
+    def _cleanup_current_device(self):
+        """현재 CUDA 장치 정리
+
+        empty_cache는 할당된 텐서가 아니라 캐시된 블록만 드라이버에 돌려주므로
+        회수량(cleared)은 예약 메모리 기준으로 계산한다.
+        """
         try:
-            before = self.get_allocated_memory()
+            before = self.get_memory_snapshot()
+            timings = {}
             
             # 기본 정리
-            torch.cuda.empty_cache()
-            torch.cuda.ipc_collect()
+            self._timed(timings, 'empty_cache', self.torch.cuda.empty_cache)
+            self._timed(timings, 'ipc_collect', self.torch.cuda.ipc_collect)
             
             # Aggressive 모드일 때 추가 정리
             if self.clear_mode == "Aggressive":
-                gc.collect()
-                if hasattr(torch.cuda, 'synchronize'):
-                    torch.cuda.synchronize()
+                self._timed(timings, 'gc_collect', gc.collect)
+                if hasattr(self.torch.cuda, 'synchronize'):
+                    self._timed(timings, 'synchronize', self.torch.cuda.synchronize)
             
-            after = self.get_allocated_memory()
-            cleared = before - after
+            after = self.get_memory_snapshot()
             
             return {
                 'success': True,
-                'before': before,
-                'after': after,
-                'cleared': cleared,
+                'before': before['reserved'],
+                'after': after['reserved'],
+                'cleared': before['reserved'] - after['reserved'],
+                'allocated': after['allocated'],
+                'inactive_split_before': before['inactive_split'],
+                'inactive_split_after': after['inactive_split'],
+                'fragmentation_before': before['fragmentation'],
+                'fragmentation_after': after['fragmentation'],
+                'driver_free_before': before['driver_free'],
+                'driver_free_after': after['driver_free'],
+                'driver_freed': after['driver_free'] - before['driver_free'],
+                'timings': timings,
+                'duration': sum(timings.values()),
                 'mode': self.clear_mode
             }
             
@@ -62,6 +207,184 @@ class VRAMCleaner:
                 'cleared': 0
             }
     
+    def perform_host_cleanup(self):
+        """호스트 메모리 정리 (gc → 고정 메모리 캐시 해제 → malloc_trim), 회수량은 프로세스 RSS 기준
+
+        gc로 풀린 텐서의 고정 메모리 블록을 먼저 돌려준 뒤, 비워진 glibc 힙 페이지를 OS에 반환한다.
+        """
+        try:
+            before = read_host_memory()
+            timings = {}
+            
+            self._timed(timings, 'gc_collect', gc.collect)
+            host_empty_cache = get_host_empty_cache(self.torch)
+            if host_empty_cache is not None:
+                self._timed(timings, 'pinned_empty_cache', host_empty_cache)
+            if can_malloc_trim():
+                self._timed(timings, 'malloc_trim', malloc_trim)
+            
+            after = read_host_memory()
+            if before is None or after is None:
+                before = after = {'rss': 0.0, 'available': 0.0}
+            
+            return {
+                'success': True,
+                'rss_before': before['rss'],
+                'rss_after': after['rss'],
+                'released': before['rss'] - after['rss'],
+                'available_before': before['available'],
+                'available_after': after['available'],
+                'timings': timings,
+                'duration': sum(timings.values())
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'released': 0.0
+            }
+    
+    def perform_cleanup_devices(self, devices=None):
+        """여러 GPU를 장치별로 정리하고 결과 합산"""
+        if devices is None:
+            devices = list(range(self.get_device_count()))
+        
+        if not self.is_cuda_available() or not devices:
+            return self.perform_cleanup()
+        
+        device_results = {}
+        for device in devices:
+            if device >= self.get_device_count():
+                continue
+            device_results[device] = self.perform_cleanup(device)
+        
+        if not device_results:
+            return self.perform_cleanup()
+        
+        results = list(device_results.values())
+        failed = [r for r in results if not r['success']]
+        
+        timings = {}
+        for r in results:
+            for step, seconds in r.get('timings', {}).items():
+                timings[step] = timings.get(step, 0.0) + seconds
+        
+        aggregated = {
+            'success': not failed,
+            'error': "; ".join(f"GPU{r['device']}: {r['error']}" for r in failed),
+            'before': sum(r['before'] for r in results),
+            'after': sum(r['after'] for r in results),
+            'cleared': sum(r['cleared'] for r in results),
+            'allocated': sum(r.get('allocated', 0) for r in results),
+            'inactive_split_before': sum(r.get('inactive_split_before', 0) for r in results),
+            'inactive_split_after': sum(r.get('inactive_split_after', 0) for r in results),
+            'driver_free_before': sum(r.get('driver_free_before', 0) for r in results),
+            'driver_free_after': sum(r.get('driver_free_after', 0) for r in results),
+            'driver_freed': sum(r.get('driver_freed', 0) for r in results),
+            'timings': timings,
+            'duration': sum(r.get('duration', 0) for r in results),
+            'mode': self.clear_mode,
+            'devices': device_results
+        }
+        
+        # 합산 단편화 비율
+        for phase in ('before', 'after'):
+            reserved = aggregated[phase]
+            aggregated[f'fragmentation_{phase}'] = aggregated[f'inactive_split_{phase}'] / reserved if reserved else 0.0
+        
+        return aggregated
+    
+    def configure_governor(self, min_interval=None, min_reclaim_mb=None, hysteresis=None, max_backoff=None):
+        """속도 제한/히스테리시스 설정 변경"""
+        if min_interval is not None:
+            self.min_interval = max(0.0, float(min_interval))
+        if min_reclaim_mb is not None:
+            self.min_reclaim_mb = max(0.0, float(min_reclaim_mb))
+        if hysteresis is not None:
+            self.hysteresis = max(0.0, float(hysteresis))
+        if max_backoff is not None:
+            self.max_backoff = max(0.0, float(max_backoff))
+    
+    def get_effective_interval(self):
+        """현재 적용 중인 최소 정리 간격 (효과 없는 정리가 이어지면 지수 백오프)"""
+        if self.ineffective_streak == 0:
+            return self.min_interval
+        base = max(self.min_interval, 1.0)
+        return min(self.max_backoff, base * 2 ** (self.ineffective_streak - 1))
+    
+    def get_skip_reason(self, now=None):
+        """최근 정리 이력상 이번 정리를 건너뛰어야 하면 사유 문자열, 아니면 None"""
+        if self.last_cleanup_time is None:
+            return None
+        
+        now = time.monotonic() if now is None else now
+        interval = self.get_effective_interval()
+        elapsed = now - self.last_cleanup_time
+        if elapsed >= interval:
+            return None
+        
+        if self.ineffective_streak:
+            last_reclaimed = self.recent_cleanups[-1]['reclaimed'] if self.recent_cleanups else 0.0
+            return (f"last {self.ineffective_streak} cleanup(s) reclaimed < {self.min_reclaim_mb:.0f}MB "
+                    f"(last: {last_reclaimed:.1f}MB), backing off {interval:.1f}s")
+        return f"minimum interval {interval:.1f}s not reached ({elapsed:.1f}s since last cleanup)"
+    
+    def filter_by_hysteresis(self, gpu_infos, device_thresholds=None, default_threshold=70):
+        """히스테리시스 적용: 상한 이상이고 무장된 장치만 반환, 하한 아래로 내려가면 재무장"""
+        device_thresholds = device_thresholds or {}
+        devices = []
+        
+        for gpu_info in gpu_infos:
+            index = gpu_info['index']
+            high = device_thresholds.get(index, default_threshold)
+            low = high - self.hysteresis
+            armed = self._armed.get(index, True)
+            
+            if not armed and gpu_info['percent'] < low:
+                armed = True
+            if armed and gpu_info['percent'] >= high:
+                devices.append(index)
+            self._armed[index] = armed
+        
+        return devices
+    
+    def disarm(self, devices):
+        """정리한 장치는 사용률이 하한 아래로 내려갈 때까지 재정리하지 않음"""
+        if self.hysteresis <= 0:
+            return
+        for device in devices:
+            self._armed[device] = False
+    
+    def record_cleanup(self, result, now=None):
+        """정리 결과(회수량/비용) 기록 및 백오프 상태 갱신"""
+        now = time.monotonic() if now is None else now
+        reclaimed = result.get('cleared', 0.0)
+        
+        self.last_cleanup_time = now
+        self.recent_cleanups.append({
+            'time': now,
+            'reclaimed': reclaimed,
+            'duration': result.get('duration', 0.0)
+        })
+        
+        if result.get('success') and reclaimed < self.min_reclaim_mb:
+            self.ineffective_streak += 1
+        else:
+            self.ineffective_streak = 0
+    
+    def get_cost_stats(self):
+        """최근 정리의 평균 회수량/비용"""
+        count = len(self.recent_cleanups)
+        return {
+            'recent': count,
+            'avg_reclaimed': sum(c['reclaimed'] for c in self.recent_cleanups) / count if count else 0.0,
+            'avg_duration': sum(c['duration'] for c in self.recent_cleanups) / count if count else 0.0,
+            'ineffective_streak': self.ineffective_streak,
+            'effective_interval': self.get_effective_interval(),
+            'skipped': self.skipped_count
+        }
+    
     def log_cleanup_progress(self, current_time):
         """Log cleanup progress"""
         print(f"⚡ [{current_time}] VRAM cleanup in progress... ({self.clear_mode} mode)")
@@ -69,16 +392,31 @@ class VRAMCleaner:
         
         if self.clear_mode == "Aggressive":
             print(f"   🔧 Executing gc.collect()...")
-            if hasattr(torch.cuda, 'synchronize'):
+            if self.torch is not None and hasattr(self.torch.cuda, 'synchronize'):
                 print(f"   🔧 Executing torch.cuda.synchronize()...")
     
     def log_cleanup_result(self, result, current_time):
         """Log cleanup result"""
+        timings = result.get('timings')
+        if timings:
+            step_info = ", ".join(f"{step} {seconds * 1000:.1f}ms" for step, seconds in timings.items())
+            print(f"   ⏱️ Step timings: {step_info}")
+        
+        for device, device_result in result.get('devices', {}).items():
+            if device_result['success']:
+                print(f"   🎮 GPU{device}: {device_result['before']:.1f}MB → {device_result['after']:.1f}MB (freed: {device_result['cleared']:.1f}MB, {device_result['duration'] * 1000:.1f}ms)")
+            else:
+                print(f"   🎮 GPU{device}: cleanup failed: {device_result['error']}")
+        
         if result['success']:
             if result['cleared'] > 0:
-                print(f"🎉 [{current_time}] VRAM cleanup successful! {result['before']:.1f}MB → {result['after']:.1f}MB (freed: {result['cleared']:.1f}MB)")
+                print(f"🎉 [{current_time}] VRAM cleanup successful! Reserved {result['before']:.1f}MB → {result['after']:.1f}MB (freed: {result['cleared']:.1f}MB)")
             else:
-                print(f"✨ [{current_time}] Already optimized (current: {result['after']:.1f}MB)")
+                print(f"✨ [{current_time}] Already optimized (reserved: {result['after']:.1f}MB)")
+            if 'fragmentation_before' in result:
+                print(f"   🧩 Fragmentation: {result['fragmentation_before'] * 100:.1f}% → {result['fragmentation_after'] * 100:.1f}% "
+                      f"(inactive split blocks {result['inactive_split_before']:.1f}MB → {result['inactive_split_after']:.1f}MB)")
+                print(f"   💾 Driver free: {result['driver_free_before']:.1f}MB → {result['driver_free_after']:.1f}MB ({result['driver_freed']:+.1f}MB)")
         else:
             print(f"❌ [{current_time}] VRAM cleanup failed: {result['error']}")
     
@@ -88,8 +426,28 @@ class VRAMCleaner:
         
         if result['success']:
             if result['cleared'] > 0:
-                return f"🎉 {execution_info}[{current_time}] VRAM cleanup completed! Freed: {result['cleared']:.1f}MB"
+                message = f"🎉 {execution_info}[{current_time}] VRAM cleanup completed! Freed: {result['cleared']:.1f}MB (reserved {result['before']:.1f}MB → {result['after']:.1f}MB)"
             else:
-                return f"✨ {execution_info}[{current_time}] Already optimized ({result['after']:.1f}MB)"
+                message = f"✨ {execution_info}[{current_time}] Already optimized (reserved {result['after']:.1f}MB)"
         else:
-            return f"❌ {execution_info}[{current_time}] {result['error']}"
\ No newline at end of file
+            message = f"❌ {execution_info}[{current_time}] {result['error']}"
+        
+        # 단편화, 드라이버 여유 메모리, 정리 비용
+        if result['success'] and 'fragmentation_before' in result:
+            message += (f"\n   🧩 Fragmentation {result['fragmentation_before'] * 100:.1f}% → {result['fragmentation_after'] * 100:.1f}% | "
+                        f"💾 Driver free {result['driver_free_after']:.1f}MB ({result['driver_freed']:+.1f}MB)")
+        if result['success'] and 'duration' in result:
+            message += f"\n   ⏱️ Took {result['duration'] * 1000:.1f}ms"
+        
+        # 멀티 GPU 장치별 결과
+        device_results = result.get('devices', {})
+        if len(device_results) > 1:
+            device_lines = []
+            for device, device_result in device_results.items():
+                if device_result['success']:
+                    device_lines.append(f"   🎮 GPU{device}: {device_result['after']:.1f}MB (freed: {device_result['cleared']:.1f}MB)")
+                else:
+                    device_lines.append(f"   🎮 GPU{device}: ❌ {device_result['error']}")
+            message += "\n" + "\n".join(device_lines)
+        
+        return message
\ No newline at end of file